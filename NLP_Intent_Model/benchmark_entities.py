@@ -0,0 +1,45 @@
+"""
+Micro-benchmark: per-pattern entity extractors vs the single-pass scanner.
+Runs over the golden corpus used by tests/nlu/test_entity_scanner.py.
+Run: python benchmark_entities.py [--repeat 200]
+"""
+import argparse
+import json
+import re
+import time
+
+from src.nlu.entity_extractor import _scan_entities_sequential, scan_entities
+
+GOLDEN_PATH = "tests/nlu/golden_entities.json"
+
+
+def _time_per_pass(fn, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for t in texts:
+            fn(t)
+    return (time.perf_counter() - start) / repeat * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(GOLDEN_PATH, "r", encoding="utf-8") as fh:
+        texts = [case["text"] for case in json.load(fh)]
+    groups = {
+        "all": texts,
+        "no digits": [t for t in texts if not re.search(r"\d", t)],
+        "with digits": [t for t in texts if re.search(r"\d", t)],
+    }
+
+    print(f"{'corpus':<12} {'texts':>6} {'sequential ms':>14} {'scanner ms':>11} {'speedup':>8}")
+    for name, group in groups.items():
+        seq = _time_per_pass(_scan_entities_sequential, group, args.repeat)
+        scan = _time_per_pass(scan_entities, group, args.repeat)
+        print(f"{name:<12} {len(group):>6} {seq:>14.2f} {scan:>11.2f} {seq / scan:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Table-driven form of policy_rules.POLICY, compiled once at import.
+
+- Each intent gets the bitmask of its required slots (bits from slot_manager.SLOT_BITS),
+  so "what is missing" is required_mask & ~SlotManager.filled_mask.
+- The prompt for every possible missing-slot state is precomputed: the first missing
+  slot in required_slots order decides it, as in FallbackHandler.handle_missing_slots.
+- success_message templates are parsed once; rendering joins literals and slot values
+  without re-parsing the str.format string on every turn.
+
+Place at: src/dialogue_manager/compiled_policy.py
+"""
+from string import Formatter
+
+from .policy_rules import POLICY
+from .slot_manager import SLOT_BITS, slot_mask
+from .fallback_handler import FallbackHandler
+
+_FORMATTER = Formatter()
+
+
+def _parse_template(template):
+    """[(literal, field, conversion, format_spec), ...], or None if a field is not a plain slot name."""
+    parts = []
+    for literal, field, format_spec, conversion in _FORMATTER.parse(template):
+        if field is not None and not field.isidentifier():
+            return None
+        parts.append((literal, field, conversion, format_spec))
+    return parts
+
+
+class CompiledIntent:
+    __slots__ = ("name", "required", "required_mask", "success_message", "prompts", "_template")
+
+    def __init__(self, name, cfg):
+        self.name = name
+        self.required = tuple(cfg.get("required_slots", []))
+        unknown = [s for s in self.required if s not in SLOT_BITS]
+        if unknown:
+            raise ValueError(f"Intent {name} requires unknown slots: {unknown}")
+        self.required_mask = slot_mask(self.required)
+        self.success_message = cfg.get("success_message")
+        # missing-slot mask -> (default prompt, prompt once other slots are filled), for every
+        # non-empty subset of the required slots
+        self.prompts = {}
+        missing = self.required_mask
+        while missing:
+            slot = next(s for s in self.required if SLOT_BITS[s] & missing)
+            self.prompts[missing] = (
+                FallbackHandler.prompt_for_slot(slot, has_context=False),
+                FallbackHandler.prompt_for_slot(slot, has_context=True),
+            )
+            missing = (missing - 1) & self.required_mask
+        self._template = _parse_template(self.success_message) if self.success_message else None
+
+    def prompt(self, missing_mask, has_context):
+        return self.prompts[missing_mask][1 if has_context else 0]
+
+    def render_success(self, slots):
+        """success_message.format(**slots); raises KeyError for unknown fields like str.format."""
+        if self._template is None:
+            return self.success_message.format(**slots)
+        out = []
+        for literal, field, conversion, format_spec in self._template:
+            out.append(literal)
+            if field is None:
+                continue
+            value = slots[field]
+            if conversion:
+                value = _FORMATTER.convert_field(value, conversion)
+            out.append(format(value, format_spec))
+        return "".join(out)
+
+
+def compile_policy(policy):
+    return {intent: CompiledIntent(intent, cfg) for intent, cfg in policy.items()}
+
+
+COMPILED_POLICY = compile_policy(POLICY)
@@ -1,13 +1,37 @@
 from .state_tracker import StateTracker
 from .slot_manager import SlotManager
-from .policy_rules import POLICY
+from .compiled_policy import COMPILED_POLICY
+from .slot_manager import slot_mask
 from .fallback_handler import FallbackHandler
 from src.integration.mock_banking_api import get_loan_details
 
+# Fixed responses and templates (also enumerated by phrase_registry for TTS reuse)
+HELP_MESSAGE = (
+    "Sure! Here’s what you can say:\n"
+    "- \"Transfer 2000 to 9876543210\"\n"
+    "- \"What's my savings balance?\"\n"
+    "- \"Check my loan status\"\n"
+    "- \"Set a reminder for tomorrow\"\n"
+    "\nYou can continue anytime."
+)
+GREETING_MESSAGE = "Hello! How can I assist you today?"
+DEFAULT_SUCCESS_MESSAGE = "I have processed your request."
+LOAN_NOT_FOUND_TEMPLATE = "Sorry, no loan found with ID '{loan_id}'. Please check your loan ID and try again."
+LOAN_STATUS_TEMPLATE = (
+    "Loan status for Loan I D {loan_id}. "
+    "Remaining amount is rupees {loan_amount}. "
+    "Interest rate is {interest_rate} percent. "
+    "Your next E M I is due on {loan_date}."
+)
+PROCESSING_TEMPLATE = "Processing {intent} with provided information: {filled_info}."
+PROCESSING_BARE_TEMPLATE = "Processing {intent} with provided information."
+
 
 class DialogueManager:
-    def __init__(self):
-        self.state = StateTracker()
+    def __init__(self, history_spill=None):
+        """history_spill: optional callable(TurnRecord) for turns pushed out of the history buffer"""
+        self.history_spill = history_spill
+        self.state = StateTracker(spill=history_spill)
         self.slots = SlotManager()
         self.fallback = FallbackHandler()
         self.current_intent = None  # Track active intent for continuous conversation
@@ -89,18 +113,11 @@ class DialogueManager:
         self.fallback.reset_fallback_count()
 
         if intent == "help":
-            return (
-                "Sure! Here’s what you can say:\n"
-                "- \"Transfer 2000 to 9876543210\"\n"
-                "- \"What's my savings balance?\"\n"
-                "- \"Check my loan status\"\n"
-                "- \"Set a reminder for tomorrow\"\n"
-                "\nYou can continue anytime."
-            )
+            return HELP_MESSAGE
 
         if intent == "greeting":
             self._reset_conversation()
-            return "Hello! How can I assist you today?"
+            return GREETING_MESSAGE
 
         if self.conversation_active and self.current_intent and intent != self.current_intent:
             if self._is_continuation(intent, entities):
@@ -122,18 +139,15 @@ class DialogueManager:
             if loan_id:
                 details = get_loan_details(loan_id)
                 if details["remaining_amount"] == "Not available":
-                    msg = (
-                        f"Sorry, no loan found with ID '{loan_id}'. "
-                        "Please check your loan ID and try again."
-                    )
+                    msg = LOAN_NOT_FOUND_TEMPLATE.format(loan_id=loan_id)
                     self._reset_conversation()
                     return msg
                 # Fill loan_amount if not already filled
                 if self.slots.slots.get("loan_amount") is None:
-                    self.slots.slots["loan_amount"] = details["remaining_amount"]
+                    self.slots.set_slot("loan_amount", details["remaining_amount"])
                 # Fill loan_date if not already filled
                 if self.slots.slots.get("loan_date") is None:
-                    self.slots.slots["loan_date"] = details["next_due"]
+                    self.slots.set_slot("loan_date", details["next_due"])
                 # You can add more slot auto-fill logic here if needed
 
 
@@ -141,47 +155,42 @@ class DialogueManager:
             self.current_intent = intent
             self.conversation_active = True
 
-        policy_cfg = POLICY.get(intent, {})
-        required = policy_cfg.get("required_slots", [])
+        policy = COMPILED_POLICY.get(intent)
 
-        if not required and policy_cfg:
-            msg = policy_cfg.get("success_message", "I have processed your request.")
+        if policy is not None and not policy.required_mask:
+            msg = policy.success_message if policy.success_message is not None else DEFAULT_SUCCESS_MESSAGE
             self._reset_conversation()
             return msg
 
-        missing = self.slots.missing_slots(required)
+        missing = self.slots.missing_mask(policy.required_mask) if policy is not None else 0
 
         if missing:
-            return self.fallback.handle_missing_slots(
-                missing,
-                current_intent=intent,
-                filled_slots=self.slots.get_filled_slots()
-            )
+            return policy.prompt(missing, has_context=self.slots.filled_mask != 0)
 
         try:
-            if intent not in POLICY:
+            if policy is None:
                 filled_info = ", ".join([f"{k}: {v}" for k, v in self.slots.get_filled_slots().items()])
-                msg = f"Processing {intent} with provided information: {filled_info}."
+                msg = PROCESSING_TEMPLATE.format(intent=intent, filled_info=filled_info)
             elif intent == "loan_query":
                 loan_id = self.slots.get_slot("loan_id")
                 details = get_loan_details(loan_id)
                 loan_amount = self.slots.get_slot("loan_amount") or details["remaining_amount"]
                 loan_date = self.slots.get_slot("loan_date") or details["next_due"]
                 spoken_loan_id = " ".join(details['loan_id'].upper())
-                msg = (
-                    f"Loan status for Loan I D {spoken_loan_id}. "
-                    f"Remaining amount is rupees {loan_amount}. "
-                    f"Interest rate is {details['interest_rate']} percent. "
-                    f"Your next E M I is due on {loan_date}."
+                msg = LOAN_STATUS_TEMPLATE.format(
+                    loan_id=spoken_loan_id,
+                    loan_amount=loan_amount,
+                    interest_rate=details["interest_rate"],
+                    loan_date=loan_date,
                 )
 
             else:
-                msg = POLICY[intent]["success_message"].format(**self.slots.slots)
+                msg = policy.render_success(self.slots.slots)
         except KeyError:
             filled_info = ", ".join([f"{k}: {v}" for k, v in self.slots.get_filled_slots().items()])
-            msg = f"Processing {intent} with provided information: {filled_info}."
+            msg = PROCESSING_TEMPLATE.format(intent=intent, filled_info=filled_info)
         except Exception:
-            msg = f"Processing {intent} with provided information."
+            msg = PROCESSING_BARE_TEMPLATE.format(intent=intent)
 
         self._reset_conversation()
         return msg
@@ -191,22 +200,49 @@ class DialogueManager:
         if not self.current_intent:
             return False
 
-        required = POLICY.get(self.current_intent, {}).get("required_slots", [])
-        missing = self.slots.missing_slots(required)
-
-        if missing and entities:
-            for slot in missing:
-                if slot in entities:
-                    return True
+        policy = COMPILED_POLICY.get(self.current_intent)
+        if policy is None or not entities:
+            return False
 
-        return False
+        # continuation if the turn supplies any slot the active intent is still missing
+        return bool(self.slots.missing_mask(policy.required_mask) & slot_mask(entities))
 
     def _reset_conversation(self):
         self.slots.reset()
         self.conversation_active = False
         self.current_intent = None
 
+    def export_state(self):
+        """
+        Everything that carries over between turns, as plain msgpack/JSON-friendly values.
+        Only filled slots are kept; SlotManager re-creates the empty ones.
+        """
+        return {
+            "intent": self.current_intent,
+            "active": self.conversation_active,
+            "slots": self.slots.get_filled_slots(),
+            "fallbacks": self.fallback.fallback_count,
+            # [[intent, [[key, value], ...]], ...] oldest first; the last turn doubles as last intent/entities
+            "history": [[t.intent, [list(kv) for kv in t.entities]] for t in self.state.turns()],
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a DialogueManager from export_state() output (missing keys keep defaults)."""
+        dm = cls()
+        dm.current_intent = state.get("intent")
+        dm.conversation_active = bool(state.get("active", False))
+        for slot, value in (state.get("slots") or {}).items():
+            dm.slots.set_slot(slot, value)
+        dm.fallback.fallback_count = state.get("fallbacks", 0)
+        for turn in state.get("history") or []:
+            if isinstance(turn, dict):  # sessions written before history became compact
+                dm.state.update(turn.get("intent"), turn.get("entities") or {})
+            else:
+                dm.state.update(turn[0], [tuple(kv) for kv in turn[1]])
+        return dm
+
     def reset(self):
         self._reset_conversation()
-        self.state = StateTracker()
+        self.state = StateTracker(spill=self.history_spill)
         self.fallback.reset_fallback_count()
\ No newline at end of file
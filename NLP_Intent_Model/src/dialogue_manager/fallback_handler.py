@@ -1,3 +1,47 @@
+# Context-aware prompts per missing slot: "default", or "with_context" once other slots are filled
+SLOT_PROMPTS = {
+    "amount": {
+        "default": "How much do you want to transfer?",
+        "with_context": "What amount would you like to transfer?"
+    },
+    "phone_number": {
+        "default": "Please share the phone number of the recipient.",
+        "with_context": "To whom should I transfer? Please provide the phone number."
+    },
+
+    "date": {
+        "default": "On which date?",
+        "with_context": "When would you like this reminder set?"
+    },
+    "account_type": {
+        "default": "Which account? Savings or current?",
+        "with_context": "For which account would you like to check the balance?"
+    },
+    # New loan-related slots:
+    "loan_id": {
+        "default": "Please provide your loan ID.",
+        "with_context": "Could you share your loan ID to proceed?"
+    },
+    "loan_date": {  # alternative key if used
+        "default": "When is your next EMI due?",
+        "with_context": "Please tell me the EMI due date."
+    },
+    "loan_amount": {
+        "default": "What is the remaining loan amount?",
+        "with_context": "How much loan amount is left?"
+    }
+}
+DEFAULT_SLOT_PROMPT = {"default": "Can you provide more details?", "with_context": "I need more information."}
+
+# Progressive low-confidence messages, then the one used once max_fallbacks is reached
+FALLBACK_MESSAGES = (
+    "Sorry, I didn't understand that. Could you rephrase?",
+    "I'm not sure I understood. Can you try saying it differently?",
+    "I'm still having trouble. Could you be more specific about what you need?"
+)
+MAX_FALLBACK_MESSAGE = "I'm having trouble understanding. Could you please rephrase your request differently, or say 'help' for assistance?"
+
+
 class FallbackHandler:
     def __init__(self):
         self.fallback_count = 0
@@ -14,48 +58,16 @@ class FallbackHandler:
         """
         filled_slots = filled_slots or {}
         
-        # Context-aware prompts based on intent and what's already filled
-        prompts = {
-            "amount": {
-                "default": "How much do you want to transfer?",
-                "with_context": "What amount would you like to transfer?"
-            },
-            "phone_number": {
-                "default": "Please share the phone number of the recipient.",
-                "with_context": "To whom should I transfer? Please provide the phone number."
-            },
-
-            "date": {
-                "default": "On which date?",
-                "with_context": "When would you like this reminder set?"
-            },
-            "account_type": {
-                "default": "Which account? Savings or current?",
-                "with_context": "For which account would you like to check the balance?"
-            },
-            # New loan-related slots:
-            "loan_id": {
-                "default": "Please provide your loan ID.",
-                "with_context": "Could you share your loan ID to proceed?"
-            },
-            "loan_date": {  # alternative key if used
-                "default": "When is your next EMI due?",
-                "with_context": "Please tell me the EMI due date."
-            },
-            "loan_amount": {
-                "default": "What is the remaining loan amount?",
-                "with_context": "How much loan amount is left?"
-            }
-        }
-        
-        slot = missing[0]
-        prompt_config = prompts.get(slot, {"default": "Can you provide more details?", "with_context": "I need more information."})
-        
         # Use context-aware prompt if we have filled slots
-        if filled_slots:
+        return self.prompt_for_slot(missing[0], has_context=bool(filled_slots))
+
+    @staticmethod
+    def prompt_for_slot(slot, has_context=False):
+        """Prompt asking for one slot (see SLOT_PROMPTS)."""
+        prompt_config = SLOT_PROMPTS.get(slot, DEFAULT_SLOT_PROMPT)
+        if has_context:
             return prompt_config.get("with_context", prompt_config["default"])
-        else:
-            return prompt_config["default"]
+        return prompt_config["default"]
     
     def handle_low_confidence(self, fallback_count=0):
         """
@@ -65,16 +77,10 @@ class FallbackHandler:
             fallback_count: Number of consecutive fallbacks
         """
         if fallback_count >= self.max_fallbacks:
-            return "I'm having trouble understanding. Could you please rephrase your request differently, or say 'help' for assistance?"
-        
-        fallback_messages = [
-            "Sorry, I didn't understand that. Could you rephrase?",
-            "I'm not sure I understood. Can you try saying it differently?",
-            "I'm still having trouble. Could you be more specific about what you need?"
-        ]
+            return MAX_FALLBACK_MESSAGE
         
-        idx = min(fallback_count, len(fallback_messages) - 1)
-        return fallback_messages[idx]
+        idx = min(fallback_count, len(FALLBACK_MESSAGES) - 1)
+        return FALLBACK_MESSAGES[idx]
     
     def increment_fallback_count(self):
         """Increment fallback counter."""
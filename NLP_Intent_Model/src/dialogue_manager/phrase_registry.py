@@ -0,0 +1,110 @@
+"""
+Registry of every fixed piece of text the dialogue manager can say, for TTS reuse.
+
+- Static responses (help, greeting, slot prompts, fallback messages, success messages
+  without slots) are registered whole.
+- Templated responses (POLICY success messages with slots, loan status, ...) are split
+  into their literal fragments, e.g. "Your loan details: remaining amount is ₹".
+- Every phrase gets a stable ID derived from its text, so it survives restarts and is
+  the same in every replica.
+- segment(response) splits a rendered response into [{"text", "phrase_id"}, ...]:
+  static parts carry their phrase_id, slot values carry None. The TTS service can play
+  pre-synthesized audio for the former and synthesize only the latter.
+
+Place at: src/dialogue_manager/phrase_registry.py
+"""
+import hashlib
+import re
+from string import Formatter
+from typing import Dict, List, Optional
+
+from .policy_rules import POLICY
+from .fallback_handler import SLOT_PROMPTS, DEFAULT_SLOT_PROMPT, FALLBACK_MESSAGES, MAX_FALLBACK_MESSAGE
+from . import dialogue_manager as dm
+
+_FORMATTER = Formatter()
+# fragments without a letter or digit (", ", ".") are not worth a pre-synthesized clip
+_SPEAKABLE = re.compile(r"\w")
+
+
+def phrase_id(text: str) -> str:
+    """Stable ID of a phrase: first 12 hex digits of its SHA-1."""
+    return "ph_" + hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+class PhraseRegistry:
+    def __init__(self):
+        self._static: Dict[str, str] = {}  # text -> phrase_id
+        self._templates: List[tuple] = []  # (regex, [literal fragments])
+
+    def _register(self, text: str) -> Optional[str]:
+        if not _SPEAKABLE.search(text):
+            return None
+        return self._static.setdefault(text, phrase_id(text))
+
+    def add_static(self, text: str):
+        self._register(text)
+
+    def add_template(self, template: str):
+        """Register a str.format template; fixed texts go through add_static()."""
+        literals, pattern = [], []
+        for literal, field, _, _ in _FORMATTER.parse(template):
+            literals.append(literal)
+            pattern.append(re.escape(literal))
+            if field is not None:
+                pattern.append("(.*?)")
+        if len(literals) == 1:
+            self.add_static(template)
+            return
+        for literal in literals:
+            if literal:
+                self._register(literal)
+        self._templates.append((re.compile("".join(pattern), flags=re.DOTALL), literals))
+        # most literal text first, so a template never matches text meant for a more specific one
+        self._templates.sort(key=lambda t: -sum(len(lit) for lit in t[1]))
+
+    def phrases(self) -> Dict[str, str]:
+        """phrase_id -> text for every registered phrase (e.g. to pre-synthesize them)."""
+        return {pid: text for text, pid in self._static.items()}
+
+    def segment(self, text: str) -> List[Dict]:
+        """
+        Split a response into consecutive parts whose texts join back to text.
+        Unknown responses come back as a single part with phrase_id None.
+        """
+        pid = self._static.get(text)
+        if pid is not None:
+            return [{"text": text, "phrase_id": pid}]
+        for regex, literals in self._templates:
+            m = regex.fullmatch(text)
+            if m is None:
+                continue
+            parts = []
+            for i, literal in enumerate(literals):
+                if literal:
+                    parts.append({"text": literal, "phrase_id": self._static.get(literal)})
+                if i < len(m.groups()) and m.group(i + 1):
+                    parts.append({"text": m.group(i + 1), "phrase_id": None})
+            return parts
+        return [{"text": text, "phrase_id": None}]
+
+
+def build_default_registry() -> PhraseRegistry:
+    registry = PhraseRegistry()
+    for text in (dm.HELP_MESSAGE, dm.GREETING_MESSAGE, dm.DEFAULT_SUCCESS_MESSAGE, MAX_FALLBACK_MESSAGE):
+        registry.add_static(text)
+    for text in FALLBACK_MESSAGES:
+        registry.add_static(text)
+    for prompts in list(SLOT_PROMPTS.values()) + [DEFAULT_SLOT_PROMPT]:
+        for text in prompts.values():
+            registry.add_static(text)
+    for cfg in POLICY.values():
+        if cfg.get("success_message"):
+            registry.add_template(cfg["success_message"])
+    for template in (dm.LOAN_NOT_FOUND_TEMPLATE, dm.LOAN_STATUS_TEMPLATE, dm.PROCESSING_TEMPLATE,
+                     dm.PROCESSING_BARE_TEMPLATE):
+        registry.add_template(template)
+    return registry
+
+
+DEFAULT_PHRASE_REGISTRY = build_default_registry()
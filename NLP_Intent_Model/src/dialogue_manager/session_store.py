@@ -0,0 +1,236 @@
+"""
+Per-session dialogue state for the NLP service.
+
+- One DialogueManager per session_id, so concurrent callers never share slots,
+  the active intent or fallback counters.
+- Sessions idle for longer than ttl seconds expire; once max_sessions is reached the
+  least recently used session is evicted.
+- Lookup is O(1). Sessions are kept in last-access order, so expired ones always sit
+  at the front and are dropped as they are met (amortized O(1) per call).
+- RedisSessionStore keeps the same state in Redis instead, so any NLP replica can serve
+  any turn: one hash per session, one msgpack-encoded field per part of the
+  DialogueManager state (see DialogueManager.export_state), a per-session TTL, and a
+  version field checked on every write (optimistic concurrency).
+
+Both stores expose run_turn(session_id, fn), which the service uses for every turn.
+
+Requirements (Redis backend only): redis, msgpack
+
+Place at: src/dialogue_manager/session_store.py
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import msgpack
+    import redis
+    REDIS_AVAILABLE = True
+except Exception:
+    msgpack = None
+    redis = None
+    REDIS_AVAILABLE = False
+
+DEFAULT_MAX_SESSIONS = 10000
+DEFAULT_SESSION_TTL = 1800.0
+DEFAULT_KEY_PREFIX = "echofi:dialogue:"
+DEFAULT_MAX_RETRIES = 3
+VERSION_FIELD = "v"
+
+
+class SessionConflict(RuntimeError):
+    """Raised when a turn kept losing the race against concurrent turns of the same session."""
+
+
+class SessionStore:
+    def __init__(self, factory: Callable[[], Any], max_sessions: int = DEFAULT_MAX_SESSIONS,
+                 ttl: float = DEFAULT_SESSION_TTL):
+        """
+        factory: builds the state for a new session (e.g. DialogueManager)
+        max_sessions: sessions kept before the least recently used one is evicted
+        ttl: seconds of inactivity after which a session expires
+        """
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, list]" = OrderedDict()  # session_id -> [last_access, state]
+        self._lock = threading.Lock()
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def _drop_expired(self, now: float):
+        cutoff = now - self.ttl
+        while self._sessions:
+            session_id, entry = next(iter(self._sessions.items()))
+            if entry[0] > cutoff:
+                break
+            del self._sessions[session_id]
+            self.expired += 1
+
+    def get_or_create(self, session_id: Optional[str] = None) -> Tuple[str, Any]:
+        """Return (session_id, state); a new id is issued when session_id is None."""
+        now = time.monotonic()
+        with self._lock:
+            self._drop_expired(now)
+            if session_id is not None:
+                entry = self._sessions.get(session_id)
+                if entry is not None:
+                    entry[0] = now
+                    self._sessions.move_to_end(session_id)
+                    return session_id, entry[1]
+            else:
+                session_id = uuid.uuid4().hex
+
+            state = self.factory()
+            self._sessions[session_id] = [now, state]
+            self.created += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+            return session_id, state
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """State of a live session without creating one (refreshes its idle timer)."""
+        now = time.monotonic()
+        with self._lock:
+            self._drop_expired(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            entry[0] = now
+            self._sessions.move_to_end(session_id)
+            return entry[1]
+
+    def run_turn(self, session_id: Optional[str], fn: Callable[[Any], Any]) -> Tuple[str, Any]:
+        """Apply fn to the session's state; returns (session_id, fn's result)."""
+        session_id, state = self.get_or_create(session_id)
+        return session_id, fn(state)
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._drop_expired(time.monotonic())
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl": self.ttl,
+                "created": self.created,
+                "expired": self.expired,
+                "evicted": self.evicted,
+            }
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+# Compare-and-set write: apply the changed fields only if nobody wrote since we read.
+# KEYS[1] = session key; ARGV = expected version ("" for a new session), ttl, field, value, ...
+_SAVE_IF_UNCHANGED = """
+local current = redis.call('HGET', KEYS[1], 'v') or ''
+if current ~= ARGV[1] then
+    return 0
+end
+if #ARGV > 2 then
+    for i = 3, #ARGV, 2 do
+        redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+    end
+    redis.call('HINCRBY', KEYS[1], 'v', 1)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class RedisSessionStore:
+    # run_turn does network I/O; the service calls it off the event loop
+    blocking_io = True
+
+    def __init__(self, client, state_class, ttl: float = DEFAULT_SESSION_TTL,
+                 key_prefix: str = DEFAULT_KEY_PREFIX, max_retries: int = DEFAULT_MAX_RETRIES):
+        """
+        client: redis.Redis created with decode_responses=False
+        state_class: class with export_state() and from_state(state), e.g. DialogueManager
+        ttl: seconds of inactivity after which Redis drops the session
+        max_retries: times a turn is re-run on fresh state after a version conflict
+        """
+        if msgpack is None:
+            raise RuntimeError("msgpack is required for the Redis session store.")
+        self.client = client
+        self.state_class = state_class
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self.max_retries = max_retries
+        self._save_script = client.register_script(_SAVE_IF_UNCHANGED)
+        self.turns = 0
+        self.conflicts = 0
+        self.fields_written = 0
+
+    @classmethod
+    def from_url(cls, url: str, state_class, **kwargs) -> "RedisSessionStore":
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis and msgpack are required for the Redis session store.")
+        return cls(redis.from_url(url, decode_responses=False), state_class, **kwargs)
+
+    def _key(self, session_id: str) -> str:
+        return self.key_prefix + session_id
+
+    def _load(self, session_id: str) -> Tuple[str, Dict[str, bytes]]:
+        """(version, encoded fields) of a session; ("", {}) if it does not exist."""
+        raw = self.client.hgetall(self._key(session_id))
+        fields = {k.decode() if isinstance(k, bytes) else k: v for k, v in raw.items()}
+        version = fields.pop(VERSION_FIELD, b"")
+        return (version.decode() if isinstance(version, bytes) else str(version)), fields
+
+    def _decode(self, fields: Dict[str, bytes]):
+        if not fields:
+            return self.state_class()
+        return self.state_class.from_state({k: msgpack.unpackb(v) for k, v in fields.items()})
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """Snapshot of a session's state, or None (read-only: changes are not written back)."""
+        _, fields = self._load(session_id)
+        return self._decode(fields) if fields else None
+
+    def run_turn(self, session_id: Optional[str], fn: Callable[[Any], Any]) -> Tuple[str, Any]:
+        """
+        Load the session, apply fn and write back only the fields whose encoding changed.
+        The write succeeds only if the session version is still the one that was read; otherwise
+        fn runs again on the fresh state (so fn must not have side effects outside the state).
+        """
+        session_id = session_id or uuid.uuid4().hex
+        key = self._key(session_id)
+        for _ in range(self.max_retries + 1):
+            version, fields = self._load(session_id)
+            state = self._decode(fields)
+            result = fn(state)
+            encoded = {k: msgpack.packb(v, use_bin_type=True) for k, v in state.export_state().items()}
+            changed = [item for k, v in encoded.items() if fields.get(k) != v for item in (k, v)]
+            if self._save_script(keys=[key], args=[version, int(self.ttl)] + changed):
+                self.turns += 1
+                self.fields_written += len(changed) // 2
+                return session_id, result
+            self.conflicts += 1
+        raise SessionConflict(f"Session {session_id} changed concurrently {self.max_retries + 1} times")
+
+    def delete(self, session_id: str) -> bool:
+        return bool(self.client.delete(self._key(session_id)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "ttl": self.ttl,
+            "turns": self.turns,
+            "conflicts": self.conflicts,
+            "fields_written": self.fields_written,
+        }
@@ -1,33 +1,59 @@
 from src.utils.text_formatter import spell_out_digits
 
+SLOT_NAMES = (
+    "amount",
+    "phone_number",
+    "date",
+    "account_type",
+    "recipient",
+    "phone_number_spelled",
+    "credit_card_number",
+    "loan_id",
+    "bank_branch",
+    # Added slots for loan queries:
+    "loan_date",    # Corresponds to EMI due date or loan date
+    "loan_amount",
+    "loan_type",    # Optional: if you want specific loan types such as home, car
+)
+# One bit per slot; SlotManager.filled_mask has the bit set while the slot holds a value
+SLOT_BITS = {name: 1 << i for i, name in enumerate(SLOT_NAMES)}
+
+
+def slot_mask(names):
+    """Bitmask of the known slot names in names (unknown names are ignored)."""
+    mask = 0
+    for name in names:
+        mask |= SLOT_BITS.get(name, 0)
+    return mask
+
+
 class SlotManager:
     def __init__(self):
-        self.slots = {
-            "amount": None,
-            "phone_number": None,
-            "date": None,
-            "account_type": None,
-            "recipient": None,
-            "phone_number": None,
-            "phone_number_spelled": None,
-            "credit_card_number": None,
-            "loan_id": None,
-            "bank_branch": None,
-            # Added slots for loan queries:
-            "loan_date": None,    # Corresponds to EMI due date or loan date
-            "loan_amount": None,
-            "loan_type": None,    # Optional: if you want specific loan types such as home, car
-        }
+        self.slots = dict.fromkeys(SLOT_NAMES)
+        self.filled_mask = 0
+
+    def set_slot(self, slot_name, value):
+        """Set one slot and keep filled_mask in sync."""
+        self.slots[slot_name] = value
+        bit = SLOT_BITS.get(slot_name, 0)
+        if value is None:
+            self.filled_mask &= ~bit
+        else:
+            self.filled_mask |= bit
 
     def fill_slots(self, entities):
         """Fill slots from entities. Allows overwriting existing values."""
         for ent, value in entities.items():
             if ent in self.slots:
-                self.slots[ent] = value
+                self.set_slot(ent, value)
 
                  # NEW: auto-generate spoken phone number for TTS
                 if ent == "phone_number" and value:
-                    self.slots["phone_number_spelled"] = spell_out_digits(str(value))
+                    self.set_slot("phone_number_spelled", spell_out_digits(str(value)))
+
+    def missing_mask(self, required_mask):
+        """Bits of required_mask whose slots are still empty."""
+        return required_mask & ~self.filled_mask
 
     def missing_slots(self, required):
         """Return list of required slots that are missing."""
@@ -41,7 +67,8 @@ class SlotManager:
         """Reset all slots to None."""
         for slot in self.slots:
             self.slots[slot] = None
-    
+        self.filled_mask = 0
+
     def get_slot(self, slot_name):
         """Get value of a specific slot."""
-        return self.slots.get(slot_name)
\ No newline at end of file
+        return self.slots.get(slot_name)
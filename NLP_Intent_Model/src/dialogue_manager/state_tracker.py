@@ -1,13 +1,69 @@
+import sys
+
+# Turns kept per session; older ones are dropped (or handed to the spill hook)
+DEFAULT_HISTORY_SIZE = 16
+
+
+class TurnRecord:
+    """One dialogue turn: interned intent name + (key, value) pairs of its entities."""
+    __slots__ = ("intent", "entities")
+
+    def __init__(self, intent, entities):
+        self.intent = sys.intern(intent) if isinstance(intent, str) else intent
+        self.entities = tuple((k, v) for k, v in (entities.items() if isinstance(entities, dict) else entities))
+
+    def as_dict(self):
+        return {"intent": self.intent, "entities": dict(self.entities)}
+
+
 class StateTracker:
-    def __init__(self):
-        self.last_intent = None
-        self.last_entities = {}
-        self.history = []
+    """
+    Last intent/entities plus a fixed-capacity ring buffer of recent turns.
+    spill: optional callable(TurnRecord) that receives each turn as it is pushed out of
+    the buffer (e.g. to write an audit log); without it old turns are simply dropped.
+    """
+    __slots__ = ("capacity", "spill", "_turns", "_next", "_count")
+
+    def __init__(self, capacity=DEFAULT_HISTORY_SIZE, spill=None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.spill = spill
+        self._turns = [None] * capacity
+        self._next = 0  # slot the next turn is written to
+        self._count = 0
 
     def update(self, intent, entities):
-        self.last_intent = intent
-        self.last_entities = entities
-        self.history.append({"intent": intent, "entities": entities})
+        record = TurnRecord(intent, entities or {})
+        evicted = self._turns[self._next]
+        if evicted is not None and self.spill is not None:
+            self.spill(evicted)
+        self._turns[self._next] = record
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def turns(self):
+        """TurnRecords in the buffer, oldest first."""
+        start = (self._next - self._count) % self.capacity
+        return [self._turns[(start + i) % self.capacity] for i in range(self._count)]
+
+    @property
+    def _last(self):
+        return self._turns[self._next - 1] if self._count else None
+
+    @property
+    def last_intent(self):
+        last = self._last
+        return last.intent if last is not None else None
+
+    @property
+    def last_entities(self):
+        last = self._last
+        return dict(last.entities) if last is not None else {}
+
+    @property
+    def history(self):
+        return [t.as_dict() for t in self.turns()]
 
     def get_state(self):
         return {
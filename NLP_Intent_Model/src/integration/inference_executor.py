@@ -0,0 +1,159 @@
+"""
+Bounded executor that keeps CPU-bound NLU work (tokenizer, PyTorch forward pass, regex)
+off the asyncio event loop of the NLP service.
+
+- "thread" (default): ThreadPoolExecutor; torch intra-op threads are capped so that
+  workers x torch threads does not oversubscribe the CPU. When the shared batching
+  IntentInferenceEngine is running (batching_engine=True), every forward pass runs on its
+  single batcher thread while the workers wait on it, so torch keeps all of its threads.
+- "process": ProcessPoolExecutor (spawn); every worker loads the intent model and
+  cascade once at start-up, so requests never pay the load.
+- At most max_workers + max_queue calls are admitted at a time; beyond that run()
+  raises ExecutorSaturated right away, which the service turns into a 503.
+
+Configured from the environment by from_env():
+  NLU_EXECUTOR=thread|process, NLU_EXECUTOR_WORKERS, NLU_EXECUTOR_QUEUE, NLU_TORCH_THREADS
+
+Place at: src/integration/inference_executor.py
+"""
+import os
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_QUEUE = 64
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+def _set_torch_threads(num_threads: int):
+    if num_threads <= 0:
+        return
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except Exception as e:
+        logger.warning(f"Could not cap torch threads: {e}")
+
+
+def _process_worker_init(torch_threads: int):
+    """Runs once in every process worker: cap torch threads and preload the NLU models."""
+    _set_torch_threads(torch_threads)
+    try:
+        from src.nlu import entity_extractor
+    except ImportError:
+        import entity_extractor  # type: ignore
+    try:
+        entity_extractor.load_intent_engine_if_available()
+    except Exception as e:
+        logger.warning(f"Worker {os.getpid()} has no intent model: {e}")
+    entity_extractor.load_intent_cascade_if_available()
+
+
+class InferenceExecutor:
+    def __init__(self, kind: str = "thread", max_workers: int = None, max_queue: int = DEFAULT_MAX_QUEUE,
+                 torch_threads: int = None, batching_engine: bool = False):
+        """
+        kind: "thread" or "process"
+        max_workers: pool size (default: 4 threads, or 2 processes)
+        max_queue: calls allowed to wait for a free worker before run() rejects
+        torch_threads: torch intra-op threads per worker (default: cpu_count // max_workers, at least 1;
+            in thread mode with batching_engine, torch's own default is left alone)
+        batching_engine: the shared IntentInferenceEngine runs the intent forward passes
+        """
+        kind = kind.lower()
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers or (4 if kind == "thread" else 2)
+        self.max_queue = max_queue
+        self.batching_engine = batching_engine and kind == "thread"
+        if torch_threads:
+            self.torch_threads = torch_threads
+        elif self.batching_engine:
+            self.torch_threads = 0  # not capped: one batcher thread runs every forward pass
+        else:
+            self.torch_threads = max(1, (os.cpu_count() or 1) // self.max_workers)
+        self._capacity = self.max_workers + self.max_queue
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self._pool: Executor = self._make_pool()
+
+    @staticmethod
+    def kind_from_env() -> str:
+        return os.environ.get("NLU_EXECUTOR", "thread").lower()
+
+    @classmethod
+    def from_env(cls, batching_engine: bool = False) -> "InferenceExecutor":
+        workers = int(os.environ.get("NLU_EXECUTOR_WORKERS", "0")) or None
+        threads = int(os.environ.get("NLU_TORCH_THREADS", "0")) or None
+        return cls(
+            kind=cls.kind_from_env(),
+            max_workers=workers,
+            max_queue=int(os.environ.get("NLU_EXECUTOR_QUEUE", str(DEFAULT_MAX_QUEUE))),
+            torch_threads=threads,
+            batching_engine=batching_engine,
+        )
+
+    def _make_pool(self) -> Executor:
+        if self.kind == "thread":
+            # torch's intra-op pool is process-wide, so it is capped once here
+            if self.torch_threads:
+                _set_torch_threads(self.torch_threads)
+            return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="nlu-worker")
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_process_worker_init,
+            initargs=(self.torch_threads,),
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) on the pool and await the result.
+        In process mode fn and its arguments must be picklable (module-level functions).
+        """
+        with self._lock:
+            if self._in_flight >= self._capacity:
+                self.rejected += 1
+                raise ExecutorSaturated(f"{self._in_flight} NLU calls in flight (limit {self._capacity})")
+            self._in_flight += 1
+        try:
+            future = self._pool.submit(partial(fn, *args, **kwargs))
+        except Exception:
+            self._release()
+            raise
+        # released when the work finishes, even if the awaiting request was cancelled
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "torch_threads": self.torch_threads,
+            "batching_engine": self.batching_engine,
+            "in_flight": self._in_flight,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
@@ -2,18 +2,46 @@
 FastAPI service for NLP endpoints.
 This will be fully implemented in Day 7, but provides a stub structure.
 """
+import logging
+import os
 from typing import Dict, List, Optional
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
+from src.integration.inference_executor import ExecutorSaturated, InferenceExecutor
+
 # Import NLP components
 try:
-    from src.nlu.entity_extractor import combined_nlu
+    from src.nlu import entity_extractor
+    from src.nlu.entity_extractor import combined_nlu, combined_nlu_batch
     from src.dialogue_manager.dialogue_manager import DialogueManager
+    from src.dialogue_manager.session_store import RedisSessionStore, SessionConflict, SessionStore
+    from src.dialogue_manager.phrase_registry import DEFAULT_PHRASE_REGISTRY
 except ImportError:
     # Fallback for testing
+    entity_extractor = None
     combined_nlu = None
+    combined_nlu_batch = None
     DialogueManager = None
+    SessionStore = None
+    RedisSessionStore = None
+    SessionConflict = RuntimeError
+    DEFAULT_PHRASE_REGISTRY = None
+
+logger = logging.getLogger(__name__)
+
+# Micro-batching settings for the shared intent engine
+INTENT_MAX_BATCH_SIZE = int(os.environ.get("INTENT_MAX_BATCH_SIZE", "16"))
+INTENT_MAX_WAIT_MS = float(os.environ.get("INTENT_MAX_WAIT_MS", "5"))
+# Dialogue sessions kept in memory and their idle timeout (seconds)
+DIALOGUE_MAX_SESSIONS = int(os.environ.get("DIALOGUE_MAX_SESSIONS", "10000"))
+DIALOGUE_SESSION_TTL = float(os.environ.get("DIALOGUE_SESSION_TTL", "1800"))
+# "memory" (per process) or "redis" (shared by all replicas; needs REDIS_URL)
+DIALOGUE_STORE = os.environ.get("DIALOGUE_STORE", "memory").lower()
+REDIS_URL = os.environ.get("REDIS_URL", "")
+# Upper bound on texts accepted by one /nlu/batch request
+NLU_BATCH_MAX_TEXTS = int(os.environ.get("NLU_BATCH_MAX_TEXTS", "256"))
 
 
 # Initialize FastAPI app
@@ -23,16 +51,74 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Global dialogue manager instance
-dialogue_manager = None
+# One DialogueManager per session_id
+session_store = None
+
+# Executor running NLU off the event loop (NLU_EXECUTOR, NLU_EXECUTOR_WORKERS, ...)
+nlu_executor = None
+
+
+def get_session_store():
+    """Get or create the dialogue session store."""
+    global session_store
+    if session_store is None and DialogueManager is not None:
+        if DIALOGUE_STORE == "redis":
+            session_store = RedisSessionStore.from_url(REDIS_URL, DialogueManager, ttl=DIALOGUE_SESSION_TTL)
+        else:
+            session_store = SessionStore(DialogueManager, max_sessions=DIALOGUE_MAX_SESSIONS, ttl=DIALOGUE_SESSION_TTL)
+    return session_store
+
+
+async def run_dialogue_turn(store, session_id: Optional[str], user_input: str, nlu_result: dict):
+    """One DialogueManager turn; stores doing network I/O run it off the event loop."""
+    def turn(dm):
+        return dm.handle_turn(user_input, nlu_result)
+
+    if getattr(store, "blocking_io", False):
+        return await run_in_threadpool(store.run_turn, session_id, turn)
+    return store.run_turn(session_id, turn)
+
+
+def get_nlu_executor() -> InferenceExecutor:
+    """Get or create the bounded NLU executor."""
+    global nlu_executor
+    if nlu_executor is None:
+        engine = entity_extractor._SHARED_INTENT_ENGINE if entity_extractor is not None else None
+        nlu_executor = InferenceExecutor.from_env(batching_engine=engine is not None)
+    return nlu_executor
+
+
+async def run_nlu(fn, *args, **kwargs):
+    """Run an NLU call on the executor; 503 with Retry-After when it is saturated."""
+    try:
+        return await get_nlu_executor().run(fn, *args, **kwargs)
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=f"NLU service busy: {e}", headers={"Retry-After": "1"})
+
 
+@app.on_event("startup")
+def load_intent_engine():
+    """Load the intent model once and start the batching engine shared by /nlu and /dialogue."""
+    # process workers load their own copy of the model (see inference_executor)
+    if entity_extractor is not None and InferenceExecutor.kind_from_env() != "process":
+        try:
+            entity_extractor.load_intent_engine_if_available(
+                max_batch_size=INTENT_MAX_BATCH_SIZE,
+                max_wait_ms=INTENT_MAX_WAIT_MS,
+            )
+        except Exception as e:
+            logger.warning(f"Intent engine not started: {e}. Falling back to per-request inference.")
+    # created after the engine: whether it runs decides the torch thread cap
+    get_nlu_executor()
 
-def get_dialogue_manager():
-    """Get or create dialogue manager instance."""
-    global dialogue_manager
-    if dialogue_manager is None and DialogueManager is not None:
-        dialogue_manager = DialogueManager()
-    return dialogue_manager
+
+@app.on_event("shutdown")
+def stop_intent_engine():
+    """Stop the NLU executor and the batching worker thread."""
+    if nlu_executor is not None:
+        nlu_executor.shutdown(wait=False)
+    if entity_extractor is not None and entity_extractor._SHARED_INTENT_ENGINE is not None:
+        entity_extractor._SHARED_INTENT_ENGINE.stop(timeout=5)
 
 
 # Request/Response models
@@ -42,6 +128,12 @@ class NLURequest(BaseModel):
     use_token_classifier: bool = False
 
 
+class NLUBatchRequest(BaseModel):
+    texts: List[str]
+    top_k_intents: int = 1
+    use_token_classifier: bool = False
+
+
 class DialogueRequest(BaseModel):
     user_input: str
     session_id: Optional[str] = None
@@ -51,11 +143,22 @@ class NLUResponse(BaseModel):
     text: str
     intents: List[Dict]
     entities: List[Dict]
+    tier: Optional[str] = None
+
+
+class NLUBatchItem(NLUResponse):
+    error: Optional[str] = None
+
+
+class NLUBatchResponse(BaseModel):
+    results: List[NLUBatchItem]
 
 
 class DialogueResponse(BaseModel):
     response: str
     session_id: Optional[str] = None
+    # response split into fixed phrases (phrase_id set, reusable TTS audio) and slot values (phrase_id None)
+    phrases: List[Dict] = []
 
 
 # Health check endpoint
@@ -91,16 +194,81 @@ async def nlu_endpoint(request: NLURequest):
         raise HTTPException(status_code=503, detail="NLU service not available")
     
     try:
-        result = combined_nlu(
+        result = await run_nlu(
+            combined_nlu,
             request.text,
             top_k_intents=request.top_k_intents,
             use_token_classifier=request.use_token_classifier
         )
         return NLUResponse(**result)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"NLU processing error: {str(e)}")
 
 
+@app.post("/nlu/batch", response_model=NLUBatchResponse)
+async def nlu_batch_endpoint(request: NLUBatchRequest):
+    """
+    Batch NLU: one batched intent forward pass for all texts that need the transformer.
+    
+    Args:
+        request: NLUBatchRequest with texts and options
+    
+    Returns:
+        NLUBatchResponse with one result per text, in request order; a failed
+        text has empty intents/entities and its message in "error"
+    """
+    if combined_nlu_batch is None:
+        raise HTTPException(status_code=503, detail="NLU service not available")
+    if len(request.texts) > NLU_BATCH_MAX_TEXTS:
+        raise HTTPException(status_code=413, detail=f"At most {NLU_BATCH_MAX_TEXTS} texts per batch")
+    
+    try:
+        results = await run_nlu(
+            combined_nlu_batch,
+            request.texts,
+            top_k_intents=request.top_k_intents,
+            use_token_classifier=request.use_token_classifier
+        )
+        return NLUBatchResponse(results=[NLUBatchItem(**r) for r in results])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"NLU processing error: {str(e)}")
+
+
+@app.get("/nlu/cache")
+def nlu_cache_stats():
+    """Hit/miss counters and size of the NLU result cache."""
+    if entity_extractor is None:
+        raise HTTPException(status_code=503, detail="NLU service not available")
+    return {**entity_extractor.NLU_RESULT_CACHE.stats(), "model_version": entity_extractor.nlu_model_version()}
+
+
+@app.get("/dialogue/sessions")
+def dialogue_session_stats():
+    """Live session count and expiry/eviction counters."""
+    store = get_session_store()
+    if store is None:
+        raise HTTPException(status_code=503, detail="Dialogue manager not available")
+    return store.stats()
+
+
+@app.get("/dialogue/phrases")
+def dialogue_phrases():
+    """Every fixed phrase the dialogue manager can say, by phrase_id (for TTS pre-synthesis)."""
+    if DEFAULT_PHRASE_REGISTRY is None:
+        raise HTTPException(status_code=503, detail="Dialogue manager not available")
+    return DEFAULT_PHRASE_REGISTRY.phrases()
+
+
+@app.get("/nlu/executor")
+def nlu_executor_stats():
+    """Pool size, in-flight calls and 503 rejections of the NLU executor."""
+    return get_nlu_executor().stats()
+
+
 # Dialogue endpoint
 @app.post("/dialogue", response_model=DialogueResponse)
 async def dialogue_endpoint(request: DialogueRequest):
@@ -113,24 +281,29 @@ async def dialogue_endpoint(request: DialogueRequest):
     Returns:
         DialogueResponse with assistant response
     """
-    dm = get_dialogue_manager()
-    if dm is None:
+    store = get_session_store()
+    if store is None:
         raise HTTPException(status_code=503, detail="Dialogue manager not available")
     
     if combined_nlu is None:
         raise HTTPException(status_code=503, detail="NLU service not available")
     
     try:
-        # Get NLU result
-        nlu_result = combined_nlu(request.user_input)
+        # Get NLU result (off the event loop); dialogue state stays in this process
+        nlu_result = await run_nlu(combined_nlu, request.user_input)
         
-        # Get response from dialogue manager
-        response = dm.handle_turn(request.user_input, nlu_result)
+        # Get response from this session's dialogue manager (new session if no/unknown id)
+        session_id, response = await run_dialogue_turn(store, request.session_id, request.user_input, nlu_result)
         
         return DialogueResponse(
             response=response,
-            session_id=request.session_id
+            session_id=session_id,
+            phrases=DEFAULT_PHRASE_REGISTRY.segment(response)
         )
+    except HTTPException:
+        raise
+    except SessionConflict as e:
+        raise HTTPException(status_code=409, detail=f"Concurrent turns on this session: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Dialogue processing error: {str(e)}")
 
@@ -138,13 +311,16 @@ async def dialogue_endpoint(request: DialogueRequest):
 # Reset session endpoint
 @app.post("/dialogue/reset")
 async def reset_session(session_id: Optional[str] = None):
-    """Reset dialogue manager session."""
-    dm = get_dialogue_manager()
-    if dm is None:
+    """Reset dialogue manager session (drops its state; the next turn starts fresh)."""
+    store = get_session_store()
+    if store is None:
         raise HTTPException(status_code=503, detail="Dialogue manager not available")
     
     try:
-        dm.reset()
+        if session_id is not None and getattr(store, "blocking_io", False):
+            await run_in_threadpool(store.delete, session_id)
+        elif session_id is not None:
+            store.delete(session_id)
         return {"status": "reset", "session_id": session_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Reset error: {str(e)}")
@@ -0,0 +1,143 @@
+"""
+Rule-first intent cascade: cheap tiers answer confident utterances so that only
+ambiguous ones pay for a DistilBERT forward pass.
+
+Tiers (first one that answers wins):
+1. "rules"       - exact (normalized) training phrases from intents.json, e.g. "check balance",
+                   "hello", and bare slot answers such as "5000", "savings", "tomorrow".
+2. "linear"      - logistic regression (SGD) over hashed word/char n-grams trained on intents.json;
+                   answers when its (sigmoid-calibrated) top probability >= threshold.
+3. "transformer" - everything else escalates to the intent classifier (see entity_extractor).
+
+Place at: src/nlu/cascade.py
+"""
+import json
+from typing import Dict, List, Optional, Tuple
+
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import FeatureUnion, make_pipeline
+
+try:
+    from src.nlu.preprocessing import normalize_text  # type: ignore
+except Exception:
+    from preprocessing import normalize_text  # type: ignore
+
+INTENTS_PATH = "data/intents/intents.json"
+DEFAULT_THRESHOLD = 0.9
+RULE_CONFIDENCE = 0.95
+SLOT_ANSWER_CONFIDENCE = 0.9
+
+# Intent implied by an utterance that is nothing but a slot value
+SLOT_ANSWER_INTENTS = {
+    "amount": "money_transfer",
+    "phone_number": "money_transfer",
+    "account_type": "balance_inquiry",
+    "date": "set_reminder",
+    "loan_id": "loan_query",
+}
+# Words that may surround a bare slot answer ("it's 5000 rupees", "my savings account")
+SLOT_FILLER_WORDS = {
+    "its", "it", "is", "my", "the", "a", "to", "on", "for", "of", "please", "ok", "okay",
+    "rs", "rupees", "inr", "account", "number", "id", "loan", "due", "date",
+}
+
+
+class HashedNgramIntentModel:
+    def __init__(self, n_features: int = 2 ** 16, alpha: float = 1e-4):
+        features = FeatureUnion([
+            ("word", HashingVectorizer(ngram_range=(1, 2), n_features=n_features, alternate_sign=False, norm="l2")),
+            ("char", HashingVectorizer(analyzer="char_wb", ngram_range=(2, 4), n_features=n_features,
+                                       alternate_sign=False, norm="l2")),
+        ])
+        # SGD-trained logistic regression: sub-second fit at startup even with 2^16 buckets
+        linear = SGDClassifier(loss="log_loss", alpha=alpha, max_iter=50, tol=None, random_state=0)
+        classifier = CalibratedClassifierCV(linear, method="sigmoid", cv=3)
+        self.pipeline = make_pipeline(features, classifier)
+        self.labels: List[str] = []
+
+    def fit(self, texts: List[str], labels: List[str]):
+        self.pipeline.fit([normalize_text(t) for t in texts], labels)
+        self.labels = [str(c) for c in self.pipeline.classes_]
+        return self
+
+    def predict(self, text: str, top_k: int = 1) -> List[Tuple[str, float]]:
+        probs = self.pipeline.predict_proba([normalize_text(text)])[0]
+        order = probs.argsort()[::-1][:max(1, top_k)]
+        return [(self.labels[i], float(probs[i])) for i in order]
+
+
+def load_training_examples(intents_json_path: str = INTENTS_PATH) -> Tuple[List[str], List[str]]:
+    with open(intents_json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    texts, labels = [], []
+    for intent_name, obj in data.items():
+        for ex in obj.get("examples", []):
+            texts.append(ex)
+            labels.append(intent_name)
+    return texts, labels
+
+
+class IntentCascade:
+    def __init__(self, phrase_table: Dict[str, str], linear_model: Optional[HashedNgramIntentModel],
+                 threshold: float = DEFAULT_THRESHOLD):
+        """
+        phrase_table: normalized utterance -> intent (only phrases with a single intent)
+        linear_model: fitted HashedNgramIntentModel, or None to skip the linear tier
+        threshold: minimum calibrated confidence for the linear tier to answer
+        """
+        self.phrase_table = phrase_table
+        self.linear_model = linear_model
+        self.threshold = threshold
+
+    @classmethod
+    def from_intents_file(cls, intents_json_path: str = INTENTS_PATH, threshold: float = DEFAULT_THRESHOLD):
+        texts, labels = load_training_examples(intents_json_path)
+        phrase_intents: Dict[str, set] = {}
+        for text, label in zip(texts, labels):
+            phrase_intents.setdefault(normalize_text(text), set()).add(label)
+        phrase_table = {p: next(iter(i)) for p, i in phrase_intents.items() if p and len(i) == 1}
+        return cls(phrase_table, HashedNgramIntentModel().fit(texts, labels), threshold=threshold)
+
+    def _slot_answer_intent(self, text: str, entities: List[Dict]) -> Optional[str]:
+        """Intent for utterances made only of slot values (plus filler words), else None."""
+        # loan_id regex also matches "<word> <number>" (e.g. "transfer 500"); only trust single tokens
+        entities = [
+            e for e in entities
+            if e.get("entity") != "loan_id" or len(text[e["start"]:e["end"]].split()) == 1
+        ]
+        if not entities:
+            return None
+        remainder = list(text)
+        for ent in entities:
+            remainder[ent["start"]:ent["end"]] = " " * (ent["end"] - ent["start"])
+        leftover = normalize_text("".join(remainder)).split()
+        if any(w not in SLOT_FILLER_WORDS for w in leftover):
+            return None
+        for ent in entities:
+            intent = SLOT_ANSWER_INTENTS.get(ent.get("entity"))
+            if intent:
+                return intent
+        return None
+
+    def classify(self, text: str, entities: List[Dict], top_k: int = 1) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Run the cheap tiers. Returns (intents, tier) where tier is "rules" or "linear",
+        or ([], None) when the utterance must escalate to the transformer.
+        """
+        normalized = normalize_text(text or "")
+        if not normalized:
+            return [], None
+
+        intent = self.phrase_table.get(normalized) or self._slot_answer_intent(text, entities)
+        if intent:
+            conf = RULE_CONFIDENCE if normalized in self.phrase_table else SLOT_ANSWER_CONFIDENCE
+            return [{"intent": intent, "confidence": conf}], "rules"
+
+        if self.linear_model is not None:
+            preds = self.linear_model.predict(text, top_k=top_k)
+            if preds and preds[0][1] >= self.threshold:
+                return [{"intent": lab, "confidence": score} for lab, score in preds], "linear"
+
+        return [], None
@@ -12,9 +12,14 @@ Place at: src/nlu/entity_extractor.py
 """
 import re
 import os
+import unicodedata
 import json
+import logging
+from bisect import bisect_right
 from typing import List, Dict, Tuple
 
+logger = logging.getLogger(__name__)
+
 # --- quick regex extractors (reliable for amounts/dates/upi/last4) ---
 # Amounts like:
 # - 1000 rupees, 500 rs, 250 inr
@@ -32,16 +37,18 @@ AMOUNT_PATTERN = re.compile(
     r")",
     flags=re.IGNORECASE,
 )
-ACCOUNT_TYPE_PATTERN = re.compile(r"\b(savings?|current)\b", flags=re.IGNORECASE)
+ACCOUNT_TYPE_WORDS = r"savings?|current"
+ACCOUNT_TYPE_PATTERN = re.compile(r"\b(" + ACCOUNT_TYPE_WORDS + r")\b", flags=re.IGNORECASE)
 UPI_PATTERN = re.compile(r"\b[A-Za-z0-9.\-_]{2,256}@[A-Za-z]{2,}\b")
 # Indian phone number pattern (10 digits, optional country code +91 or 0)
 PHONE_PATTERN = re.compile(r"[0-9][0-9\s\-\(\)]{6,20}[0-9]") 
 
 LAST4_PATTERN = re.compile(r"\b(?:\d{4})\b")
+DATE_WORDS = r"today|tomorrow|yesterday"
 DATE_SIMPLE_PATTERN = re.compile(
     r"\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}(?=[^\d]|$)"  # Dates like 12/03/2023
     r"|\b\d{1,2}\s(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s?\d{2,4}(?=[^\d]|$)"  # 15 December
-    r"|\b(?:today|tomorrow|yesterday)\b",  # Words for relative dates
+    r"|\b(?:" + DATE_WORDS + r")\b",  # Words for relative dates
     flags=re.IGNORECASE,
 )
 
@@ -82,28 +89,33 @@ def extract_amounts_regex(text):
     - 500, 1000, 5000 (standalone numbers)
     """
     text = _normalize_currency_glitches(text or "")
-    results = []
-    matches = list(AMOUNT_PATTERN.finditer(text))
+    spans = [(m.start(), m.end()) for m in AMOUNT_PATTERN.finditer(text)]
+    return _amounts_from_spans(text, spans)
+
 
+# Unit hints used when merging split amounts ("100" + "0 rupees")
+_AMOUNT_UNIT_OR_K = re.compile(r"rupees|rs|inr|[kK]", flags=re.IGNORECASE)
+_AMOUNT_UNIT = re.compile(r"rupees|rs|inr", flags=re.IGNORECASE)
+
+def _amounts_from_spans(text: str, spans: List[Tuple[int, int]]) -> List[Dict]:
+    """Build amount entities from AMOUNT_PATTERN match spans (in finditer order)."""
+    results = []
     i = 0
-    while i < len(matches):
-        m = matches[i]
-        raw = m.group().strip()
-        start = m.start()
-        end = m.end()
+    while i < len(spans):
+        start, end = spans[i]
+        raw = text[start:end].strip()
 
         # Look ahead to merge split amounts like "100" + "0 rupees"
-        if i + 1 < len(matches):
-            nxt = matches[i + 1]
-            raw_next = nxt.group()
+        if i + 1 < len(spans):
+            nxt_start, nxt_end = spans[i + 1]
+            raw_next = text[nxt_start:nxt_end]
 
             # If current chunk has no currency word but next does,
             # and they are adjacent / near each other, merge them.
-            if (not re.search(r"rupees|rs|inr|[kK]", raw, flags=re.IGNORECASE)
-                and re.search(r"rupees|rs|inr", raw_next, flags=re.IGNORECASE)
-                and nxt.start() <= end + 1):
-                start = start
-                end = nxt.end()
+            if (not _AMOUNT_UNIT_OR_K.search(raw)
+                and _AMOUNT_UNIT.search(raw_next)
+                and nxt_start <= end + 1):
+                end = nxt_end
                 raw = text[start:end].strip()
                 i += 1  # consume the next match as well
 
@@ -177,15 +189,18 @@ def normalize_amount(raw_amount: str) -> str:
 
 
 def extract_dates_regex(text):
+    return _dates_from_spans(text, [m.span() for m in DATE_SIMPLE_PATTERN.finditer(text)])
+
+def _dates_from_spans(text, spans):
     results = []
-    for m in DATE_SIMPLE_PATTERN.finditer(text):
-        raw = m.group()
+    for start, end in spans:
+        raw = text[start:end]
         value = raw.rstrip(".,)")
         results.append({
             "entity": "date",
             "value": value,
-            "start": m.start(),
-            "end": m.end(),   # original end
+            "start": start,
+            "end": end,   # original end
         })
     return results
 
@@ -193,9 +208,12 @@ def extract_dates_regex(text):
 
 
 def extract_phone_number_regex(text):
+    return _phone_numbers_from_spans(text, [m.span() for m in PHONE_PATTERN.finditer(text)])
+
+def _phone_numbers_from_spans(text, spans):
     entities = []
-    for match in PHONE_PATTERN.finditer(text):
-        raw = match.group()
+    for start, end in spans:
+        raw = text[start:end]
         normalized = re.sub(r"[^0-9]", "", raw)   # remove spaces, dashes, brackets etc.
 
         # validate number length
@@ -204,8 +222,8 @@ def extract_phone_number_regex(text):
                 "entity": "phone_number",
                 "value": raw,
                 "normalized": normalized,
-                "start": match.start(),
-                "end": match.end(),
+                "start": start,
+                "end": end,
             })
     return entities
 
@@ -214,15 +232,18 @@ LOAN_ID_PATTERN = re.compile(r"\b(?:[a-zA-Z]\s?){2,10}(?:\d\s?){2,10}\b"
 )  # Example pattern, tweak for your formats
 
 def extract_loan_id_regex(text):
+    return _loan_ids_from_spans(text, [m.span() for m in LOAN_ID_PATTERN.finditer(text)])
+
+def _loan_ids_from_spans(text, spans):
     results = []
-    for m in LOAN_ID_PATTERN.finditer(text):
-        raw = m.group()
+    for start, end in spans:
+        raw = text[start:end]
         normalized = raw.replace(" ", "")   # remove space between loan and 123
         results.append({
             "entity": "loan_id",
             "value": normalized,
-            "start": m.start(),
-            "end": m.end()
+            "start": start,
+            "end": end
         })
     return results
 
@@ -230,32 +251,97 @@ def extract_loan_id_regex(text):
 
 
 def extract_last4_regex(text):
+    return _last4_from_spans(text, [m.span() for m in LAST4_PATTERN.finditer(text)])
+
+def _last4_from_spans(text, spans):
     results = []
-    for m in LAST4_PATTERN.finditer(text):
+    for start, end in spans:
         results.append({
             "entity": "last4",
-            "value": m.group(),
-            "start": m.start(),
-            "end": m.end()
+            "value": text[start:end],
+            "start": start,
+            "end": end
         })
     return results
 
 
 def extract_account_type_regex(text):
+    text = text or ""
+    return _account_types_from_spans(text, [m.span() for m in ACCOUNT_TYPE_PATTERN.finditer(text)])
+
+def _account_types_from_spans(text, spans):
     results = []
-    for m in ACCOUNT_TYPE_PATTERN.finditer(text or ""):
-        raw = m.group()
+    for start, end in spans:
+        raw = text[start:end]
         normalized = "savings" if raw.lower().startswith("sav") else "current"
         results.append({
             "entity": "account_type",
             "value": raw,
             "normalized": normalized,
-            "start": m.start(),
-            "end": m.end()
+            "start": start,
+            "end": end
         })
     return results
 
 
+# -------------------------
+# Entity scanner
+# -------------------------
+# Every extractor pattern except the relative-date and account-type words needs a digit.
+# Most utterances ("check my savings balance", "hello") have none, so one alternation
+# with named groups covers them in a single pass. Texts with digits run the per-type
+# patterns, which CPython's re scans faster one by one (each gets its own first-char
+# skip loop) than as one combined lookahead alternation.
+_HAS_DIGIT = re.compile(r"\d")
+_WORD_ENTITY_SCANNER = re.compile(
+    r"\b(?:(?P<date>" + DATE_WORDS + r")|(?P<account_type>" + ACCOUNT_TYPE_WORDS + r"))\b",
+    flags=re.IGNORECASE,
+)
+_SCANNER_PATTERNS = (
+    ("date", DATE_SIMPLE_PATTERN, _dates_from_spans),
+    ("phone_number", PHONE_PATTERN, _phone_numbers_from_spans),
+    ("amount", AMOUNT_PATTERN, _amounts_from_spans),
+    ("last4", LAST4_PATTERN, _last4_from_spans),
+    ("account_type", ACCOUNT_TYPE_PATTERN, _account_types_from_spans),
+    ("loan_id", LOAN_ID_PATTERN, _loan_ids_from_spans),
+)
+
+def scan_entities(text: str) -> Dict[str, List[Dict]]:
+    """
+    Find all regex entity candidates.
+    Returns {entity_type: [entities in extractor order]} for every scanner type,
+    identical to running the extract_*_regex functions one by one.
+    """
+    text = text or ""
+    if not _HAS_DIGIT.search(text):
+        spans = {name: [] for name, _, _ in _SCANNER_PATTERNS}
+        for m in _WORD_ENTITY_SCANNER.finditer(text):
+            spans[m.lastgroup].append(m.span())
+        return {name: builder(text, spans[name]) for name, _, builder in _SCANNER_PATTERNS}
+
+    out = {
+        name: builder(text, [m.span() for m in pattern.finditer(text)])
+        for name, pattern, builder in _SCANNER_PATTERNS
+    }
+    if "\u00E2" in text and _normalize_currency_glitches(text) != text:
+        # amounts are matched on the mojibake-fixed text (offsets may differ); both
+        # mojibake forms of the rupee sign start with "\u00E2"
+        out["amount"] = extract_amounts_regex(text)
+    return out
+
+def _scan_entities_sequential(text: str) -> Dict[str, List[Dict]]:
+    """Reference path: one extractor (and one regex scan) per entity type."""
+    text = text or ""
+    return {
+        "date": extract_dates_regex(text),
+        "phone_number": extract_phone_number_regex(text),
+        "amount": extract_amounts_regex(text),
+        "last4": extract_last4_regex(text),
+        "account_type": extract_account_type_regex(text),
+        "loan_id": extract_loan_id_regex(text),
+    }
+
+
 # -------------------------
 # Optional: token-classifier scaffolding (HuggingFace)
 # -------------------------
@@ -363,6 +449,29 @@ except Exception:
         predict_intent = None
         load_trained_model = None
 
+try:
+    from src.nlu.preprocessing import normalize_text  # type: ignore
+    from src.nlu.nlu_cache import NLUResultCache  # type: ignore
+except Exception:
+    from preprocessing import normalize_text  # type: ignore
+    from nlu_cache import NLUResultCache  # type: ignore
+
+try:
+    from src.nlu.cascade import IntentCascade  # type: ignore
+except Exception:
+    try:
+        from cascade import IntentCascade  # type: ignore
+    except Exception:
+        IntentCascade = None
+
+try:
+    from src.nlu.inference_engine import IntentInferenceEngine  # type: ignore
+except Exception:
+    try:
+        from inference_engine import IntentInferenceEngine  # type: ignore
+    except Exception:
+        IntentInferenceEngine = None
+
 # Single shared token-classifier instance (if you load one)
 _SHARED_TOKEN_CLASSIFIER = None
 
@@ -371,24 +480,123 @@ _SHARED_INTENT_MODEL = None
 _SHARED_INTENT_TOKENIZER = None
 _SHARED_INTENT_ID2LABEL = None
 
-def load_intent_model_if_available(model_dir: str = "models/intent_classifier"):
-    """Load and cache the intent classification model."""
-    global _SHARED_INTENT_MODEL, _SHARED_INTENT_TOKENIZER, _SHARED_INTENT_ID2LABEL
+# Single shared micro-batching engine wrapping the intent model
+_SHARED_INTENT_ENGINE = None
+
+# Rule-first cascade in front of the transformer (see src/nlu/cascade.py)
+INTENT_CASCADE = os.environ.get("INTENT_CASCADE", "true").lower() in ("1", "true", "yes")
+INTENT_CASCADE_THRESHOLD = float(os.environ.get("INTENT_CASCADE_THRESHOLD", "0.9"))
+_SHARED_INTENT_CASCADE = None
+_INTENT_CASCADE_FAILED = False
+
+# Identifies the loaded intent model; part of every NLU cache key
+_INTENT_MODEL_VERSION = "none"
+
+# Shared cache of full combined_nlu results (NLU_CACHE_SIZE=0 disables it)
+NLU_RESULT_CACHE = NLUResultCache(
+    maxsize=int(os.environ.get("NLU_CACHE_SIZE", "10000")),
+    ttl=float(os.environ.get("NLU_CACHE_TTL", "300")),
+)
+
+# Intent model execution backend: "pytorch" (default) or "onnx"
+INTENT_BACKEND = os.environ.get("INTENT_BACKEND", "pytorch")
+# Use the INT8 weights produced by src/nlu/quantization.py (pytorch backend only)
+INTENT_QUANTIZED = os.environ.get("INTENT_QUANTIZED", "false").lower() in ("1", "true", "yes")
+
+def _load_quantized_backend(model_dir: str):
+    try:
+        from src.nlu.quantization import load_quantized_model  # type: ignore
+    except Exception:
+        from quantization import load_quantized_model  # type: ignore
+    return load_quantized_model(model_dir)
+
+def _load_onnx_backend(model_dir: str):
+    try:
+        from src.nlu.onnx_backend import load_onnx_model  # type: ignore
+    except Exception:
+        from onnx_backend import load_onnx_model  # type: ignore
+    return load_onnx_model(model_dir)
+
+def _model_dir_version(model_dir: str) -> str:
+    """Latest modification time of the model artifacts; changes whenever the model is retrained."""
+    try:
+        return str(int(max(os.path.getmtime(os.path.join(model_dir, f)) for f in os.listdir(model_dir))))
+    except (OSError, ValueError):
+        return "0"
+
+def nlu_model_version() -> str:
+    """Version of everything that decides intents: loaded model + cascade settings."""
+    cascade = f"{INTENT_CASCADE_THRESHOLD}" if INTENT_CASCADE else "off"
+    return f"{_INTENT_MODEL_VERSION}|cascade={cascade}"
+
+def load_intent_model_if_available(model_dir: str = "models/intent_classifier", backend: str = None, quantized: bool = None):
+    """
+    Load and cache the intent classification model.
+    backend: "pytorch" or "onnx" (defaults to INTENT_BACKEND / the INTENT_BACKEND env var).
+    quantized: load model_int8.pt instead of the FP32 weights (defaults to INTENT_QUANTIZED).
+    """
+    global _SHARED_INTENT_MODEL, _SHARED_INTENT_TOKENIZER, _SHARED_INTENT_ID2LABEL, _INTENT_MODEL_VERSION
     if _SHARED_INTENT_MODEL is not None:
         return _SHARED_INTENT_MODEL, _SHARED_INTENT_TOKENIZER, _SHARED_INTENT_ID2LABEL
     
-    if load_trained_model is None:
+    backend = (backend or INTENT_BACKEND).lower()
+    if backend not in ("pytorch", "onnx"):
+        raise ValueError(f"Unknown intent backend: {backend}")
+    quantized = INTENT_QUANTIZED if quantized is None else quantized
+    if backend == "pytorch" and load_trained_model is None:
         raise RuntimeError("Intent classifier module not available.")
+    if backend == "onnx" and quantized:
+        raise ValueError("Quantized weights are only available for the pytorch backend.")
     
     try:
-        model, tokenizer, _, id2label = load_trained_model(model_dir)
+        if backend == "onnx":
+            model, tokenizer, _, id2label = _load_onnx_backend(model_dir)
+        elif quantized:
+            model, tokenizer, _, id2label = _load_quantized_backend(model_dir)
+        else:
+            model, tokenizer, _, id2label = load_trained_model(model_dir)
         _SHARED_INTENT_MODEL = model
         _SHARED_INTENT_TOKENIZER = tokenizer
         _SHARED_INTENT_ID2LABEL = id2label
+        _INTENT_MODEL_VERSION = f"{backend}{'-int8' if quantized else ''}@{_model_dir_version(model_dir)}"
         return model, tokenizer, id2label
     except Exception as e:
         raise RuntimeError(f"Failed to load intent model from {model_dir}: {str(e)}")
 
+def load_intent_engine_if_available(model_dir: str = "models/intent_classifier", backend: str = None,
+                                    quantized: bool = None, **engine_kwargs):
+    """
+    Load (or reuse) the shared intent model and wrap it in a started IntentInferenceEngine.
+    engine_kwargs are passed to IntentInferenceEngine (max_batch_size, max_wait_ms, device, ...).
+    """
+    global _SHARED_INTENT_ENGINE
+    if _SHARED_INTENT_ENGINE is not None:
+        return _SHARED_INTENT_ENGINE
+
+    if IntentInferenceEngine is None:
+        raise RuntimeError("Intent inference engine not available.")
+
+    model, tokenizer, id2label = load_intent_model_if_available(model_dir, backend=backend, quantized=quantized)
+    engine = IntentInferenceEngine(model, tokenizer, id2label, **engine_kwargs)
+    engine.start()
+    _SHARED_INTENT_ENGINE = engine
+    return engine
+
+def load_intent_cascade_if_available(intents_path: str = "data/intents/intents.json"):
+    """Build (once) the rule + hashed n-gram tiers from intents.json; None if unavailable."""
+    global _SHARED_INTENT_CASCADE, _INTENT_CASCADE_FAILED
+    if _SHARED_INTENT_CASCADE is not None or _INTENT_CASCADE_FAILED:
+        return _SHARED_INTENT_CASCADE
+    if IntentCascade is None:
+        _INTENT_CASCADE_FAILED = True
+        return None
+    try:
+        _SHARED_INTENT_CASCADE = IntentCascade.from_intents_file(intents_path, threshold=INTENT_CASCADE_THRESHOLD)
+    except Exception as e:
+        logger.warning(f"Intent cascade unavailable: {e}. Every utterance goes to the transformer.")
+        _INTENT_CASCADE_FAILED = True
+    return _SHARED_INTENT_CASCADE
+
 def load_token_classifier_if_available(model_dir: str):
     global _SHARED_TOKEN_CLASSIFIER
     if not HF_AVAILABLE:
@@ -397,76 +605,95 @@ def load_token_classifier_if_available(model_dir: str):
     _SHARED_TOKEN_CLASSIFIER = tc
     return tc
 
+# -------------------------
+# Overlap resolution (interval sweep)
+# -------------------------
+# Lower number wins when two entities overlap; unknown types (loan_id, token-classifier labels) rank last
+ENTITY_PRIORITY = {"date": 0, "phone_number": 1, "amount": 2, "last4": 3, "account_type": 4}
+
+def _merge_spans(ents: List[Dict]) -> List[Tuple[int, int]]:
+    """Sorted, disjoint (start, end) intervals covering every non-empty entity span."""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted((e["start"], e["end"]) for e in ents if e["start"] < e["end"]):
+        if merged and start < merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def _overlaps_any(spans: List[Tuple[int, int]], span_ends: List[int], start: int, end: int) -> bool:
+    """True if [start, end) overlaps one of spans (from _merge_spans); empty spans never overlap."""
+    if start >= end:
+        return False
+    i = bisect_right(span_ends, start)
+    return i < len(spans) and spans[i][0] < end
+
+def drop_overlapping(ents: List[Dict], protected: List[Dict]) -> List[Dict]:
+    """Entities from ents that do not overlap any entity in protected."""
+    spans = _merge_spans(protected)
+    if not spans:
+        return list(ents)
+    span_ends = [end for _, end in spans]
+    return [e for e in ents if not _overlaps_any(spans, span_ends, e["start"], e["end"])]
+
+def resolve_entity_overlaps(ents: List[Dict], priority: Dict[str, int] = ENTITY_PRIORITY) -> List[Dict]:
+    """
+    Keep a non-overlapping subset of ents in start order.
+    Entities are swept by (start, priority, longest first); one is kept unless it overlaps an
+    already kept entity. Kept spans all start at or before the current one, so tracking the
+    furthest kept end is enough: O(n log n) in the number of entities, independent of text length.
+    """
+    ents_sorted = sorted(ents, key=lambda e: (
+        e["start"],
+        priority.get(e["entity"], 99),  # Lower priority number = higher priority
+        -(e["end"] - e["start"])  # Longer entities first for same type
+    ))
+    final = []
+    kept_end = -1
+    for e in ents_sorted:
+        if e["start"] < e["end"]:
+            if e["start"] < kept_end:
+                continue
+            kept_end = e["end"]
+        final.append(e)
+    return final
+
 def predict_entities(text: str, use_token_classifier: bool = False) -> List[Dict]:
     """
     Run hybrid extraction and return deduped list of entities with type, span, and value.
-    Priority: dates > upi > amounts > last4 > token-classifier
+    Priority: date > phone_number > amount > last4 > account_type > loan_id / token-classifier
     """
     text = text or ""
     ents = []
+    # All regex candidates in a single pass (see scan_entities)
+    scanned = scan_entities(text)
     
     # Extract dates first to protect them from other extractions
-    date_ents = extract_dates_regex(text)
-    date_spans = set()
-    for de in date_ents:
-        date_spans.update(range(de["start"], de["end"]))
+    date_ents = scanned["date"]
     ents.extend(date_ents)
     
     # Extract phone numbers (shouldn't conflict with dates)
-    ents.extend(extract_phone_number_regex(text))
+    ents.extend(scanned["phone_number"])
 
-    
-    # Extract amounts, but exclude those that overlap with dates
-    amount_ents = extract_amounts_regex(text)
-    for ae in amount_ents:
-        amount_span = set(range(ae["start"], ae["end"]))
-        if not (amount_span & date_spans):
-            ents.append(ae)
-    
-    # Extract last4, but exclude those that overlap with dates
-    last4_ents = extract_last4_regex(text)
-    for le in last4_ents:
-        last4_span = set(range(le["start"], le["end"]))
-        if not (last4_span & date_spans):
-            ents.append(le)
-    
+    # Extract amounts and last4, but exclude those that overlap with dates
+    ents.extend(drop_overlapping(scanned["amount"], date_ents))
+    ents.extend(drop_overlapping(scanned["last4"], date_ents))
 
     # Extract simple account types
-    ents.extend(extract_account_type_regex(text))
-
-    # Extract simple account types
-    ents.extend(extract_account_type_regex(text))
+    ents.extend(scanned["account_type"])
 
     # Extract loan IDs -- ADD THIS RIGHT AFTER ACCOUNT TYPE EXTRACTION
-    ents.extend(extract_loan_id_regex(text))
+    ents.extend(scanned["loan_id"])
 
     if use_token_classifier and _SHARED_TOKEN_CLASSIFIER is not None:
         try:
             tc_ents = _SHARED_TOKEN_CLASSIFIER.predict(text)
-            # token-classifier returns spans in character offsets; just extend
+            # token-classifier returns spans in character offsets; resolved together with the regex ones
             ents.extend(tc_ents)
         except Exception:
             pass
 
-    # deduplicate overlapping entities with priority: date > upi > amount > last4 > token-classifier
-    # Priority order for entity types
-    priority_order = {"date": 0, "phone_number": 1, "amount": 2, "last4": 3, "account_type": 4}
-
-    
-    ents_sorted = sorted(ents, key=lambda e: (
-        e["start"],
-        priority_order.get(e["entity"], 99),  # Lower priority number = higher priority
-        -(e["end"] - e["start"])  # Longer entities first for same type
-    ))
-    final = []
-    occupied = set()
-    for e in ents_sorted:
-        rng = set(range(e["start"], e["end"]))
-        if rng & occupied:
-            continue
-        final.append(e)
-        occupied |= rng
-    return final
+    return resolve_entity_overlaps(ents)
 
 def _rule_based_intents(text: str) -> List[Dict]:
     """Simple heuristic fallback when ML intent model isn't available."""
@@ -498,69 +725,189 @@ def _rule_based_intents(text: str) -> List[Dict]:
     return []
 
 
-def combined_nlu(text: str, top_k_intents: int = 1, use_token_classifier: bool = False) -> Dict:
+def _transformer_intents(text: str, top_k: int = 1) -> List[Dict]:
+    """Intent prediction with the transformer model; [] when unavailable or failing."""
+    if predict_intent is None:
+        return []
+    try:
+        # Prefer the shared batching engine, then the cached model
+        if _SHARED_INTENT_ENGINE is not None:
+            intents = _SHARED_INTENT_ENGINE.predict(text, top_k=top_k)
+        elif (
+            _SHARED_INTENT_MODEL is not None
+            and _SHARED_INTENT_TOKENIZER is not None
+            and _SHARED_INTENT_ID2LABEL is not None
+        ):
+            intents = predict_intent(
+                text,
+                model=_SHARED_INTENT_MODEL,
+                tokenizer=_SHARED_INTENT_TOKENIZER,
+                id2label=_SHARED_INTENT_ID2LABEL,
+                top_k=top_k,
+            )
+        else:
+            # Try to load model if not cached
+            try:
+                engine = load_intent_engine_if_available()
+                intents = engine.predict(text, top_k=top_k)
+            except Exception as load_err:
+                logger.warning(f"Failed to load cached intent model: {load_err}. Using fallback.")
+                intents = predict_intent(text, top_k=top_k)
+
+        return [{"intent": lab, "confidence": float(score)} for lab, score in intents]
+    except Exception as e:
+        logger.error(f"Intent prediction failed: {str(e)}", exc_info=True)
+        return []
+
+
+def _transformer_intents_batch(texts: List[str], top_k: int = 1) -> List[List[Dict]]:
     """
-    Returns:
-    {
+    Intent predictions for many texts with batched forward passes (IntentInferenceEngine.predict_batch).
+    Falls back to one _transformer_intents() call per text if the engine cannot be used.
+    """
+    if not texts or predict_intent is None:
+        return [[] for _ in texts]
+    try:
+        engine = _SHARED_INTENT_ENGINE or load_intent_engine_if_available()
+        batched = engine.predict_batch(texts, top_k=top_k)
+        return [[{"intent": lab, "confidence": float(score)} for lab, score in row] for row in batched]
+    except Exception as e:
+        logger.warning(f"Batched intent prediction unavailable: {e}. Predicting one text at a time.")
+        return [_transformer_intents(t, top_k=top_k) for t in texts]
+
+
+def _copy_nlu_result(result: Dict, text: str) -> Dict:
+    return {
+        **result,
         "text": text,
-        "intents": [{"intent": <str>, "confidence": <float>}],
-        "entities": [{"entity": <type>, "value": <str>, "start": <int>, "end": <int>}]
+        "intents": [dict(i) for i in result["intents"]],
+        "entities": [dict(e) for e in result["entities"]],
     }
+
+
+def _cache_normalize(text: str) -> str:
+    """
+    Unicode-aware key text: NFC, casefolded, punctuation/symbols dropped, whitespace collapsed.
+    (normalize_text is ASCII-only and would map every Devanagari utterance to the same key.)
     """
-    nlu = {"text": text, "intents": [], "entities": []}
-    intents_payload: List[Dict] = []
-    # intent
-    if predict_intent is not None:
+    text = unicodedata.normalize("NFC", text).casefold()
+    text = "".join(ch for ch in text if unicodedata.category(ch)[0] not in "PS")
+    return " ".join(text.split())
+
+
+def _nlu_cache_key(text: str, top_k_intents: int, use_token_classifier: bool) -> Tuple:
+    return (_cache_normalize(text or ""), top_k_intents, use_token_classifier, nlu_model_version())
+
+
+def _cached_nlu(text: str, top_k_intents: int, use_token_classifier: bool):
+    """Result for text from NLU_RESULT_CACHE, or None on a miss."""
+    cached = NLU_RESULT_CACHE.get(_nlu_cache_key(text, top_k_intents, use_token_classifier))
+    if cached is None:
+        return None
+    result = _copy_nlu_result(cached, text)
+    if cached["text"] != text and cached["entities"]:
+        result["entities"] = predict_entities(text, use_token_classifier=use_token_classifier)
+    return result
+
+
+def combined_nlu(text: str, top_k_intents: int = 1, use_token_classifier: bool = False) -> Dict:
+    """
+    Cached front of _combined_nlu_uncached(); see NLU_RESULT_CACHE.
+    Keyed on normalize_text(text), the options and nlu_model_version(). A hit for the exact
+    same text skips the transformer and all entity extractors. Texts that only normalize
+    alike reuse the intents but re-extract entities, since spans refer to the raw text.
+    """
+    if not NLU_RESULT_CACHE.enabled:
+        return _combined_nlu_uncached(text, top_k_intents, use_token_classifier)
+
+    cached = _cached_nlu(text, top_k_intents, use_token_classifier)
+    if cached is not None:
+        return cached
+
+    result = _combined_nlu_uncached(text, top_k_intents, use_token_classifier)
+    # key built after the call: the first request may have loaded the model
+    NLU_RESULT_CACHE.put(_nlu_cache_key(text, top_k_intents, use_token_classifier), _copy_nlu_result(result, text))
+    return result
+
+
+def combined_nlu_batch(texts: List[str], top_k_intents: int = 1, use_token_classifier: bool = False) -> List[Dict]:
+    """
+    combined_nlu() for a list of texts; results come back in input order.
+    Cache hits and cascade answers are resolved per text, every remaining text goes through
+    the transformer together (one tokenizer call + forward pass per engine batch).
+    A text that fails gets {"text", "intents": [], "entities": [], "tier": None, "error": <message>}
+    instead of failing the whole batch; successful items carry "error": None.
+    """
+    results: List[Dict] = [None] * len(texts)
+    computed: List[int] = []  # indices not served from the cache
+    pending: List[int] = []  # indices that still need the transformer
+    for i, text in enumerate(texts):
         try:
-            # Try to use cached model first
-            if (
-                _SHARED_INTENT_MODEL is not None
-                and _SHARED_INTENT_TOKENIZER is not None
-                and _SHARED_INTENT_ID2LABEL is not None
-            ):
-                intents = predict_intent(
-                    text,
-                    model=_SHARED_INTENT_MODEL,
-                    tokenizer=_SHARED_INTENT_TOKENIZER,
-                    id2label=_SHARED_INTENT_ID2LABEL,
-                    top_k=top_k_intents,
-                )
-            else:
-                # Try to load model if not cached
-                try:
-                    model, tokenizer, id2label = load_intent_model_if_available()
-                    intents = predict_intent(
-                        text,
-                        model=model,
-                        tokenizer=tokenizer,
-                        id2label=id2label,
-                        top_k=top_k_intents,
-                    )
-                except Exception as load_err:
-                    import logging
-
-                    logger = logging.getLogger(__name__)
-                    logger.warning(f"Failed to load cached intent model: {load_err}. Using fallback.")
-                    intents = predict_intent(text, top_k=top_k_intents)
-            
-            intents_payload = [{"intent": lab, "confidence": float(score)} for lab, score in intents]
+            if NLU_RESULT_CACHE.enabled:
+                cached = _cached_nlu(text, top_k_intents, use_token_classifier)
+                if cached is not None:
+                    results[i] = {**cached, "error": None}
+                    continue
+            results[i] = _nlu_before_transformer(text, top_k_intents, use_token_classifier)
+            computed.append(i)
+            if not results[i]["intents"]:
+                pending.append(i)
         except Exception as e:
-            import logging
+            logger.error(f"NLU failed for batch item {i}: {e}", exc_info=True)
+            results[i] = {"text": text, "intents": [], "entities": [], "tier": None, "error": str(e)}
+
+    batched = _transformer_intents_batch([texts[i] for i in pending], top_k=top_k_intents)
+    for i, intents in zip(pending, batched):
+        _finish_nlu(results[i], intents)
+
+    for i in computed:
+        if NLU_RESULT_CACHE.enabled:
+            NLU_RESULT_CACHE.put(_nlu_cache_key(texts[i], top_k_intents, use_token_classifier),
+                                 _copy_nlu_result(results[i], texts[i]))
+        results[i]["error"] = None
+    return results
 
-            logger = logging.getLogger(__name__)
-            logger.error(f"Intent prediction failed: {str(e)}", exc_info=True)
-            intents_payload = []
-    else:
-        intents_payload = []
 
-    if not intents_payload:
-        intents_payload = _rule_based_intents(text)
-    nlu["intents"] = intents_payload
-    # entities
+def _nlu_before_transformer(text: str, top_k_intents: int, use_token_classifier: bool) -> Dict:
+    """Entities plus the cheap cascade tiers; intents stay [] when the transformer is needed."""
+    nlu = {"text": text, "intents": [], "entities": [], "tier": None}
+    # entities (also used by the cascade to spot bare slot answers)
     ents = predict_entities(text, use_token_classifier=use_token_classifier)
     nlu["entities"] = ents
+
+    cascade = load_intent_cascade_if_available() if INTENT_CASCADE else None
+    if cascade is not None:
+        nlu["intents"], nlu["tier"] = cascade.classify(text, ents, top_k=top_k_intents)
+    return nlu
+
+
+def _finish_nlu(nlu: Dict, transformer_intents: List[Dict]) -> Dict:
+    """Fill in the transformer answer, or the keyword rules when there is none."""
+    intents_payload, tier = transformer_intents, "transformer" if transformer_intents else None
+    if not intents_payload:
+        intents_payload = _rule_based_intents(nlu["text"])
+        tier = "fallback" if intents_payload else None
+    nlu["intents"] = intents_payload
+    nlu["tier"] = tier
     return nlu
 
+
+def _combined_nlu_uncached(text: str, top_k_intents: int = 1, use_token_classifier: bool = False) -> Dict:
+    """
+    Returns:
+    {
+        "text": text,
+        "intents": [{"intent": <str>, "confidence": <float>}],
+        "entities": [{"entity": <type>, "value": <str>, "start": <int>, "end": <int>}],
+        "tier": "rules" | "linear" | "transformer" | "fallback" | None
+    }
+    """
+    # intent: cheap cascade tiers first, transformer only for ambiguous utterances
+    nlu = _nlu_before_transformer(text, top_k_intents, use_token_classifier)
+    if nlu["intents"]:
+        return nlu
+    return _finish_nlu(nlu, _transformer_intents(text, top_k=top_k_intents))
+
 # -------------------------
 # Optional: Trainer helper (brief scaffold)
 # -------------------------
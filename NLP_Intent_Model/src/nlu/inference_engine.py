@@ -0,0 +1,186 @@
+"""
+Micro-batching inference engine for the intent classifier.
+
+- The model is moved to its device and switched to eval mode once, and the
+  id2label mapping is flattened into a list once, instead of on every call.
+- Concurrent callers (the /nlu and /dialogue endpoints) submit single utterances
+  with submit()/predict(); a background worker groups them into dynamically padded
+  batches (padding only up to the longest text in the batch) and runs one forward
+  pass per batch.
+- A batch is flushed when it reaches max_batch_size or when the oldest request
+  has waited max_wait_ms, whichever comes first.
+- predict_batch(texts) runs a list of texts directly in the caller's thread.
+
+Place at: src/nlu/inference_engine.py
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 16
+DEFAULT_MAX_WAIT_MS = 5.0
+DEFAULT_MAX_LENGTH = 128
+
+_STOP = object()
+
+
+def id2label_to_list(id2label: Dict) -> List[str]:
+    """Flatten an id2label mapping (str or int keys) into a list indexed by label id."""
+    by_id = {int(k): v for k, v in id2label.items()}
+    return [by_id[i] for i in range(len(by_id))]
+
+
+class _PendingRequest:
+    __slots__ = ("text", "top_k", "future")
+
+    def __init__(self, text: str, top_k: int):
+        self.text = text
+        self.top_k = top_k
+        self.future: Future = Future()
+
+
+class IntentInferenceEngine:
+    def __init__(
+        self,
+        model,
+        tokenizer,
+        id2label: Dict,
+        device: Optional[str] = None,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        max_length: int = DEFAULT_MAX_LENGTH,
+    ):
+        """
+        model/tokenizer/id2label: as returned by intent_classifier.load_trained_model()
+        max_batch_size: upper bound on utterances per forward pass
+        max_wait_ms: how long the first request of a batch may wait for company
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.model = model.to(self.device)
+        self.model.eval()
+        self.tokenizer = tokenizer
+        self.labels = id2label_to_list(id2label)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_length = max_length
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def start(self):
+        """Start the batching worker thread (idempotent)."""
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name="intent-batcher", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the worker after it drains the requests already queued."""
+        with self._lock:
+            worker = self._worker
+            self._worker = None
+        if worker is None:
+            return
+        self._queue.put(_STOP)
+        worker.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and self._worker.is_alive()
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    def submit(self, text: str, top_k: int = 1) -> Future:
+        """Queue one utterance; the returned Future resolves to [(intent, prob), ...]."""
+        if not self.running:
+            self.start()
+        req = _PendingRequest(text or "", top_k)
+        self._queue.put(req)
+        return req.future
+
+    def predict(self, text: str, top_k: int = 1, timeout: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Blocking convenience wrapper around submit()."""
+        return self.submit(text, top_k=top_k).result(timeout=timeout)
+
+    def predict_batch(self, texts: List[str], top_k: int = 1) -> List[List[Tuple[str, float]]]:
+        """Classify a list of texts in the caller's thread, in chunks of max_batch_size."""
+        results: List[List[Tuple[str, float]]] = []
+        for i in range(0, len(texts), self.max_batch_size):
+            chunk = [t or "" for t in texts[i:i + self.max_batch_size]]
+            results.extend(self._forward(chunk, [top_k] * len(chunk)))
+        return results
+
+    # -------------------------
+    # Internals
+    # -------------------------
+    def _forward(self, texts: List[str], top_ks: List[int]) -> List[List[Tuple[str, float]]]:
+        inputs = self.tokenizer(
+            texts,
+            return_tensors="pt",
+            truncation=True,
+            padding=True,  # pad to the longest text in this batch only
+            max_length=self.max_length,
+        )
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        with torch.inference_mode():
+            logits = self.model(**inputs).logits
+            probs = torch.softmax(logits, dim=-1)
+            k = max(1, min(max(top_ks), probs.shape[-1]))
+            top_probs, top_idx = torch.topk(probs, k, dim=-1)
+        top_probs = top_probs.cpu().tolist()
+        top_idx = top_idx.cpu().tolist()
+
+        results = []
+        for row_probs, row_idx, row_k in zip(top_probs, top_idx, top_ks):
+            row_k = max(1, row_k)
+            results.append([(self.labels[i], float(p)) for i, p in zip(row_idx[:row_k], row_probs[:row_k])])
+        return results
+
+    def _collect(self, first: _PendingRequest) -> Tuple[List[_PendingRequest], bool]:
+        """Gather requests until the batch is full or the wait budget is spent."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch, stop = self._collect(item)
+            batch = [req for req in batch if req.future.set_running_or_notify_cancel()]
+            if batch:
+                try:
+                    outputs = self._forward([r.text for r in batch], [r.top_k for r in batch])
+                    for req, out in zip(batch, outputs):
+                        req.future.set_result(out)
+                except Exception as e:
+                    logger.error(f"Batched intent inference failed: {e}", exc_info=True)
+                    for req in batch:
+                        req.future.set_exception(e)
+            if stop:
+                return
@@ -8,6 +8,7 @@ You already have these installed in your venv.
 How to run (example):
 > python src/nlu/intent_classifier.py --train
 > python src/nlu/intent_classifier.py --predict "How much money do I have?"
+> python src/nlu/intent_classifier.py --export_onnx
 """
 
 import os
@@ -33,6 +34,7 @@ from transformers import (
 # -----------------------
 DEFAULT_MODEL_NAME = "distilbert-base-uncased"  # lightweight, fast to fine-tune
 OUTPUT_DIR = "models/intent_classifier"
+ONNX_FILENAME = "model.onnx"
 INTENTS_PATH = "data/intents/intents.json"
 RANDOM_SEED = 42
 
@@ -219,6 +221,46 @@ def predict_intent(text: str, model=None, tokenizer=None, id2label=None, device=
         results = [(id2label[str(i)] if isinstance(list(id2label.keys())[0], str) else id2label[i], float(probs[i])) for i in topk_idx]
     return results
 
+# -----------------------
+# ONNX export
+# -----------------------
+def export_onnx(model_dir: str = OUTPUT_DIR, onnx_path: str = None, opset: int = 14) -> str:
+    """
+    Export the saved checkpoint to ONNX with dynamic batch and sequence axes.
+    The graph takes input_ids + attention_mask and returns logits.
+    Returns the path of the written .onnx file (defaults to <model_dir>/model.onnx).
+    """
+    import inspect
+
+    onnx_path = onnx_path or os.path.join(model_dir, ONNX_FILENAME)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+    model.eval()
+
+    sample = tokenizer(["check my balance", "transfer 500 rupees"], return_tensors="pt", padding=True)
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        export_kwargs["dynamo"] = False  # newer torch defaults to the dynamo exporter
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            onnx_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=opset,
+            do_constant_folding=True,
+            **export_kwargs,
+        )
+    print(f"ONNX model exported to {onnx_path}")
+    return onnx_path
+
 # -----------------------
 # CLI
 # -----------------------
@@ -229,11 +271,15 @@ def main():
     parser.add_argument("--epochs", type=int, default=3)
     parser.add_argument("--batch_size", type=int, default=8)
     parser.add_argument("--predict", type=str, default=None, help="Run a sample prediction")
+    parser.add_argument("--export_onnx", action="store_true", help="Export the saved model to ONNX")
     args = parser.parse_args()
 
     if args.train:
         train(model_name=args.model_name, epochs=args.epochs, batch_size=args.batch_size)
 
+    if args.export_onnx:
+        export_onnx()
+
     if args.predict:
         # load model and run prediction
         print("Predicting:", args.predict)
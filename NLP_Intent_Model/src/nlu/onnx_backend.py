@@ -0,0 +1,80 @@
+"""
+ONNX Runtime execution backend for the intent classifier.
+
+- OnnxIntentModel wraps an onnxruntime InferenceSession behind the small part of the
+  HF model interface the rest of the code uses (to(), eval(), model(**inputs).logits),
+  so predict_intent() and IntentInferenceEngine work with it unchanged.
+- load_onnx_model() mirrors intent_classifier.load_trained_model() and returns
+  (model, tokenizer, label2id, id2label).
+- The .onnx file is produced by `python src/nlu/intent_classifier.py --export_onnx`.
+
+Requirements: onnxruntime (CPU build is enough)
+
+Place at: src/nlu/onnx_backend.py
+"""
+import os
+import json
+from types import SimpleNamespace
+from typing import Optional
+
+import numpy as np
+import torch
+from transformers import AutoTokenizer
+
+try:
+    import onnxruntime as ort
+    ORT_AVAILABLE = True
+except Exception:
+    ort = None
+    ORT_AVAILABLE = False
+
+DEFAULT_MODEL_DIR = "models/intent_classifier"
+ONNX_FILENAME = "model.onnx"
+
+
+def _to_numpy(value) -> np.ndarray:
+    if isinstance(value, torch.Tensor):
+        return value.detach().cpu().numpy().astype(np.int64, copy=False)
+    return np.asarray(value, dtype=np.int64)
+
+
+class OnnxIntentModel:
+    def __init__(self, onnx_path: str, intra_op_threads: int = 0):
+        """
+        onnx_path: exported graph with inputs input_ids/attention_mask and output logits
+        intra_op_threads: ORT intra-op thread count (0 lets ORT decide)
+        """
+        if not ORT_AVAILABLE:
+            raise RuntimeError("onnxruntime is required for the ONNX backend.")
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.intra_op_num_threads = intra_op_threads
+        self.onnx_path = onnx_path
+        self.session = ort.InferenceSession(onnx_path, sess_options=opts, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    # HF-compatible no-ops: the session is fixed to CPU and always in inference mode
+    def to(self, device):
+        return self
+
+    def eval(self):
+        return self
+
+    def __call__(self, **inputs):
+        feeds = {k: _to_numpy(v) for k, v in inputs.items() if k in self.input_names}
+        logits = self.session.run(["logits"], feeds)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+def load_onnx_model(model_dir: str = DEFAULT_MODEL_DIR, onnx_path: Optional[str] = None, intra_op_threads: int = 0):
+    """Load tokenizer + label maps from model_dir and the ONNX graph next to them."""
+    onnx_path = onnx_path or os.path.join(model_dir, ONNX_FILENAME)
+    if not os.path.exists(onnx_path):
+        raise FileNotFoundError(f"No ONNX model at {onnx_path}; run intent_classifier.py --export_onnx first.")
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = OnnxIntentModel(onnx_path, intra_op_threads=intra_op_threads)
+    with open(os.path.join(model_dir, "label2id.json"), "r", encoding="utf-8") as fh:
+        label2id = json.load(fh)
+    with open(os.path.join(model_dir, "id2label.json"), "r", encoding="utf-8") as fh:
+        id2label = json.load(fh)
+    return model, tokenizer, label2id, id2label
@@ -0,0 +1,121 @@
+"""
+INT8 dynamic quantization for the intent classifier.
+
+- Quantizes every nn.Linear of the saved FP32 DistilBERT checkpoint to INT8
+  (torch dynamic quantization: weights stored as int8, activations quantized on the fly).
+- Evaluates FP32 and INT8 on the held-out test split produced by prepare_datasets().
+- Only publishes the INT8 weights (model_int8.pt next to the FP32 artifacts) when the
+  accuracy drop is within max_accuracy_drop; otherwise nothing is written.
+- load_quantized_model() mirrors intent_classifier.load_trained_model().
+
+How to run (example):
+> python src/nlu/quantization.py --max_accuracy_drop 0.01
+
+Place at: src/nlu/quantization.py
+"""
+import os
+import json
+import argparse
+from typing import List
+
+import torch
+from torch.ao.quantization import quantize_dynamic
+from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+
+try:
+    from src.nlu.intent_classifier import OUTPUT_DIR, load_trained_model, prepare_datasets  # type: ignore
+except Exception:
+    from intent_classifier import OUTPUT_DIR, load_trained_model, prepare_datasets  # type: ignore
+
+QUANTIZED_FILENAME = "model_int8.pt"
+REPORT_FILENAME = "quantization_report.json"
+DEFAULT_MAX_ACCURACY_DROP = 0.01
+
+
+def quantize_model(model):
+    """Return an INT8 dynamically quantized copy of model's Linear layers."""
+    model.eval()
+    return quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def evaluate_accuracy(model, tokenizer, texts: List[str], labels: List[str], id2label, batch_size: int = 32) -> float:
+    """Fraction of texts whose argmax intent equals the expected label name."""
+    if not texts:
+        raise ValueError("No evaluation examples.")
+    by_id = {int(k): v for k, v in id2label.items()}
+    model.eval()
+    correct = 0
+    for i in range(0, len(texts), batch_size):
+        inputs = tokenizer(texts[i:i + batch_size], return_tensors="pt", truncation=True, padding=True, max_length=128)
+        with torch.no_grad():
+            preds = model(**inputs).logits.argmax(-1).tolist()
+        correct += sum(by_id[p] == lab for p, lab in zip(preds, labels[i:i + batch_size]))
+    return correct / len(texts)
+
+
+def quantize_intent_model(model_dir: str = OUTPUT_DIR, max_accuracy_drop: float = DEFAULT_MAX_ACCURACY_DROP) -> dict:
+    """
+    Quantize the saved model, gate on held-out accuracy and publish model_int8.pt.
+    Returns the report dict; report["published"] is False when the gate rejected the model.
+    """
+    model, tokenizer, _, id2label = load_trained_model(model_dir)
+    _, _, test_ds, _, split_id2label, _ = prepare_datasets(tokenizer)
+    texts = list(test_ds.texts)
+    labels = [split_id2label[int(l)] for l in test_ds.labels]
+
+    fp32_acc = evaluate_accuracy(model, tokenizer, texts, labels, id2label)
+    qmodel = quantize_model(model)
+    int8_acc = evaluate_accuracy(qmodel, tokenizer, texts, labels, id2label)
+    drop = fp32_acc - int8_acc
+
+    report = {
+        "fp32_accuracy": fp32_acc,
+        "int8_accuracy": int8_acc,
+        "accuracy_drop": drop,
+        "max_accuracy_drop": max_accuracy_drop,
+        "num_examples": len(texts),
+        "published": drop <= max_accuracy_drop,
+    }
+    print(f"FP32 accuracy: {fp32_acc:.4f} | INT8 accuracy: {int8_acc:.4f} | drop: {drop:.4f}")
+
+    if not report["published"]:
+        print(f"Accuracy drop exceeds {max_accuracy_drop:.4f}; quantized model NOT published.")
+        return report
+
+    torch.save(qmodel.state_dict(), os.path.join(model_dir, QUANTIZED_FILENAME))
+    with open(os.path.join(model_dir, REPORT_FILENAME), "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Quantized model saved to {os.path.join(model_dir, QUANTIZED_FILENAME)}")
+    return report
+
+
+def load_quantized_model(model_dir: str = OUTPUT_DIR):
+    """Rebuild the INT8 model from config + model_int8.pt; returns (model, tokenizer, label2id, id2label)."""
+    weights_path = os.path.join(model_dir, QUANTIZED_FILENAME)
+    if not os.path.exists(weights_path):
+        raise FileNotFoundError(f"No quantized model at {weights_path}; run quantization.py first.")
+    config = AutoConfig.from_pretrained(model_dir)
+    model = quantize_model(AutoModelForSequenceClassification.from_config(config))
+    model.load_state_dict(torch.load(weights_path, map_location="cpu"))
+    model.eval()
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    with open(os.path.join(model_dir, "label2id.json"), "r", encoding="utf-8") as fh:
+        label2id = json.load(fh)
+    with open(os.path.join(model_dir, "id2label.json"), "r", encoding="utf-8") as fh:
+        id2label = json.load(fh)
+    return model, tokenizer, label2id, id2label
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model_dir", type=str, default=OUTPUT_DIR)
+    parser.add_argument("--max_accuracy_drop", type=float, default=DEFAULT_MAX_ACCURACY_DROP,
+                        help="Refuse to publish if INT8 accuracy is lower than FP32 by more than this")
+    args = parser.parse_args()
+    report = quantize_intent_model(args.model_dir, max_accuracy_drop=args.max_accuracy_drop)
+    if not report["published"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Compiled policy: slot bitmasks, precomputed prompts and pre-parsed success templates.
+File: tests/dialogue_manager/test_compiled_policy.py
+"""
+import pytest
+
+from src.dialogue_manager.compiled_policy import COMPILED_POLICY, CompiledIntent
+from src.dialogue_manager.fallback_handler import FallbackHandler
+from src.dialogue_manager.policy_rules import POLICY
+from src.dialogue_manager.slot_manager import SLOT_BITS, SlotManager
+
+
+def test_every_policy_intent_is_compiled():
+    assert set(COMPILED_POLICY) == set(POLICY)
+    transfer = COMPILED_POLICY["money_transfer"]
+    assert transfer.required_mask == SLOT_BITS["amount"] | SLOT_BITS["phone_number"]
+    assert COMPILED_POLICY["greeting"].required_mask == 0
+
+
+def test_prompts_follow_required_slot_order():
+    transfer = COMPILED_POLICY["money_transfer"]
+    both = transfer.required_mask
+    assert transfer.prompt(both, has_context=False) == FallbackHandler.prompt_for_slot("amount")
+    assert transfer.prompt(SLOT_BITS["phone_number"], has_context=True) == \
+        FallbackHandler().handle_missing_slots(["phone_number"], filled_slots={"amount": "500"})
+
+
+def test_render_matches_str_format():
+    slots = SlotManager()
+    slots.fill_slots({"amount": "500", "phone_number": "98765", "date": "tomorrow", "account_type": "savings"})
+    for name, cfg in POLICY.items():
+        if cfg["required_slots"]:
+            assert COMPILED_POLICY[name].render_success(slots.slots) == cfg["success_message"].format(**slots.slots)
+
+
+def test_render_keeps_format_specs_and_key_errors():
+    intent = CompiledIntent("custom", {"required_slots": ["amount"], "success_message": "{amount!r:>8}|{missing}"})
+    with pytest.raises(KeyError):
+        intent.render_success({"amount": "5"})
+    intent = CompiledIntent("custom", {"required_slots": ["amount"], "success_message": "{amount!r:>8}"})
+    assert intent.render_success({"amount": "5"}) == "{!r:>8}".format("5")
+
+
+def test_unknown_required_slot_is_rejected():
+    with pytest.raises(ValueError):
+        CompiledIntent("bad", {"required_slots": ["upi_id"]})
+
+
+def test_slot_manager_mask_tracks_values():
+    slots = SlotManager()
+    slots.fill_slots({"phone_number": "98765", "not_a_slot": "x"})
+    assert slots.filled_mask == SLOT_BITS["phone_number"] | SLOT_BITS["phone_number_spelled"]
+    slots.set_slot("phone_number", None)
+    assert slots.missing_mask(SLOT_BITS["phone_number"]) == SLOT_BITS["phone_number"]
+    slots.reset()
+    assert slots.filled_mask == 0
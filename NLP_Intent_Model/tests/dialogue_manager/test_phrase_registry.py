@@ -0,0 +1,59 @@
+"""
+Phrase registry: stable IDs for fixed response text and segmentation of rendered responses.
+File: tests/dialogue_manager/test_phrase_registry.py
+"""
+from src.dialogue_manager.dialogue_manager import GREETING_MESSAGE, DialogueManager
+from src.dialogue_manager.fallback_handler import FALLBACK_MESSAGES
+from src.dialogue_manager.phrase_registry import DEFAULT_PHRASE_REGISTRY, PhraseRegistry, phrase_id
+
+
+def _joined(parts):
+    return "".join(p["text"] for p in parts)
+
+
+def test_phrase_ids_are_stable():
+    assert phrase_id("hello") == phrase_id("hello") == "ph_aaf4c61ddcc5"
+    assert phrase_id("hello") != phrase_id("hello!")
+
+
+def test_static_responses_are_single_phrases():
+    for text in (GREETING_MESSAGE, FALLBACK_MESSAGES[0]):
+        assert DEFAULT_PHRASE_REGISTRY.segment(text) == [{"text": text, "phrase_id": phrase_id(text)}]
+
+
+def test_templated_loan_message_has_static_fragments():
+    phrases = DEFAULT_PHRASE_REGISTRY.phrases()
+    assert phrase_id("Your loan details: remaining amount is ₹") in phrases
+
+
+def test_rendered_responses_split_into_fixed_and_variable_parts():
+    dm = DialogueManager()
+    dm.handle_nlu_output("money_transfer", {"amount": "500"}, confidence=0.99)
+    reply = dm.handle_nlu_output("money_transfer", {"phone_number": "9876543210"}, confidence=0.99)
+    parts = DEFAULT_PHRASE_REGISTRY.segment(reply)
+    assert _joined(parts) == reply
+    assert parts == [
+        {"text": "Transferring ₹", "phrase_id": phrase_id("Transferring ₹")},
+        {"text": "500", "phrase_id": None},
+        {"text": " to ", "phrase_id": phrase_id(" to ")},
+        {"text": "nine eight seven six five four three two one zero", "phrase_id": None},
+        {"text": ".", "phrase_id": None},
+    ]
+
+
+def test_loan_status_and_unknown_text():
+    reply = DialogueManager().handle_nlu_output("loan_query", {"loan_id": "Love"}, confidence=0.9)
+    parts = DEFAULT_PHRASE_REGISTRY.segment(reply)
+    assert _joined(parts) == reply
+    assert parts[0]["text"] == "Loan status for Loan I D " and parts[0]["phrase_id"]
+    assert DEFAULT_PHRASE_REGISTRY.segment("something new") == [{"text": "something new", "phrase_id": None}]
+
+
+def test_punctuation_only_fragments_get_no_id():
+    registry = PhraseRegistry()
+    registry.add_template("Sent {amount}.")
+    assert registry.segment("Sent 5.") == [
+        {"text": "Sent ", "phrase_id": phrase_id("Sent ")},
+        {"text": "5", "phrase_id": None},
+        {"text": ".", "phrase_id": None},
+    ]
@@ -0,0 +1,95 @@
+"""
+Redis dialogue sessions: state round-trip, changed-field writes and optimistic versioning.
+File: tests/dialogue_manager/test_redis_session_store.py
+"""
+import pytest
+
+from src.dialogue_manager.dialogue_manager import DialogueManager
+
+
+def test_export_state_round_trip():
+    dm = DialogueManager()
+    dm.handle_nlu_output("money_transfer", {"amount": "500"}, confidence=0.99)
+    dm.fallback.fallback_count = 2
+
+    restored = DialogueManager.from_state(dm.export_state())
+    assert restored.current_intent == "money_transfer" and restored.conversation_active
+    assert restored.slots.slots == dm.slots.slots
+    assert restored.fallback.fallback_count == 2
+    assert restored.state.get_state() == dm.state.get_state()
+    assert restored.state.history == dm.state.history
+    assert "phone_number" not in dm.export_state()["slots"]  # only filled slots are stored
+
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("msgpack")
+pytest.importorskip("lupa")  # fakeredis needs it to run the compare-and-set script
+
+from src.dialogue_manager.session_store import RedisSessionStore, SessionConflict
+
+
+@pytest.fixture
+def client():
+    return fakeredis.FakeRedis()
+
+
+def _store(client, **kwargs):
+    return RedisSessionStore(client, DialogueManager, ttl=60, **kwargs)
+
+
+def _turn(intent, entities):
+    return lambda dm: dm.handle_nlu_output(intent, dict(entities), confidence=0.99)
+
+
+def test_any_replica_continues_the_session(client):
+    replica_a, replica_b = _store(client), _store(client)
+    session_id, reply = replica_a.run_turn(None, _turn("money_transfer", {"amount": "500"}))
+    assert reply == "To whom should I transfer? Please provide the phone number."
+    _, reply = replica_b.run_turn(session_id, _turn("money_transfer", {"phone_number": "9876543210"}))
+    assert reply.startswith("Transferring")
+    assert 0 < client.ttl(f"echofi:dialogue:{session_id}") <= 60
+
+
+def test_only_changed_fields_are_written(client):
+    store = _store(client)
+    session_id, _ = store.run_turn("s1", _turn("money_transfer", {"amount": "500"}))
+    first_write = store.fields_written
+    store.run_turn("s1", lambda dm: dm.current_intent)  # read-only turn
+    assert store.fields_written == first_write
+    assert client.hget("echofi:dialogue:s1", "v") == b"1"
+
+
+def test_concurrent_write_forces_retry_on_fresh_state(client):
+    store, other = _store(client), _store(client)
+    store.run_turn("s1", _turn("money_transfer", {"amount": "500"}))
+    calls = []
+
+    def racing_turn(dm):
+        calls.append(dm.slots.get_slot("amount"))
+        if len(calls) == 1:  # another replica finishes the transfer while this turn is running
+            other.run_turn("s1", _turn("money_transfer", {"phone_number": "9876543210"}))
+        dm.fallback.increment_fallback_count()
+
+    store.run_turn("s1", racing_turn)
+    assert calls == ["500", None]  # the retry ran on the state left by the finished transfer
+    assert store.conflicts == 1
+    restored = store.get("s1")
+    assert restored.current_intent is None and restored.fallback.fallback_count == 1
+
+
+def test_gives_up_after_max_retries(client):
+    store, other = _store(client, max_retries=1), _store(client)
+
+    def always_raced(dm):
+        other.run_turn("s1", _turn("money_transfer", {"amount": "100"}))
+        dm.fallback.fallback_count += 1
+
+    with pytest.raises(SessionConflict):
+        store.run_turn("s1", always_raced)
+
+
+def test_delete_drops_session(client):
+    store = _store(client)
+    store.run_turn("s1", _turn("set_reminder", {}))
+    assert store.get("s1").current_intent == "set_reminder"
+    assert store.delete("s1") and store.get("s1") is None
@@ -0,0 +1,56 @@
+"""
+Dialogue session store: isolation between sessions, idle TTL and LRU eviction.
+File: tests/dialogue_manager/test_session_store.py
+"""
+import time
+
+from src.dialogue_manager.dialogue_manager import DialogueManager
+from src.dialogue_manager.session_store import SessionStore
+
+
+def test_sessions_do_not_share_slots():
+    store = SessionStore(DialogueManager)
+    _, alice = store.get_or_create("alice")
+    _, bob = store.get_or_create("bob")
+    alice.handle_nlu_output("money_transfer", {"amount": "500"}, confidence=0.99)
+
+    assert store.get_or_create("alice")[1] is alice
+    assert alice.slots.get_slot("amount") == "500"
+    assert bob.slots.get_slot("amount") is None
+    assert bob.current_intent is None
+
+
+def test_missing_id_issues_a_new_session():
+    store = SessionStore(DialogueManager)
+    first, _ = store.get_or_create(None)
+    second, _ = store.get_or_create(None)
+    assert first and second and first != second
+    assert len(store) == 2
+
+
+def test_idle_sessions_expire():
+    store = SessionStore(dict, ttl=0.05)
+    _, state = store.get_or_create("s1")
+    state["turn"] = 1
+    time.sleep(0.1)
+    assert store.get("s1") is None
+    assert store.get_or_create("s1")[1] == {}
+    assert store.stats()["expired"] == 1
+
+
+def test_least_recently_used_session_is_evicted():
+    store = SessionStore(dict, max_sessions=2)
+    store.get_or_create("a")
+    store.get_or_create("b")
+    store.get("a")  # "b" is now least recently used
+    store.get_or_create("c")
+    assert store.get("b") is None
+    assert store.get("a") is not None and store.get("c") is not None
+    assert store.stats()["evicted"] == 1
+
+
+def test_delete_resets_session():
+    store = SessionStore(dict)
+    store.get_or_create("a")[1]["x"] = 1
+    assert store.delete("a") and not store.delete("a")
+    assert store.get_or_create("a")[1] == {}
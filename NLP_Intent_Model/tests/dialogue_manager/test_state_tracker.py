@@ -0,0 +1,71 @@
+"""
+StateTracker history: fixed-capacity ring buffer, compact records, spill hook.
+File: tests/dialogue_manager/test_state_tracker.py
+"""
+import gc
+import sys
+
+import pytest
+
+from src.dialogue_manager.dialogue_manager import DialogueManager
+from src.dialogue_manager.state_tracker import StateTracker, TurnRecord
+
+
+def test_history_keeps_only_the_latest_turns():
+    tracker = StateTracker(capacity=3)
+    for i in range(5):
+        tracker.update("money_transfer", {"amount": str(i)})
+    assert [t["entities"]["amount"] for t in tracker.history] == ["2", "3", "4"]
+    assert tracker.get_state() == {"intent": "money_transfer", "entities": {"amount": "4"}}
+
+
+def test_empty_tracker_state():
+    tracker = StateTracker()
+    assert tracker.get_state() == {"intent": None, "entities": {}}
+    assert tracker.history == []
+
+
+def test_spill_receives_evicted_turns_in_order():
+    spilled = []
+    tracker = StateTracker(capacity=2, spill=spilled.append)
+    for intent in ["greeting", "balance_inquiry", "loan_query", "set_reminder"]:
+        tracker.update(intent, {})
+    assert [r.intent for r in spilled] == ["greeting", "balance_inquiry"]
+    assert [t["intent"] for t in tracker.history] == ["loan_query", "set_reminder"]
+
+
+def test_records_are_slotted_and_interned():
+    record = TurnRecord("".join(["money_", "transfer"]), {"amount": "500"})
+    assert not hasattr(record, "__dict__")
+    assert not hasattr(StateTracker(), "__dict__")
+    assert record.intent == "money_transfer"
+    assert record.intent is sys.intern("".join(["money_", "transfer"]))
+    assert record.entities == (("amount", "500"),)
+
+
+def _live_turn_records():
+    gc.collect()
+    return sum(isinstance(o, TurnRecord) for o in gc.get_objects())
+
+
+def test_memory_is_constant_per_session():
+    before = _live_turn_records()
+    tracker = StateTracker(capacity=8)
+    for _ in range(2000):
+        tracker.update("money_transfer", {"amount": "500", "phone_number": "9876543210"})
+    assert len(tracker.history) == 8
+    assert _live_turn_records() - before <= 8
+
+
+def test_dialogue_manager_state_round_trip_keeps_history():
+    dm = DialogueManager()
+    dm.handle_nlu_output("money_transfer", {"amount": "500"}, confidence=0.99)
+    dm.handle_nlu_output("money_transfer", {"phone_number": "9876543210"}, confidence=0.99)
+    restored = DialogueManager.from_state(dm.export_state())
+    assert restored.state.history == dm.state.history
+    assert restored.state.get_state() == dm.state.get_state()
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        StateTracker(capacity=0)
@@ -0,0 +1,78 @@
+"""
+NLU executor: work runs off the event loop and saturation is rejected, not queued forever.
+File: tests/integration/test_inference_executor.py
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.integration import inference_executor
+from src.integration.inference_executor import ExecutorSaturated, InferenceExecutor
+
+
+@pytest.fixture
+def executor():
+    ex = InferenceExecutor(kind="thread", max_workers=1, max_queue=1, torch_threads=1)
+    yield ex
+    ex.shutdown(wait=True)
+
+
+def test_event_loop_stays_responsive(executor):
+    async def scenario():
+        work = asyncio.ensure_future(executor.run(time.sleep, 0.3))
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)  # the loop keeps running while the worker sleeps
+        ticked_after = time.perf_counter() - started
+        await work
+        return ticked_after
+
+    assert asyncio.run(scenario()) < 0.2
+
+
+def test_rejects_when_workers_and_queue_are_full(executor):
+    gate = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(gate.wait, 5))
+        queued = asyncio.ensure_future(executor.run(gate.wait, 5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(str, "rejected")
+        gate.set()
+        await asyncio.gather(running, queued)
+        return await executor.run(str, "accepted")
+
+    assert asyncio.run(scenario()) == "accepted"
+    assert executor.rejected == 1
+    assert executor.in_flight == 0
+
+
+def test_errors_propagate_and_release_the_slot(executor):
+    async def scenario():
+        with pytest.raises(ZeroDivisionError):
+            await executor.run(lambda: 1 / 0)
+
+    asyncio.run(scenario())
+    assert executor.in_flight == 0
+
+
+def test_unknown_kind_is_rejected():
+    with pytest.raises(ValueError):
+        InferenceExecutor(kind="gpu")
+
+
+def test_torch_threads_not_capped_with_batching_engine(monkeypatch):
+    capped = []
+    monkeypatch.setattr(inference_executor, "_set_torch_threads", capped.append)
+    monkeypatch.setattr(inference_executor.os, "cpu_count", lambda: 8)
+
+    shared = InferenceExecutor(kind="thread", max_workers=4, batching_engine=True)
+    shared.shutdown()
+    assert capped == []
+    assert shared.stats()["torch_threads"] == 0
+
+    per_request = InferenceExecutor(kind="thread", max_workers=4)
+    per_request.shutdown()
+    assert capped == [2]
@@ -0,0 +1,66 @@
+"""
+Rule-first intent cascade: which tier answers which utterance.
+File: tests/nlu/test_cascade.py
+"""
+import pytest
+
+pytest.importorskip("sklearn")
+
+from src.nlu.cascade import IntentCascade
+from src.nlu.entity_extractor import predict_entities
+
+
+@pytest.fixture(scope="module")
+def cascade():
+    return IntentCascade.from_intents_file()
+
+
+def classify(cascade, text):
+    return cascade.classify(text, predict_entities(text))
+
+
+@pytest.mark.parametrize("text,intent", [
+    ("Check balance.", "balance_inquiry"),
+    ("hello", "greeting"),
+    ("help me", "help"),
+])
+def test_training_phrases_answered_by_rules(cascade, text, intent):
+    intents, tier = classify(cascade, text)
+    assert tier == "rules"
+    assert intents[0]["intent"] == intent
+
+
+@pytest.mark.parametrize("text,intent", [
+    ("5000", "money_transfer"),
+    ("it's 5000 rupees", "money_transfer"),
+    ("savings", "balance_inquiry"),
+    ("tomorrow", "set_reminder"),
+    ("9876543210", "money_transfer"),
+])
+def test_bare_slot_answers_answered_by_rules(cascade, text, intent):
+    intents, tier = classify(cascade, text)
+    assert tier == "rules"
+    assert intents[0]["intent"] == intent
+
+
+def test_multiword_loan_id_match_is_not_a_slot_answer(cascade):
+    intents, tier = classify(cascade, "transfer 500 to 9876543210")
+    assert tier != "rules"
+
+
+def test_confident_paraphrase_answered_by_linear_tier(cascade):
+    intents, tier = classify(cascade, "please check my balance")
+    assert tier == "linear"
+    assert intents[0]["intent"] == "balance_inquiry"
+    assert intents[0]["confidence"] >= cascade.threshold
+
+
+def test_ambiguous_utterance_escalates(cascade):
+    assert classify(cascade, "how do I do a thing") == ([], None)
+    assert classify(cascade, "") == ([], None)
+
+
+def test_threshold_above_one_disables_linear_tier():
+    strict = IntentCascade.from_intents_file(threshold=1.01)
+    intents, tier = classify(strict, "please check my balance")
+    assert tier is None and intents == []
@@ -0,0 +1,72 @@
+"""
+Interval-based overlap resolution: same result as the per-character set dedup it replaced.
+File: tests/nlu/test_entity_overlaps.py
+"""
+import random
+
+from src.nlu.entity_extractor import ENTITY_PRIORITY, drop_overlapping, resolve_entity_overlaps
+
+TYPES = list(ENTITY_PRIORITY) + ["loan_id", "PERSON"]
+
+
+def _ent(entity, start, end):
+    return {"entity": entity, "start": start, "end": end, "value": "x" * (end - start)}
+
+
+def _set_based_resolve(ents):
+    ents_sorted = sorted(ents, key=lambda e: (e["start"], ENTITY_PRIORITY.get(e["entity"], 99), -(e["end"] - e["start"])))
+    final, occupied = [], set()
+    for e in ents_sorted:
+        rng = set(range(e["start"], e["end"]))
+        if rng & occupied:
+            continue
+        final.append(e)
+        occupied |= rng
+    return final
+
+
+def _set_based_drop(ents, protected):
+    covered = set()
+    for p in protected:
+        covered.update(range(p["start"], p["end"]))
+    return [e for e in ents if not (set(range(e["start"], e["end"])) & covered)]
+
+
+def _random_entities(rng, n, text_len=200):
+    ents = []
+    for _ in range(n):
+        start = rng.randrange(text_len)
+        ents.append(_ent(rng.choice(TYPES), start, min(text_len, start + rng.randrange(0, 15))))
+    return ents
+
+
+def test_priority_wins_on_same_start():
+    date = _ent("date", 0, 6)
+    amount = _ent("amount", 0, 10)
+    assert resolve_entity_overlaps([amount, date]) == [date]
+
+
+def test_adjacent_spans_do_not_overlap():
+    a, b = _ent("amount", 0, 4), _ent("account_type", 4, 11)
+    assert resolve_entity_overlaps([b, a]) == [a, b]
+
+
+def test_later_entity_inside_earlier_one_is_dropped():
+    phone = _ent("phone_number", 3, 13)
+    last4 = _ent("last4", 9, 13)
+    assert resolve_entity_overlaps([last4, phone]) == [phone]
+
+
+def test_resolve_matches_set_based_dedup():
+    rng = random.Random(0)
+    for _ in range(500):
+        ents = _random_entities(rng, rng.randrange(0, 12))
+        assert resolve_entity_overlaps(ents) == _set_based_resolve(ents)
+
+
+def test_drop_overlapping_matches_set_based_filter():
+    rng = random.Random(1)
+    for _ in range(500):
+        ents = _random_entities(rng, rng.randrange(0, 8))
+        protected = _random_entities(rng, rng.randrange(0, 4))
+        assert drop_overlapping(ents, protected) == _set_based_drop(ents, protected)
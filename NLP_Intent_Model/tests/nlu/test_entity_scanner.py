@@ -0,0 +1,50 @@
+"""
+Single-pass entity scanner: must reproduce the per-pattern extractors exactly.
+golden_entities.json holds predict_entities() output recorded before the scanner existed
+(intents.json examples, entity/multilingual samples and edge cases).
+File: tests/nlu/test_entity_scanner.py
+"""
+import json
+import os
+
+import pytest
+
+from src.nlu.entity_extractor import _scan_entities_sequential, predict_entities, scan_entities
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "golden_entities.json")
+
+
+def _load_golden():
+    with open(GOLDEN_PATH, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _canonical(entities):
+    return sorted(
+        (e["entity"], json.dumps(e.get("value"), sort_keys=True), e["start"], e["end"]) for e in entities
+    )
+
+
+GOLDEN = _load_golden()
+
+
+def test_golden_corpus_is_not_empty():
+    assert len(GOLDEN) > 100
+    assert sum(len(case["entities"]) for case in GOLDEN) > 100
+
+
+@pytest.mark.parametrize("case", GOLDEN, ids=lambda c: c["text"][:40])
+def test_predict_entities_matches_golden(case):
+    assert _canonical(predict_entities(case["text"])) == _canonical(case["entities"])
+
+
+def test_scanner_matches_sequential_extractors():
+    for case in GOLDEN:
+        assert scan_entities(case["text"]) == _scan_entities_sequential(case["text"]), case["text"]
+
+
+def test_digit_free_text_uses_word_alternation():
+    scanned = scan_entities("remind me tomorrow about my Savings account")
+    assert [d["value"] for d in scanned["date"]] == ["tomorrow"]
+    assert [a["normalized"] for a in scanned["account_type"]] == ["savings"]
+    assert not scanned["amount"] and not scanned["phone_number"]
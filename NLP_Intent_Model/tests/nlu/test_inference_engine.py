@@ -0,0 +1,93 @@
+"""
+Micro-batching intent engine: batching, ordering and top-k results.
+File: tests/nlu/test_inference_engine.py
+"""
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from src.nlu.inference_engine import IntentInferenceEngine, id2label_to_list
+
+ID2LABEL = {"0": "balance_inquiry", "1": "money_transfer", "2": "greeting"}
+KEYWORDS = ["balance", "transfer", "hello"]
+
+
+class FakeTokenizer:
+    """Encodes each text as keyword hits; pads to the longest text in the call."""
+
+    def __call__(self, texts, return_tensors="pt", truncation=True, padding=True, max_length=128):
+        rows = [[KEYWORDS.index(w) + 1 for w in t.lower().split() if w in KEYWORDS] or [0] for t in texts]
+        width = max(len(r) for r in rows)
+        ids = [r + [0] * (width - len(r)) for r in rows]
+        return {"input_ids": torch.tensor(ids)}
+
+
+class FakeModel(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.batch_sizes = []
+
+    def forward(self, input_ids):
+        self.batch_sizes.append(input_ids.shape[0])
+        logits = torch.zeros(input_ids.shape[0], len(KEYWORDS))
+        for row, ids in enumerate(input_ids.tolist()):
+            for i in ids:
+                if i:
+                    logits[row, i - 1] += 5.0
+        return SimpleNamespace(logits=logits)
+
+
+def make_engine(**kwargs):
+    return IntentInferenceEngine(FakeModel(), FakeTokenizer(), ID2LABEL, device="cpu", **kwargs)
+
+
+def test_id2label_to_list_accepts_str_and_int_keys():
+    assert id2label_to_list(ID2LABEL) == ["balance_inquiry", "money_transfer", "greeting"]
+    assert id2label_to_list({1: "b", 0: "a"}) == ["a", "b"]
+
+
+def test_predict_returns_top_k():
+    engine = make_engine()
+    try:
+        res = engine.predict("check balance", top_k=2, timeout=5)
+    finally:
+        engine.stop()
+    assert res[0][0] == "balance_inquiry"
+    assert len(res) == 2
+    assert 0.0 <= res[1][1] <= res[0][1] <= 1.0
+
+
+def test_concurrent_requests_are_batched_in_order():
+    engine = make_engine(max_batch_size=8, max_wait_ms=200)
+    texts = ["hello", "transfer 500", "my balance", "hello there"] * 2
+    try:
+        futures = [engine.submit(t) for t in texts]
+        results = [f.result(timeout=5) for f in futures]
+    finally:
+        engine.stop()
+    assert [r[0][0] for r in results] == [
+        "greeting", "money_transfer", "balance_inquiry", "greeting"
+    ] * 2
+    assert max(engine.model.batch_sizes) > 1
+
+
+def test_batch_size_is_capped():
+    engine = make_engine(max_batch_size=3, max_wait_ms=50)
+    try:
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            list(pool.map(lambda t: engine.predict(t, timeout=5), ["hello"] * 10))
+    finally:
+        engine.stop()
+    assert max(engine.model.batch_sizes) <= 3
+
+
+def test_predict_batch_matches_single_predictions():
+    engine = make_engine(max_batch_size=2)
+    texts = ["hello", "transfer", "balance please", ""]
+    batched = engine.predict_batch(texts, top_k=1)
+    single = [engine.predict(t, timeout=5) for t in texts]
+    engine.stop()
+    assert [b[0][0] for b in batched] == [s[0][0] for s in single]
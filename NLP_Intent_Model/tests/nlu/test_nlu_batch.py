@@ -0,0 +1,79 @@
+"""
+Batch NLU: one batched transformer call, input order preserved, per-item errors.
+File: tests/nlu/test_nlu_batch.py
+"""
+import pytest
+
+from src.nlu import entity_extractor
+from src.nlu.nlu_cache import NLUResultCache
+
+
+class FakeEngine:
+    """Stands in for IntentInferenceEngine; records every predict_batch call."""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict_batch(self, texts, top_k=1):
+        self.batches.append(list(texts))
+        return [[("money_transfer" if "send" in t else "balance_inquiry", 0.8)][:top_k] for t in texts]
+
+    def predict(self, text, top_k=1):
+        return self.predict_batch([text], top_k=top_k)[0]
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    fake = FakeEngine()
+    monkeypatch.setattr(entity_extractor, "_SHARED_INTENT_ENGINE", fake)
+    monkeypatch.setattr(entity_extractor, "NLU_RESULT_CACHE", NLUResultCache(maxsize=100, ttl=60))
+    monkeypatch.setattr(entity_extractor, "INTENT_CASCADE", False)
+    if entity_extractor.predict_intent is None:
+        monkeypatch.setattr(entity_extractor, "predict_intent", lambda *a, **k: [])
+    return fake
+
+
+def test_single_forward_pass_in_request_order(engine):
+    texts = ["9876543210 send money", "how much do I have", "send 500 rupees"]
+    results = entity_extractor.combined_nlu_batch(texts)
+    assert engine.batches == [texts]
+    assert [r["text"] for r in results] == texts
+    assert [r["intents"][0]["intent"] for r in results] == ["money_transfer", "balance_inquiry", "money_transfer"]
+    assert all(r["tier"] == "transformer" and r["error"] is None for r in results)
+    assert any(e["entity"] == "phone_number" for e in results[0]["entities"])
+
+
+def test_matches_combined_nlu(engine):
+    texts = ["send money to 9876543210", "what is my savings balance"]
+    batch = entity_extractor.combined_nlu_batch(texts)
+    entity_extractor.NLU_RESULT_CACHE.clear()
+    for text, item in zip(texts, batch):
+        single = entity_extractor.combined_nlu(text)
+        assert {k: v for k, v in item.items() if k != "error"} == single
+
+
+def test_cache_hits_skip_the_transformer(engine):
+    entity_extractor.combined_nlu_batch(["check balance"])
+    results = entity_extractor.combined_nlu_batch(["check balance", "send it"])
+    assert engine.batches == [["check balance"], ["send it"]]
+    assert results[0]["intents"][0]["intent"] == "balance_inquiry"
+
+
+def test_failing_item_reports_error_without_failing_batch(engine, monkeypatch):
+    real = entity_extractor.predict_entities
+
+    def flaky(text, **kwargs):
+        if text == "boom":
+            raise ValueError("bad input")
+        return real(text, **kwargs)
+
+    monkeypatch.setattr(entity_extractor, "predict_entities", flaky)
+    results = entity_extractor.combined_nlu_batch(["hello there", "boom", "send 500 rupees"])
+    assert results[1] == {"text": "boom", "intents": [], "entities": [], "tier": None, "error": "bad input"}
+    assert results[0]["error"] is None and results[2]["intents"]
+    assert engine.batches == [["hello there", "send 500 rupees"]]
+
+
+def test_empty_batch(engine):
+    assert entity_extractor.combined_nlu_batch([]) == []
+    assert engine.batches == []
@@ -0,0 +1,100 @@
+"""
+NLU result cache: LRU eviction, TTL expiry and combined_nlu integration.
+File: tests/nlu/test_nlu_cache.py
+"""
+import time
+
+import pytest
+
+from src.nlu import entity_extractor
+from src.nlu.nlu_cache import NLUResultCache
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = NLUResultCache(maxsize=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = NLUResultCache(maxsize=10, ttl=0.05)
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["size"] == 0
+
+
+def test_zero_size_disables_cache():
+    cache = NLUResultCache(maxsize=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None and len(cache) == 0
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    cache = NLUResultCache(maxsize=100, ttl=60)
+    monkeypatch.setattr(entity_extractor, "NLU_RESULT_CACHE", cache)
+    calls = []
+    real = entity_extractor._combined_nlu_uncached
+
+    def counting(*args, **kwargs):
+        calls.append(args[0])
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(entity_extractor, "_combined_nlu_uncached", counting)
+    monkeypatch.setattr(entity_extractor, "INTENT_CASCADE", False)
+    monkeypatch.setattr(entity_extractor, "predict_intent", None)
+    return cache, calls
+
+
+def test_combined_nlu_hits_on_normalized_text(fresh_cache):
+    cache, calls = fresh_cache
+    first = entity_extractor.combined_nlu("Check my balance")
+    second = entity_extractor.combined_nlu("check my balance!")
+    assert calls == ["Check my balance"]
+    assert second["text"] == "check my balance!"
+    assert second["intents"] == first["intents"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_devanagari_inputs_do_not_collide(fresh_cache):
+    cache, calls = fresh_cache
+    entity_extractor.combined_nlu("मेरा बैलेंस बताओ")
+    second = entity_extractor.combined_nlu("पैसे भेजो अभी")
+    assert calls == ["मेरा बैलेंस बताओ", "पैसे भेजो अभी"]
+    assert second["text"] == "पैसे भेजो अभी"
+    assert cache.stats()["hits"] == 0
+    # the same Hindi utterance still hits, across punctuation and spacing
+    entity_extractor.combined_nlu("  मेरा बैलेंस   बताओ।")
+    assert len(calls) == 2 and cache.stats()["hits"] == 1
+
+
+def test_hit_reextracts_entities_for_different_raw_text(fresh_cache):
+    cache, calls = fresh_cache
+    entity_extractor.combined_nlu("9876543210")
+    res = entity_extractor.combined_nlu("  9876543210.")
+    assert len(calls) == 1
+    phone = [e for e in res["entities"] if e["entity"] == "phone_number"][0]
+    assert (phone["start"], phone["end"]) == (2, 12)
+
+
+def test_options_and_model_version_are_part_of_key(fresh_cache, monkeypatch):
+    cache, calls = fresh_cache
+    entity_extractor.combined_nlu("hello")
+    entity_extractor.combined_nlu("hello", top_k_intents=3)
+    monkeypatch.setattr(entity_extractor, "_INTENT_MODEL_VERSION", "pytorch@retrained")
+    entity_extractor.combined_nlu("hello")
+    assert len(calls) == 3
+
+
+def test_cached_results_are_copies(fresh_cache):
+    cache, calls = fresh_cache
+    entity_extractor.combined_nlu("9876543210")["entities"].clear()
+    assert entity_extractor.combined_nlu("9876543210")["entities"]
@@ -0,0 +1,47 @@
+"""
+ONNX export parity: ONNX Runtime and PyTorch logits must agree on the intent dataset.
+File: tests/nlu/test_onnx_backend.py
+"""
+
+import os
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("onnxruntime")
+
+from src.nlu.intent_classifier import export_onnx, load_intent_data, load_trained_model
+from src.nlu.onnx_backend import load_onnx_model
+
+MODEL_DIR = "models/intent_classifier"
+ATOL = 1e-4
+
+
+def _has_weights(model_dir: str) -> bool:
+    return any(
+        os.path.exists(os.path.join(model_dir, name))
+        for name in ("model.safetensors", "pytorch_model.bin")
+    )
+
+
+@pytest.mark.order(5)
+def test_onnx_logits_match_pytorch(tmp_path):
+    if not _has_weights(MODEL_DIR):
+        pytest.skip("No trained intent model weights; run training first.")
+
+    onnx_path = export_onnx(MODEL_DIR, onnx_path=str(tmp_path / "model.onnx"))
+    pt_model, tokenizer, _, _ = load_trained_model(MODEL_DIR)
+    ort_model, _, _, _ = load_onnx_model(MODEL_DIR, onnx_path=onnx_path)
+    pt_model.eval()
+
+    texts = load_intent_data()["text"].tolist()
+    for i in range(0, len(texts), 32):
+        inputs = tokenizer(texts[i:i + 32], return_tensors="pt", truncation=True, padding=True, max_length=128)
+        with torch.no_grad():
+            pt_logits = pt_model(**inputs).logits
+        ort_logits = ort_model(**inputs).logits
+
+        assert ort_logits.shape == pt_logits.shape
+        assert torch.allclose(ort_logits, pt_logits, atol=ATOL), (
+            f"max abs diff {float((ort_logits - pt_logits).abs().max()):.2e}"
+        )
+        assert torch.equal(ort_logits.argmax(-1), pt_logits.argmax(-1))
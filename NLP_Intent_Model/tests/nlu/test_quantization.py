@@ -0,0 +1,42 @@
+"""
+INT8 quantization pipeline: accuracy gate and loading the published model.
+File: tests/nlu/test_quantization.py
+"""
+
+import os
+import shutil
+import pytest
+
+pytest.importorskip("torch")
+
+from src.nlu.quantization import QUANTIZED_FILENAME, load_quantized_model, quantize_intent_model
+
+MODEL_DIR = "models/intent_classifier"
+
+
+@pytest.fixture
+def model_copy(tmp_path):
+    if not any(os.path.exists(os.path.join(MODEL_DIR, f)) for f in ("model.safetensors", "pytorch_model.bin")):
+        pytest.skip("No trained intent model weights; run training first.")
+    dst = tmp_path / "intent_classifier"
+    shutil.copytree(MODEL_DIR, dst, ignore=shutil.ignore_patterns(QUANTIZED_FILENAME, "*.onnx"))
+    return str(dst)
+
+
+@pytest.mark.order(6)
+def test_gate_refuses_to_publish(model_copy):
+    report = quantize_intent_model(model_copy, max_accuracy_drop=-1.0)
+    assert report["published"] is False
+    assert not os.path.exists(os.path.join(model_copy, QUANTIZED_FILENAME))
+
+
+@pytest.mark.order(7)
+def test_published_model_loads_and_predicts(model_copy):
+    report = quantize_intent_model(model_copy, max_accuracy_drop=1.0)
+    assert report["published"] is True
+    assert 0.0 <= report["int8_accuracy"] <= 1.0
+
+    model, tokenizer, label2id, id2label = load_quantized_model(model_copy)
+    inputs = tokenizer(["check my balance"], return_tensors="pt")
+    pred = int(model(**inputs).logits.argmax(-1)[0])
+    assert str(pred) in id2label or pred in id2label
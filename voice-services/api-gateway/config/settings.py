@@ -9,6 +9,18 @@ class Settings(BaseSettings):
     NLP_URL: str = "http://localhost:8081/dialogue"
     TTS_BASE_URL: str = "http://localhost:8002"
 
+    # Pooled upstream clients (utils/http_client.py): one keep-alive pool per upstream
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    # Requires the h2 package; falls back to HTTP/1.1 without it
+    HTTP2_ENABLED: bool = False
+    # Per-upstream read/write timeouts (seconds)
+    STT_TIMEOUT: float = 30.0
+    NLP_TIMEOUT: float = 10.0
+    TTS_TIMEOUT: float = 30.0
+
 
     # JWT Shared Security
     JWT_SECRET: str = "change-this"
@@ -5,7 +5,7 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from config.settings import settings
-from utils.http_client import forward_file_to_service, forward_json_to_service
+from utils.http_client import forward_file_to_service, forward_json_to_service, http_clients
 
 logging.config.fileConfig(settings.LOG_CONFIG_PATH)
 logger = logging.getLogger("gateway")
@@ -21,9 +21,14 @@ app.add_middleware(
 )
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    await http_clients.aclose()
+
+
 @app.get("/health")
 async def health():
-    return {"status": "ok", "service": "api-gateway"}
+    return {"status": "ok", "service": "api-gateway", "http": http_clients.stats()}
 
 
 # ---------------------------------------------------------
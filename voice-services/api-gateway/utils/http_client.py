@@ -1,17 +1,111 @@
 # api-gateway/utils/http_client.py
 import httpx
-from typing import Optional
+from typing import Dict, Optional
+from urllib.parse import urlsplit
 import logging
 
+from config.settings import settings
+
 logger = logging.getLogger("gateway.http_client")
 
 DEFAULT_TIMEOUT = 30.0
 
-async def forward_file_to_service(url: str, file_field_name: str, upload_file, headers: Optional[dict] = None, timeout: float = DEFAULT_TIMEOUT):
+try:
+    import h2  # noqa: F401  (needed by httpx for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class HTTPClientManager:
+    """
+    Application-lifetime httpx clients, one connection pool per upstream origin.
+    Upstreams registered with register() get their own timeout; any other origin gets
+    a client with the default timeout on first use. aclose() on shutdown.
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0, connect_timeout: float = 5.0,
+                 default_timeout: float = DEFAULT_TIMEOUT, http2: bool = False):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.connect_timeout = connect_timeout
+        self.default_timeout = default_timeout
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._timeouts: Dict[str, float] = {}  # origin -> read/write timeout
+        self._names: Dict[str, str] = {}  # origin -> upstream name (for stats)
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def register(self, name: str, url: str, timeout: float):
+        origin = _origin(url)
+        self._names[origin] = name
+        self._timeouts[origin] = timeout
+
+    def client_for(self, url: str) -> httpx.AsyncClient:
+        origin = _origin(url)
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            timeout = self._timeouts.get(origin, self.default_timeout)
+            client = httpx.AsyncClient(
+                base_url=origin,
+                limits=self.limits,
+                timeout=httpx.Timeout(timeout, connect=self.connect_timeout),
+                http2=self.http2,
+            )
+            self._clients[origin] = client
+            logger.info("HTTP pool for %s (%s) opened", self._names.get(origin, origin), origin)
+        return client
+
+    async def aclose(self):
+        clients, self._clients = self._clients, {}
+        for origin, client in clients.items():
+            await client.aclose()
+            logger.info("HTTP pool for %s closed", self._names.get(origin, origin))
+
+    def stats(self) -> dict:
+        return {
+            "http2": self.http2,
+            "upstreams": {
+                self._names.get(origin, origin): {"origin": origin, "open": not client.is_closed}
+                for origin, client in self._clients.items()
+            },
+        }
+
+
+# Shared by all forwarders; the gateway closes it on shutdown
+http_clients = HTTPClientManager(
+    max_connections=settings.HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    connect_timeout=settings.HTTP_CONNECT_TIMEOUT,
+    http2=settings.HTTP2_ENABLED,
+)
+http_clients.register("stt", settings.STT_URL, settings.STT_TIMEOUT)
+http_clients.register("nlp", settings.NLP_URL, settings.NLP_TIMEOUT)
+http_clients.register("tts", settings.TTS_URL, settings.TTS_TIMEOUT)
+
+
+def _timeout_override(timeout: Optional[float]):
+    # httpx: passing USE_CLIENT_DEFAULT keeps the upstream's configured timeout
+    return httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
+
+
+async def forward_file_to_service(url: str, file_field_name: str, upload_file, headers: Optional[dict] = None, timeout: Optional[float] = None):
     """
     Forward a FastAPI UploadFile to another HTTP service as multipart/form-data.
     - upload_file: FastAPI UploadFile
     - file_field_name: form field name expected by destination (e.g., "file")
+    - timeout: overrides the upstream's configured timeout for this call
     Returns httpx.Response
     """
     # Reset file pointer to start
@@ -22,15 +116,15 @@ async def forward_file_to_service(url: str, file_field_name: str, upload_file, h
 
     # Prepare multipart payload
     files = {file_field_name: (upload_file.filename, upload_file.file, upload_file.content_type or "application/octet-stream")}
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        logger.debug("Forwarding file to %s", url)
-        resp = await client.post(url, files=files, headers=headers)
-        resp.raise_for_status()
-        return resp
-
-async def forward_json_to_service(url: str, json_payload: dict, headers: Optional[dict] = None, timeout: float = DEFAULT_TIMEOUT):
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        logger.debug("Forwarding JSON to %s", url)
-        resp = await client.post(url, json=json_payload, headers=headers)
-        resp.raise_for_status()
-        return resp
+    client = http_clients.client_for(url)
+    logger.debug("Forwarding file to %s", url)
+    resp = await client.post(url, files=files, headers=headers, timeout=_timeout_override(timeout))
+    resp.raise_for_status()
+    return resp
+
+async def forward_json_to_service(url: str, json_payload: dict, headers: Optional[dict] = None, timeout: Optional[float] = None):
+    client = http_clients.client_for(url)
+    logger.debug("Forwarding JSON to %s", url)
+    resp = await client.post(url, json=json_payload, headers=headers, timeout=_timeout_override(timeout))
+    resp.raise_for_status()
+    return resp
@@ -1,19 +1,21 @@
 # stt/app.py
 
-import os
-import uuid
+import asyncio
 import logging.config
-import subprocess
-from fastapi import FastAPI, UploadFile, File, HTTPException
+import functools
+from typing import Optional
+import numpy as np
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
-from whisper_model import load_whisper
-from asr_utils import validate_mime, delete_file_later
+from whisper_model import create_whisper, transcribe_samples, transcribe_batch, supports_batching, decode_options
+from asr_utils import validate_mime
+from audio_decode import decode_audio, PCM16Stream, StreamDecoder, SAMPLE_RATE
+from vad import trim_silence
+from stream_asr import StreamingSession
+from asr_executor import ASRExecutor, ExecutorSaturated, ExecutorUnavailable, ClientDisconnected
 from config.settings import settings
 
-import aiofiles
-import asyncio
-
 logging.config.fileConfig(settings.LOG_CONFIG_PATH)
 log = logging.getLogger("stt")
 
@@ -26,69 +28,216 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# --------------------------
-# Convert webm → wav
-# --------------------------
-def convert_to_wav(src, dst):
-    try:
-        cmd = [
-            "ffmpeg",
-            "-y",
-            "-i", src,
-            "-ac", "1",
-            "-ar", "16000",
-            dst
-        ]
-
-        log.info(f"FFmpeg cmd: {' '.join(cmd)}")
-        subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            check=True
-        )
-    except Exception as e:
-        raise RuntimeError(f"FFmpeg conversion failed: {str(e)}")
+# Whisper runs on WHISPER_WORKERS threads; at most WHISPER_QUEUE_SIZE requests wait for one.
+# Concurrent requests share one encoder pass when the backend supports it.
+BATCH_FN = transcribe_batch if supports_batching() and settings.ASR_MAX_BATCH > 1 else None
+asr_executor = ASRExecutor(
+    model_factory=create_whisper,
+    workers=settings.WHISPER_WORKERS,
+    max_queue=settings.WHISPER_QUEUE_SIZE,
+    max_batch=settings.ASR_MAX_BATCH if BATCH_FN else 1,
+    max_batch_wait_ms=settings.ASR_BATCH_WAIT_MS,
+)
+
+
+@app.on_event("startup")
+async def startup():
+    asr_executor.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    asr_executor.shutdown(wait=False)
+
+
+@app.get("/asr/metrics")
+def asr_metrics():
+    return asr_executor.metrics()
 
 
 # --------------------------
 # 🚀 Speech-to-text endpoint
 # --------------------------
 @app.post("/asr")
-async def transcribe(audio: UploadFile = File(...)):
+async def transcribe(request: Request, audio: UploadFile = File(...),
+                     profile: Optional[str] = None, language: Optional[str] = None):
     log.info(f"STT received: {audio.filename}")
 
     if not validate_mime(audio.filename):
         raise HTTPException(status_code=400, detail="Unsupported audio format (expected webm)")
 
-    os.makedirs(settings.TEMP_DIR, exist_ok=True)
-
-    raw_path = os.path.join(settings.TEMP_DIR, f"{uuid.uuid4().hex}_raw.webm")
-    wav_path = raw_path.replace("_raw.webm", ".wav")
+    # the upload is spooled to a temporary file; read at most one byte past the limit
+    max_bytes = settings.MAX_UPLOAD_MB * 1024 * 1024
+    if audio.size is not None and audio.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Audio larger than {settings.MAX_UPLOAD_MB} MB")
+    data = await audio.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Audio larger than {settings.MAX_UPLOAD_MB} MB")
 
-    # Save raw webm
-    async with aiofiles.open(raw_path, "wb") as f:
-        await f.write(await audio.read())
-
-    # 🔥 Convert to WAV BEFORE giving to Whisper
+    # 🔥 Decode in memory (NumPy for 16 kHz WAV, ffmpeg over pipes otherwise)
     try:
-        convert_to_wav(raw_path, wav_path)
+        samples = await decode_audio(data, audio.filename)
     except Exception as e:
-        log.error(f"FFmpeg failed: {e}")
+        log.error(f"Audio decode failed: {e}")
         raise HTTPException(status_code=500, detail="Audio conversion failed")
 
+    # Cut silence so Whisper only encodes speech
+    vad_report = None
+    if settings.VAD_ENABLED:
+        samples, vad_report = trim_silence(
+            samples,
+            sample_rate=SAMPLE_RATE,
+            threshold_db=settings.VAD_THRESHOLD_DB,
+            padding_ms=settings.VAD_PADDING_MS,
+            drop_gaps=settings.VAD_DROP_GAPS,
+            max_gap_ms=settings.VAD_MAX_GAP_MS,
+        )
+
+    try:
+        options = decode_options(profile, language, len(samples) / SAMPLE_RATE)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if len(samples) == 0:
+        log.info(f"No speech detected in {audio.filename}")
+        return {"text": "", "vad": vad_report, "profile": options["profile"], "language": options["language"]}
+
     # 🔥 Whisper transcription
     try:
-        model = load_whisper()
-        result = model.transcribe(wav_path)
+        result = await asr_executor.run(
+            transcribe_samples, samples, options["profile"], options["language"], options["max_tokens"],
+            disconnected=request.is_disconnected, batch_fn=BATCH_FN,
+        )
         text = result["text"].strip()
-        log.info(f"STT TRANSCRIBED TEXT → '{text}'")
+        log.info(f"STT TRANSCRIBED TEXT ({options['profile']}) → '{text}'")
+    except ExecutorSaturated:
+        raise HTTPException(status_code=503, detail="STT is busy", headers={"Retry-After": "1"})
+    except ExecutorUnavailable:
+        raise HTTPException(status_code=503, detail="STT model unavailable")
+    except ClientDisconnected:
+        log.info(f"Client disconnected, dropped transcription of {audio.filename}")
+        return Response(status_code=499)
     except Exception as e:
         log.error(f"Whisper error: {e}")
         raise HTTPException(status_code=500, detail="Whisper failed")
 
-    # Clean up after 10 sece
-    asyncio.create_task(delete_file_later(raw_path))
-    asyncio.create_task(delete_file_later(wav_path))
+    return {"text": text, "vad": vad_report, "profile": options["profile"], "language": result.get("language")}
+
 
-    return {"text": text}
+# --------------------------
+# 🎙️ Streaming speech-to-text
+# --------------------------
+async def _transcribe_stream(samples, partial: bool, profile: Optional[str] = None, language: Optional[str] = None):
+    """Whisper for StreamingSession: partials give way to queued work, finals wait for a slot."""
+    if partial and asr_executor.queue_depth > 0:
+        return None
+    options = decode_options(profile, language, len(samples) / SAMPLE_RATE)
+    for _ in range(50):
+        try:
+            result = await asr_executor.run(
+                transcribe_samples, samples, options["profile"], options["language"], options["max_tokens"],
+                batch_fn=BATCH_FN)
+            return result["text"].strip()
+        except ExecutorSaturated:
+            if partial:
+                return None
+            await asyncio.sleep(0.2)
+    raise ExecutorSaturated("ASR queue stayed full")
+
+
+async def _receive_audio(websocket: WebSocket, fmt: str, chunks: asyncio.Queue):
+    """Client messages -> float32 chunks on the queue; None marks the end of the stream."""
+    decoder = None
+    reader = None
+    pcm = PCM16Stream()
+
+    async def pump():
+        while (samples := await decoder.read()) is not None:
+            await chunks.put(samples)
+
+    try:
+        if fmt == "webm":
+            decoder = StreamDecoder()
+            await decoder.start()
+            reader = asyncio.ensure_future(pump())
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                if decoder is not None:
+                    await decoder.write(message["bytes"])
+                else:
+                    samples = pcm.feed(message["bytes"])
+                    if len(samples):
+                        await chunks.put(samples)
+            elif message.get("text") == "end":
+                break
+        if decoder is not None:
+            await decoder.close()
+            await reader
+    finally:
+        if reader is not None:
+            reader.cancel()
+        if decoder is not None:
+            decoder.kill()
+        # always, so transcribe_stream never waits on a receiver that has died
+        await chunks.put(None)
+
+
+@app.websocket("/asr/stream")
+async def transcribe_stream(websocket: WebSocket, format: str = "pcm16",
+                            profile: Optional[str] = None, language: Optional[str] = None):
+    """
+    Send binary audio messages: format=pcm16 (16 kHz mono s16le) or format=webm
+    (MediaRecorder WebM/Opus chunks), then the text message "end".
+    Receives {"type": "partial"|"final", "text": ...} as the user speaks.
+    profile/language select the decode profile as for /asr.
+    """
+    await websocket.accept()
+    if format not in ("pcm16", "webm"):
+        await websocket.close(code=1003, reason="format must be pcm16 or webm")
+        return
+    try:
+        decode_options(profile, language, 0.0)
+    except ValueError as e:
+        await websocket.close(code=1003, reason=str(e))
+        return
+
+    session = StreamingSession(
+        functools.partial(_transcribe_stream, profile=profile, language=language),
+        sample_rate=SAMPLE_RATE,
+        threshold_db=settings.VAD_THRESHOLD_DB,
+        partial_interval_ms=settings.STREAM_PARTIAL_INTERVAL_MS,
+        pause_ms=settings.STREAM_PAUSE_MS,
+        endpoint_ms=settings.STREAM_ENDPOINT_MS,
+        min_commit_sec=settings.STREAM_MIN_COMMIT_SEC,
+        max_segment_sec=settings.MAX_DURATION_SEC,
+    )
+    chunks: asyncio.Queue = asyncio.Queue()
+    receiver = asyncio.ensure_future(_receive_audio(websocket, format, chunks))
+    try:
+        done = False
+        while not done:
+            # take everything that arrived while the last decode ran, and process it at once
+            pending = [await chunks.get()]
+            while not chunks.empty():
+                pending.append(chunks.get_nowait())
+            if pending[-1] is None:
+                done = True
+                pending.pop()
+                await receiver  # re-raises a receive/decode failure instead of ending quietly
+            events = await session.feed(np.concatenate(pending)) if pending else []
+            if done:
+                events += await session.finish()
+            for event in events:
+                log.info(f"STT stream {event['type']} → '{event['text']}'")
+                await websocket.send_json(event)
+        await websocket.close()
+    except WebSocketDisconnect:
+        log.info("STT stream client disconnected")
+    except Exception as e:
+        log.error(f"STT stream failed: {e}")
+        await websocket.close(code=1011)
+    finally:
+        receiver.cancel()
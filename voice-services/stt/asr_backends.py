@@ -0,0 +1,373 @@
+# stt/asr_backends.py
+"""
+Interchangeable Whisper inference engines, selected with ASR_BACKEND.
+
+Every backend has the same contract:
+    backend.transcribe(audio, profile="default", language=None, max_tokens=None)
+        -> {"text": str, "language": str}
+where audio is float32 mono samples at 16 kHz and profile is one of DECODE_PROFILES:
+- "default": the engine's own transcribe settings (language detection, beam search,
+  temperature fallback, timestamps).
+- "command": for short voice commands. Greedy decoding at temperature 0 with no
+  fallback retries, no timestamp tokens, no conditioning on earlier windows and at
+  most max_tokens tokens. Pass language to skip language detection.
+
+- "openai-whisper": the reference PyTorch implementation. COMPUTE_TYPE "float16"
+  decodes in fp16 (GPU only); "int8" applies torch dynamic INT8 quantization to the
+  Linear layers on CPU.
+- "faster-whisper": CTranslate2 engine; COMPUTE_TYPE is passed through ("int8",
+  "int8_float16", "float16", "float32", ...). INT8 on CPU is several times faster
+  than openai-whisper for the same model size.
+
+Both backends also offer
+    backend.transcribe_batch([(audio, profile, language, max_tokens), ...]) -> [result, ...]
+which runs the encoder once for all clips and gives the same results as transcribe()
+(see _BatchedWindows).
+
+Engines are imported lazily, so an image only needs the one it uses.
+"""
+
+import threading
+import zlib
+from typing import NamedTuple
+
+import numpy as np
+
+DECODE_PROFILES = ("default", "command")
+
+# language codes both engines accept (whisper.tokenizer.LANGUAGES; "yue" needs large-v3)
+WHISPER_LANGUAGES = (
+    "en", "zh", "de", "es", "ru", "ko", "fr", "ja", "pt", "tr", "pl", "ca", "nl", "ar", "sv", "it",
+    "id", "hi", "fi", "vi", "he", "uk", "el", "ms", "cs", "ro", "da", "hu", "ta", "no", "th", "ur",
+    "hr", "bg", "lt", "la", "mi", "ml", "cy", "sk", "te", "fa", "lv", "bn", "sr", "az", "sl", "kn",
+    "et", "mk", "br", "eu", "is", "hy", "ne", "mn", "bs", "kk", "sq", "sw", "gl", "mr", "pa", "si",
+    "km", "sn", "yo", "so", "af", "oc", "ka", "be", "tg", "sd", "gu", "am", "yi", "lo", "uz", "fo",
+    "ht", "ps", "tk", "nn", "mt", "sa", "lb", "my", "bo", "tl", "mg", "as", "tt", "haw", "ln", "ha",
+    "ba", "jw", "su", "yue",
+)
+
+WINDOW_FRAMES = 3000  # mel frames in Whisper's 30 s window
+INPUT_STRIDE = 2  # mel frames per encoder position (one timestamp step)
+
+
+_torch_threads_lock = threading.Lock()
+_torch_threads_set = False
+
+
+def _set_torch_threads(torch, cpu_threads: int):
+    """torch's intra-op pool is process-wide: size it once, not from every worker's backend."""
+    global _torch_threads_set
+    with _torch_threads_lock:
+        if not _torch_threads_set:
+            torch.set_num_threads(cpu_threads)
+            _torch_threads_set = True
+
+
+def _quantize_int8(model):
+    """Dynamic INT8 quantization of every Linear layer (weights int8, activations quantized per call)."""
+    import torch
+
+    # whisper.model.Linear only adds a dtype cast to nn.Linear; quantize_dynamic matches
+    # exact types, so turn them back into plain Linear layers first
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear):
+            module.__class__ = torch.nn.Linear
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class _WindowResult(NamedTuple):
+    """Temperature-0 decode of a clip's first (and only) 30 s window."""
+    text: str
+    avg_logprob: float
+    compression_ratio: float
+    no_speech_prob: float
+    complete: bool  # transcribe() would stop after this window
+
+
+def _compression_ratio(text: str) -> float:
+    data = text.encode("utf-8")
+    return len(data) / len(zlib.compress(data)) if data else 0.0
+
+
+def _is_no_speech(result) -> bool:
+    # transcribe() drops such a window instead of returning its (hallucinated) text
+    return result.no_speech_prob > 0.6 and not result.avg_logprob > -1.0
+
+
+def _needs_fallback(result) -> bool:
+    # same quality checks transcribe() uses to retry at a higher temperature
+    if _is_no_speech(result):
+        return False
+    return result.compression_ratio > 2.4 or result.avg_logprob < -1.0
+
+
+def _kept_tokens(tokens, timestamp_begin: int, content_frames: int):
+    """
+    The tokens transcribe() keeps from a clip's first window, or None if it would go on
+    to decode a second one: output that ends on an unpaired timestamp before the end of
+    the audio makes transcribe() seek back to that timestamp and decode from there.
+    """
+    tokens = list(tokens)
+    is_timestamp = [t >= timestamp_begin for t in tokens]
+    consecutive = [i for i in range(1, len(tokens)) if is_timestamp[i] and is_timestamp[i - 1]]
+    if not consecutive or is_timestamp[-2:] == [False, True]:
+        return tokens
+    last_slice = consecutive[-1]
+    seek = (tokens[last_slice - 1] - timestamp_begin) * INPUT_STRIDE
+    return tokens[:last_slice] if seek >= content_frames else None
+
+
+class _BatchedWindows:
+    """
+    transcribe_batch() for backends that can encode several windows in one pass.
+
+    Clips that fit one 30 s window are encoded together (plus one language detection pass
+    for those without a language) and decoded with the options transcribe() uses for
+    that window. A clip's batched result is used only when transcribe() would have
+    returned the same thing: the window is silence (text ""), or it passes transcribe()'s
+    quality checks and covers the whole clip. Longer clips, and decodes transcribe()
+    would retry at a higher temperature or continue in a second window, go through
+    transcribe() on their own.
+
+    Backends provide _content_frames(audio), _detect_languages(clips) and
+    _decode_windows(clips, [(profile, language, max_tokens), ...]) -> [_WindowResult or Exception, ...].
+    """
+    batched_encoder = True
+
+    def transcribe_batch(self, items) -> list:
+        results = [None] * len(items)
+        short = [i for i, (audio, *_rest) in enumerate(items) if 0 < self._content_frames(audio) <= WINDOW_FRAMES]
+        if short:
+            clips = [items[i][0] for i in short]
+            languages = [items[i][2] for i in short]
+            undetected = [row for row, language in enumerate(languages) if not language]
+            if undetected:
+                detected = self._detect_languages([clips[row] for row in undetected])
+                for row, language in zip(undetected, detected):
+                    languages[row] = language
+            windows = self._decode_windows(clips, [(items[i][1], languages[row], items[i][3])
+                                                   for row, i in enumerate(short)])
+            for row, (i, window) in enumerate(zip(short, windows)):
+                if isinstance(window, Exception):
+                    results[i] = window
+                elif _is_no_speech(window):
+                    results[i] = {"text": "", "language": languages[row]}
+                elif window.complete and (items[i][1] == "command" or not _needs_fallback(window)):
+                    results[i] = {"text": window.text, "language": languages[row]}
+        for i, item in enumerate(items):
+            if results[i] is None:
+                try:
+                    results[i] = self.transcribe(*item)
+                except Exception as e:
+                    results[i] = e
+        return results
+
+
+class OpenAIWhisperBackend(_BatchedWindows):
+    name = "openai-whisper"
+
+    def __init__(self, model_name: str, compute_type: str = "float32", device: str = "cpu", cpu_threads: int = 0):
+        import torch
+        import whisper
+
+        self._torch = torch
+        self._whisper = whisper
+        if cpu_threads:
+            _set_torch_threads(torch, cpu_threads)
+        self.model = whisper.load_model(model_name, device=device)
+        self.fp16 = compute_type == "float16" and device != "cpu"
+        if compute_type == "int8":
+            if device != "cpu":
+                raise ValueError("openai-whisper INT8 (dynamic quantization) is CPU only")
+            self.model = _quantize_int8(self.model)
+        self.compute_type = "int8" if compute_type == "int8" else ("float16" if self.fp16 else "float32")
+
+    @staticmethod
+    def _options(profile: str, language: str = None, max_tokens: int = None) -> dict:
+        """model.transcribe() options of a profile."""
+        options = {}
+        if profile == "command":
+            options.update(temperature=0.0, beam_size=None, best_of=None, without_timestamps=True,
+                           condition_on_previous_text=False, sample_len=max_tokens)
+        if language:
+            options["language"] = language
+        return options
+
+    def transcribe(self, audio: np.ndarray, profile: str = "default", language: str = None,
+                   max_tokens: int = None) -> dict:
+        result = self.model.transcribe(audio, fp16=self.fp16, **self._options(profile, language, max_tokens))
+        return {"text": result["text"], "language": result.get("language")}
+
+    def _window_options(self, profile, language, max_tokens) -> dict:
+        # the DecodingOptions transcribe() builds for its first attempt at a window
+        options = self._options(profile, language, max_tokens)
+        options.pop("condition_on_previous_text", None)  # only matters for later windows
+        options.update(language=language, temperature=0.0, fp16=self.fp16)
+        return options
+
+    def _content_frames(self, audio) -> int:
+        return len(audio) // self._whisper.audio.HOP_LENGTH
+
+    def _mel(self, audio):
+        # computed like transcribe() does: over the clip plus 30 s of padding
+        return self._whisper.log_mel_spectrogram(audio, self.model.dims.n_mels,
+                                                 padding=self._whisper.audio.N_SAMPLES)
+
+    def _stack(self, mels):
+        mels = self._torch.stack(mels).to(self.model.device)
+        return mels.half() if self.fp16 else mels
+
+    def _detect_languages(self, clips) -> list:
+        if not self.model.is_multilingual:
+            return ["en"] * len(clips)
+        pad_or_trim = self._whisper.pad_or_trim
+        with self._torch.no_grad():
+            _, probs = self.model.detect_language(self._stack([pad_or_trim(self._mel(audio), WINDOW_FRAMES)
+                                                               for audio in clips]))
+        return [max(p, key=p.get) for p in probs]
+
+    def _decode_windows(self, clips, options) -> list:
+        whisper, torch = self._whisper, self._torch
+        mels = []
+        for audio in clips:
+            mel = self._mel(audio)
+            mels.append(whisper.pad_or_trim(mel[:, :mel.shape[-1] - WINDOW_FRAMES], WINDOW_FRAMES))
+        with torch.no_grad():
+            features = self.model.embed_audio(self._stack(mels))
+        results = []
+        for row, (audio, (profile, language, max_tokens)) in enumerate(zip(clips, options)):
+            try:
+                decoded = whisper.decode(self.model, features[row],
+                                         whisper.DecodingOptions(**self._window_options(profile, language, max_tokens)))
+                tokenizer = whisper.tokenizer.get_tokenizer(self.model.is_multilingual,
+                                                            num_languages=self.model.num_languages,
+                                                            language=language, task="transcribe")
+                kept = _kept_tokens(decoded.tokens, tokenizer.timestamp_begin, self._content_frames(audio))
+            except Exception as e:
+                results.append(e)
+                continue
+            results.append(_WindowResult(
+                text=tokenizer.decode(kept) if kept is not None else decoded.text,
+                avg_logprob=decoded.avg_logprob,
+                compression_ratio=decoded.compression_ratio,
+                no_speech_prob=decoded.no_speech_prob,
+                complete=kept is not None,
+            ))
+        return results
+
+
+class FasterWhisperBackend(_BatchedWindows):
+    name = "faster-whisper"
+    default_beam_size = 5  # WhisperModel.transcribe() default
+
+    def __init__(self, model_name: str, compute_type: str = "int8", device: str = "cpu", cpu_threads: int = 0):
+        from faster_whisper import WhisperModel
+
+        self.model = WhisperModel(model_name, device=device, compute_type=compute_type, cpu_threads=cpu_threads)
+        self.compute_type = compute_type
+
+    @staticmethod
+    def _options(profile: str, language: str = None, max_tokens: int = None) -> dict:
+        """WhisperModel.transcribe() options of a profile."""
+        options = {}
+        if profile == "command":
+            options.update(temperature=0.0, beam_size=1, best_of=1, without_timestamps=True,
+                           condition_on_previous_text=False)
+            if max_tokens:
+                options["max_new_tokens"] = max_tokens
+        if language:
+            options["language"] = language
+        return options
+
+    def transcribe(self, audio: np.ndarray, profile: str = "default", language: str = None,
+                   max_tokens: int = None) -> dict:
+        segments, info = self.model.transcribe(audio, **self._options(profile, language, max_tokens))
+        # segments is a generator: decoding happens while it is consumed
+        text = "".join(segment.text for segment in segments)
+        return {"text": text, "language": info.language}
+
+    def _content_frames(self, audio) -> int:
+        return len(audio) // self.model.feature_extractor.hop_length
+
+    def _detect_languages(self, clips) -> list:
+        if not self.model.model.is_multilingual:
+            return ["en"] * len(clips)
+        from faster_whisper.audio import pad_or_trim
+
+        extractor = self.model.feature_extractor
+        encoded = self.model.encode(np.stack([pad_or_trim(extractor(audio)[:, :WINDOW_FRAMES]) for audio in clips]))
+        # [[("<|en|>", prob), ...], ...], most likely first
+        return [ranked[0][0][2:-2] for ranked in self.model.model.detect_language(encoded)]
+
+    def _generate_kwargs(self, profile, prompt_len, max_tokens) -> dict:
+        # what transcribe() passes to the CTranslate2 generate() for its temperature-0 attempt
+        options = self._options(profile, max_tokens=max_tokens)
+        max_new_tokens = options.get("max_new_tokens")
+        return {
+            "beam_size": options.get("beam_size", self.default_beam_size),
+            "patience": 1,
+            "length_penalty": 1,
+            "repetition_penalty": 1,
+            "no_repeat_ngram_size": 0,
+            "max_length": prompt_len + max_new_tokens if max_new_tokens else self.model.max_length,
+            "return_scores": True,
+            "return_no_speech_prob": True,
+            "suppress_blank": True,
+            "max_initial_timestamp_index": 50,  # 1 s
+        }
+
+    def _decode_windows(self, clips, options) -> list:
+        from faster_whisper.audio import pad_or_trim
+        from faster_whisper.tokenizer import Tokenizer
+        from faster_whisper.transcribe import get_suppressed_tokens
+
+        extractor = self.model.feature_extractor
+        windows = [pad_or_trim(extractor(audio)[:, :self._content_frames(audio)]) for audio in clips]
+        # a CTranslate2 encoder output cannot be sliced, so clips with the same settings
+        # share one encode() and one generate() call
+        groups = {}
+        for row, (profile, _, max_tokens) in enumerate(options):
+            groups.setdefault((profile, max_tokens), []).append(row)
+
+        results = [None] * len(clips)
+        for (profile, max_tokens), rows in groups.items():
+            without_timestamps = self._options(profile).get("without_timestamps", False)
+            try:
+                tokenizers = [Tokenizer(self.model.hf_tokenizer, self.model.model.is_multilingual,
+                                        task="transcribe", language=options[row][1]) for row in rows]
+                prompts = [list(t.sot_sequence) + ([t.no_timestamps] if without_timestamps else [])
+                           for t in tokenizers]
+                encoded = self.model.encode(np.stack([windows[row] for row in rows]))
+                generated = self.model.model.generate(
+                    encoded, prompts, suppress_tokens=list(get_suppressed_tokens(tokenizers[0], [-1])),
+                    **self._generate_kwargs(profile, len(prompts[0]), max_tokens))
+            except Exception as e:
+                for row in rows:
+                    results[row] = e
+                continue
+            for row, tokenizer, result in zip(rows, tokenizers, generated):
+                tokens = result.sequences_ids[0]
+                text = tokenizer.decode(tokens)
+                kept = _kept_tokens(tokens, tokenizer.timestamp_begin, self._content_frames(clips[row]))
+                results[row] = _WindowResult(
+                    text=tokenizer.decode(kept) if kept is not None else text,
+                    avg_logprob=result.scores[0] * len(tokens) / (len(tokens) + 1),
+                    compression_ratio=_compression_ratio(text),
+                    no_speech_prob=result.no_speech_prob,
+                    complete=kept is not None,
+                )
+        return results
+
+
+BACKENDS = {
+    OpenAIWhisperBackend.name: OpenAIWhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def create_backend(name: str, model_name: str, compute_type: str, device: str = "cpu", cpu_threads: int = 0):
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown ASR_BACKEND {name!r}; expected one of {sorted(BACKENDS)}")
+    return backend_class(model_name, compute_type=compute_type, device=device, cpu_threads=cpu_threads)
@@ -0,0 +1,293 @@
+# stt/asr_executor.py
+"""
+Whisper transcription off the event loop, on a fixed set of worker threads.
+
+- Each worker loads its own model at startup, so requests never pay the load time
+  and workers never share model state.
+- Admission is bounded: when max_queue jobs are already waiting, submit raises
+  ExecutorSaturated (the API answers 503 + Retry-After) instead of letting the
+  backlog, and every caller's latency, grow without limit.
+- If every worker failed to load its model, run() raises ExecutorUnavailable (and jobs
+  already queued fail with it) instead of waiting for a worker that will never come.
+- A job whose client has disconnected is cancelled; if it has not started yet a
+  worker skips it. A job that is already running finishes and is discarded.
+- Queue wait and compute time are tracked separately, so /asr/metrics shows whether
+  latency comes from too few workers or from slow transcription.
+- Jobs submitted with a batch_fn can be grouped: a worker that picks one up waits up
+  to max_batch_wait_ms for more jobs with the same batch_fn (at most max_batch) and
+  runs them in one batch_fn call. A job that ends up alone runs its normal fn.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Awaitable, Callable, List, Optional
+
+log = logging.getLogger("stt")
+
+
+class ExecutorSaturated(Exception):
+    """The admission queue is full."""
+
+
+class ExecutorUnavailable(Exception):
+    """No worker is left to run jobs (every model load failed)."""
+
+
+class ClientDisconnected(Exception):
+    """The caller went away before its transcription finished."""
+
+
+class LatencyStats:
+    """Count/mean/max over all samples and percentiles over the most recent ones."""
+
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._recent.append(seconds)
+
+    def _percentile(self, ordered, q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self._recent)
+        return {
+            "count": self.count,
+            "mean_ms": round(1000 * self.total / self.count, 1) if self.count else 0.0,
+            "p50_ms": round(1000 * self._percentile(ordered, 0.50), 1),
+            "p95_ms": round(1000 * self._percentile(ordered, 0.95), 1),
+            "p99_ms": round(1000 * self._percentile(ordered, 0.99), 1),
+            "max_ms": round(1000 * self.max, 1),
+        }
+
+
+class _Job:
+    __slots__ = ("fn", "args", "batch_fn", "future", "enqueued")
+
+    def __init__(self, fn, args, batch_fn=None):
+        self.fn = fn
+        self.args = args
+        self.batch_fn = batch_fn
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class ASRExecutor:
+    def __init__(self, model_factory: Callable, workers: int = 1, max_queue: int = 8,
+                 max_batch: int = 1, max_batch_wait_ms: int = 15):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.model_factory = model_factory
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_batch = max_batch
+        self.max_batch_wait = max_batch_wait_ms / 1000.0
+        self._jobs: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.loaded = 0
+        self.load_failures = 0
+        self.busy = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.batches = 0
+        self.batched_jobs = 0
+        self.queue_wait = LatencyStats()
+        self.compute = LatencyStats()
+
+    def start(self):
+        """Start the workers; each loads its model in the background."""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"asr-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def shutdown(self, wait: bool = True):
+        """Cancel queued jobs and stop the workers once their current job is done."""
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job.future.cancel()
+        for _ in range(len(self._threads) - self.load_failures):
+            self._jobs.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def _worker(self):
+        name = threading.current_thread().name
+        started = time.perf_counter()
+        try:
+            model = self.model_factory()
+        except Exception as e:
+            log.error(f"{name} failed to load the Whisper model: {e}")
+            self._worker_failed()
+            return
+        with self._lock:
+            self.loaded += 1
+        log.info(f"{name} ready in {time.perf_counter() - started:.1f}s")
+
+        held = deque()  # jobs taken off the queue while gathering a batch they did not belong to
+        while True:
+            job = held.popleft() if held else self._jobs.get()
+            if job is None:
+                return
+            if not self._start(job):
+                continue
+            batch = [job]
+            if job.batch_fn is not None and self.max_batch > 1:
+                self._gather(batch, held)
+
+            begin = time.perf_counter()
+            with self._lock:
+                self.busy += 1
+                for j in batch:
+                    self.queue_wait.add(begin - j.enqueued)
+            if len(batch) == 1:
+                try:
+                    outcomes = [job.fn(*job.args, model=model)]
+                except Exception as e:
+                    outcomes = [e]
+            else:
+                try:
+                    outcomes = job.batch_fn([j.args for j in batch], model=model)
+                except Exception as e:
+                    outcomes = [e] * len(batch)
+            elapsed = time.perf_counter() - begin
+            for j, outcome in zip(batch, outcomes):
+                if isinstance(outcome, Exception):
+                    j.future.set_exception(outcome)
+                else:
+                    j.future.set_result(outcome)
+            with self._lock:
+                self.busy -= 1
+                for outcome in outcomes:
+                    self.compute.add(elapsed)
+                    if isinstance(outcome, Exception):
+                        self.failed += 1
+                    else:
+                        self.completed += 1
+                if len(batch) > 1:
+                    self.batches += 1
+                    self.batched_jobs += len(batch)
+
+    @property
+    def available(self) -> bool:
+        """False once every worker has failed to load (True while they are still loading)."""
+        return self.load_failures < self.workers
+
+    def _worker_failed(self):
+        with self._lock:
+            self.load_failures += 1
+            if self.available:
+                return
+            # last worker gone: fail whatever is waiting, nobody would ever pick it up
+            while True:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None and job.future.set_running_or_notify_cancel():
+                    job.future.set_exception(ExecutorUnavailable("no Whisper worker could load its model"))
+
+    def _start(self, job) -> bool:
+        """Mark a job as running; False (and counted) if its caller already cancelled it."""
+        if job.future.set_running_or_notify_cancel():
+            return True
+        with self._lock:
+            self.cancelled += 1
+        return False
+
+    def _gather(self, batch: list, held: deque):
+        """Add queued jobs with the same batch_fn until max_batch or the wait deadline."""
+        deadline = time.perf_counter() + self.max_batch_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            try:
+                job = self._jobs.get(timeout=remaining)
+            except queue.Empty:
+                return
+            if job is None or job.batch_fn is not batch[0].batch_fn:
+                held.append(job)  # keep queue order: run it right after this batch
+                return
+            if self._start(job):
+                batch.append(job)
+
+    async def run(self, fn: Callable, *args,
+                  disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+                  poll_interval: float = 0.1, batch_fn: Optional[Callable] = None):
+        """
+        Run fn(*args, model=<worker's model>) on a worker and return its result.
+        disconnected: optional coroutine function (e.g. request.is_disconnected); once it
+        returns True the job is cancelled and ClientDisconnected is raised.
+        batch_fn: optional batch_fn([args, ...], model=...) -> [result or Exception, ...]
+        used instead of fn when this job is grouped with others.
+        """
+        job = _Job(fn, args, batch_fn)
+        # under the lock, so a job cannot slip in after the last worker drained the queue
+        with self._lock:
+            if not self.available:
+                raise ExecutorUnavailable("no Whisper worker could load its model")
+            try:
+                self._jobs.put_nowait(job)
+            except queue.Full:
+                self.rejected += 1
+                raise ExecutorSaturated(f"ASR queue is full ({self.max_queue} jobs waiting)")
+
+        result = asyncio.wrap_future(job.future)
+        if disconnected is None:
+            return await result
+        try:
+            while True:
+                done, _ = await asyncio.wait({result}, timeout=poll_interval)
+                if done:
+                    return result.result()
+                if await disconnected():
+                    # also cancels job.future, so a worker that has not picked it up skips it
+                    result.cancel()
+                    raise ClientDisconnected()
+        except asyncio.CancelledError:
+            result.cancel()
+            raise
+
+    @property
+    def queue_depth(self) -> int:
+        return self._jobs.qsize()
+
+    def metrics(self) -> dict:
+        return {
+            "workers": self.workers,
+            "loaded": self.loaded,
+            "load_failures": self.load_failures,
+            "busy": self.busy,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "max_batch": self.max_batch,
+            "batches": self.batches,
+            "mean_batch_size": round(self.batched_jobs / self.batches, 2) if self.batches else 0.0,
+            "queue_wait": self.queue_wait.snapshot(),
+            "compute": self.compute.snapshot(),
+        }
@@ -0,0 +1,171 @@
+# stt/audio_decode.py
+"""
+Decode uploaded audio in memory to the float32 16 kHz mono array Whisper takes.
+
+- 16 kHz PCM WAV is parsed directly with NumPy (no subprocess).
+- Anything else (webm/ogg/mp3, other sample rates) is piped through ffmpeg:
+  upload bytes on stdin, raw s16le on stdout.
+- Containers that ffmpeg cannot read from a pipe (mp4/m4a with the index at the
+  end) fall back to a temporary file that is deleted right after decoding.
+- StreamDecoder keeps one ffmpeg process open per WebSocket stream and decodes
+  WebM/Opus chunks as they arrive; PCM16Stream converts raw s16le messages.
+"""
+
+import asyncio
+import io
+import os
+import tempfile
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+_PCM_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+class AudioDecodeError(Exception):
+    pass
+
+
+def _ffmpeg_cmd(src: str, low_latency: bool = False):
+    # low_latency: start decoding after a small probe and flush every packet, instead of
+    # buffering seconds of input first (for live streams)
+    live_flags = ["-fflags", "nobuffer", "-probesize", "4096", "-analyzeduration", "0"] if low_latency else []
+    return [
+        "ffmpeg",
+        "-nostdin",
+        "-hide_banner",
+        "-loglevel", "error",
+        *live_flags,
+        "-i", src,
+        "-f", "s16le",
+        "-ac", "1",
+        "-ar", str(SAMPLE_RATE),
+        *(["-flush_packets", "1"] if low_latency else []),
+        "pipe:1",
+    ]
+
+
+def pcm16_to_float32(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def decode_wav(data: bytes):
+    """float32 samples of a PCM WAV at SAMPLE_RATE, or None if ffmpeg is needed."""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    try:
+        with wave.open(io.BytesIO(data)) as wav:
+            channels = wav.getnchannels()
+            width = wav.getsampwidth()
+            rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None  # e.g. float or compressed WAV: let ffmpeg handle it
+    if rate != SAMPLE_RATE or width not in _PCM_DTYPES:
+        return None
+    samples = np.frombuffer(frames, dtype=np.dtype(_PCM_DTYPES[width]).newbyteorder("<"))
+    if width == 1:
+        audio = (samples.astype(np.float32) - 128.0) / 128.0
+    else:
+        audio = samples.astype(np.float32) / float(2 ** (8 * width - 1))
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+async def _run_ffmpeg(src: str, data: bytes = None) -> bytes:
+    proc = await asyncio.create_subprocess_exec(
+        *_ffmpeg_cmd(src),
+        stdin=asyncio.subprocess.PIPE if data is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    out, err = await proc.communicate(input=data)
+    if proc.returncode != 0 or not out:
+        raise AudioDecodeError(err.decode(errors="replace").strip() or "ffmpeg produced no audio")
+    return out
+
+
+async def _ffmpeg_from_tempfile(data: bytes, suffix: str) -> bytes:
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return await _run_ffmpeg(path)
+    finally:
+        os.remove(path)
+
+
+async def decode_audio(data: bytes, filename: str = "") -> np.ndarray:
+    """Decode an uploaded file to float32 mono samples at SAMPLE_RATE."""
+    audio = decode_wav(data)
+    if audio is not None:
+        return audio
+    try:
+        pcm = await _run_ffmpeg("pipe:0", data)
+    except AudioDecodeError:
+        _, ext = os.path.splitext(filename.lower())
+        if ext not in (".m4a", ".mp4"):
+            raise
+        pcm = await _ffmpeg_from_tempfile(data, ext)
+    return pcm16_to_float32(pcm)
+
+
+class PCM16Stream:
+    """
+    Raw s16le WebSocket messages -> float32 samples. Messages need not be whole samples:
+    an odd trailing byte is kept and completed by the next message.
+    """
+
+    def __init__(self):
+        self._carry = b""
+
+    def feed(self, data: bytes) -> np.ndarray:
+        data = self._carry + data
+        end = len(data) & ~1
+        self._carry = data[end:]
+        return pcm16_to_float32(data[:end])
+
+
+class StreamDecoder:
+    """
+    Incremental decoder for a compressed stream (e.g. MediaRecorder WebM/Opus chunks).
+    write() feeds container bytes; read() returns float32 samples decoded so far,
+    or None once ffmpeg has finished after close().
+    """
+
+    def __init__(self, read_size: int = 3200):
+        self.read_size = read_size
+        self._proc = None
+
+    async def start(self):
+        self._proc = await asyncio.create_subprocess_exec(
+            *_ffmpeg_cmd("pipe:0", low_latency=True),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+    async def write(self, data: bytes):
+        self._proc.stdin.write(data)
+        await self._proc.stdin.drain()
+
+    async def close(self):
+        """Signal end of input; remaining audio is still returned by read()."""
+        if self._proc is not None and not self._proc.stdin.is_closing():
+            self._proc.stdin.close()
+
+    async def read(self):
+        data = await self._proc.stdout.read(self.read_size)
+        if not data:
+            await self._proc.wait()
+            return None
+        if len(data) % 2:
+            data += await self._proc.stdout.readexactly(1)
+        return pcm16_to_float32(data)
+
+    def kill(self):
+        if self._proc is not None and self._proc.returncode is None:
+            self._proc.kill()
@@ -0,0 +1,66 @@
+# stt/benchmark_asr.py
+"""
+Real-time factor (processing time / audio duration) of each ASR backend on the same clips.
+Lower is better; 0.25 means one second of audio takes 0.25 s to transcribe.
+
+Run: python benchmark_asr.py clip1.wav clip2.webm ... \
+         [--model base] [--backend openai-whisper:float32 --backend faster-whisper:int8] [--repeat 3]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from asr_backends import create_backend
+from audio_decode import decode_audio, SAMPLE_RATE
+
+DEFAULT_BACKENDS = ["openai-whisper:float32", "openai-whisper:int8", "faster-whisper:int8"]
+
+
+def _load_clips(paths):
+    clips = []
+    for path in paths:
+        with open(path, "rb") as f:
+            samples = asyncio.run(decode_audio(f.read(), path))
+        clips.append((os.path.basename(path), samples))
+    return clips
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("clips", nargs="+")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--backend", action="append", help="name:compute_type (repeatable)")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    clips = _load_clips(args.clips)
+    audio_sec = sum(len(samples) for _, samples in clips) / SAMPLE_RATE
+    print(f"{len(clips)} clips, {audio_sec:.1f}s of audio, model {args.model}\n")
+    print(f"{'backend':<24} {'load s':>7} {'RTF':>7} {'best RTF':>9}  first transcript")
+
+    for spec in args.backend or DEFAULT_BACKENDS:
+        name, _, compute_type = spec.partition(":")
+        started = time.perf_counter()
+        try:
+            backend = create_backend(name, args.model, compute_type=compute_type or "float32",
+                                     device=args.device, cpu_threads=args.threads)
+        except Exception as e:
+            print(f"{spec:<24} unavailable: {e}")
+            continue
+        load_sec = time.perf_counter() - started
+        backend.transcribe(clips[0][1])  # warm-up
+
+        runs = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            texts = [backend.transcribe(samples)["text"].strip() for _, samples in clips]
+            runs.append(time.perf_counter() - started)
+        mean_rtf = sum(runs) / len(runs) / audio_sec
+        print(f"{spec:<24} {load_sec:>7.1f} {mean_rtf:>7.3f} {min(runs) / audio_sec:>9.3f}  {texts[0][:40]!r}")
+
+
+if __name__ == "__main__":
+    main()
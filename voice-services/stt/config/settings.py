@@ -5,7 +5,43 @@ from pydantic import Field
 class Settings(BaseSettings):
     # Whisper model
     WHISPER_MODEL: str = "base"
-    COMPUTE_TYPE: str = "int8"  
+    # Inference engine (see asr_backends.py): "faster-whisper" (CTranslate2) or "openai-whisper"
+    ASR_BACKEND: str = "faster-whisper"
+    # int8 | float16 | float32 (faster-whisper also accepts int8_float16, ...)
+    COMPUTE_TYPE: str = "int8"
+    ASR_DEVICE: str = "cpu"
+    # 0 = engine default
+    ASR_CPU_THREADS: int = 0
+
+    # Decode profile when the request does not pick one: default | command | auto
+    # (auto = command for speech up to COMMAND_MAX_SEC, default for longer clips)
+    ASR_PROFILE: str = "default"
+    # Command profile: pinned language (requests may pick another of COMMAND_LANGUAGES)
+    COMMAND_LANGUAGE: str = "en"
+    COMMAND_LANGUAGES: str = "en,hi"
+    COMMAND_MAX_TOKENS: int = 64
+    COMMAND_MAX_SEC: float = 8.0
+
+    # Executor: Whisper workers (one model each) and jobs allowed to wait for one
+    WHISPER_WORKERS: int = 1
+    WHISPER_QUEUE_SIZE: int = 8
+    # Cross-request encoder batching (both backends; see asr_backends._BatchedWindows):
+    # a worker waits up to ASR_BATCH_WAIT_MS for up to ASR_MAX_BATCH queued requests
+    ASR_MAX_BATCH: int = 4
+    ASR_BATCH_WAIT_MS: int = 15
+
+    # Voice activity detection before Whisper (see vad.py)
+    VAD_ENABLED: bool = True
+    VAD_THRESHOLD_DB: float = -45.0
+    VAD_PADDING_MS: int = 200
+    VAD_DROP_GAPS: bool = False
+    VAD_MAX_GAP_MS: int = 600
+
+    # /asr/stream (see stream_asr.py)
+    STREAM_PARTIAL_INTERVAL_MS: int = 1000
+    STREAM_PAUSE_MS: int = 300
+    STREAM_ENDPOINT_MS: int = 800
+    STREAM_MIN_COMMIT_SEC: float = 2.0
 
     # Audio limits
     MAX_UPLOAD_MB: int = 8
@@ -0,0 +1,136 @@
+# stt/stream_asr.py
+"""
+Incremental transcription for one /asr/stream connection.
+
+Audio arrives in small chunks while the user is still talking:
+- Every 30 ms frame is classified as speech or silence by its level (VAD_THRESHOLD_DB).
+  Silence before speech is dropped, apart from a short pre-roll that keeps word onsets.
+- The current segment is re-transcribed every partial_interval_ms of new audio, and
+  a "partial" hypothesis is sent.
+- A pause of pause_ms inside the utterance, once the segment is at least
+  min_commit_sec long, commits the segment: its text is fixed and later decodes
+  only cover the audio after it. Segments are also committed at max_segment_sec,
+  because Whisper sees at most 30 s.
+- A pause of endpoint_ms ends the utterance: the last segment is transcribed and a
+  "final" transcript of the whole utterance is sent.
+
+When the user stops talking, only the audio since the last commit still has to be
+decoded, rather than the whole utterance.
+"""
+
+from collections import deque
+from typing import Awaitable, Callable, List, Optional
+
+import numpy as np
+
+FRAME_MS = 30
+
+# transcribe(samples, partial) -> text, or None when a partial decode was skipped
+TranscribeFn = Callable[[np.ndarray, bool], Awaitable[Optional[str]]]
+
+
+class StreamingSession:
+    def __init__(self, transcribe: TranscribeFn, sample_rate: int = 16000, threshold_db: float = -45.0,
+                 partial_interval_ms: int = 1000, pause_ms: int = 300, endpoint_ms: int = 800,
+                 min_commit_sec: float = 2.0, max_segment_sec: float = 30.0, preroll_ms: int = 200):
+        self.transcribe = transcribe
+        self.sample_rate = sample_rate
+        self.threshold_db = threshold_db
+        self.frame_len = sample_rate * FRAME_MS // 1000
+        self.partial_interval = sample_rate * partial_interval_ms // 1000
+        self.pause_frames = pause_ms // FRAME_MS
+        self.endpoint_frames = endpoint_ms // FRAME_MS
+        self.min_commit = int(sample_rate * min_commit_sec)
+        self.max_segment = int(sample_rate * max_segment_sec)
+
+        self._remainder = np.zeros(0, dtype=np.float32)  # samples short of a full frame
+        self._preroll = deque(maxlen=max(1, preroll_ms // FRAME_MS))
+        self._segment: List[np.ndarray] = []  # frames since the last commit
+        self._segment_len = 0
+        self._segment_voiced = False
+        self._since_partial = 0
+        self._silent_frames = 0  # consecutive silent frames at the end of the segment
+        self._committed: List[str] = []
+        self._utterance_len = 0
+        self.in_speech = False
+
+    def _is_speech(self, frame: np.ndarray) -> bool:
+        rms = float(np.sqrt(np.mean(np.square(frame, dtype=np.float64))))
+        return 20.0 * np.log10(max(rms, 1e-10)) > self.threshold_db
+
+    def _append(self, frame: np.ndarray):
+        self._segment.append(frame)
+        self._segment_len += len(frame)
+        self._utterance_len += len(frame)
+        self._since_partial += len(frame)
+
+    def _text(self, tail: str = "") -> str:
+        return " ".join(t for t in self._committed + [tail] if t)
+
+    async def _commit_segment(self):
+        # a segment of pause frames only is not worth a decode (and Whisper hallucinates on silence)
+        if self._segment_voiced:
+            text = await self.transcribe(np.concatenate(self._segment), False)
+            if text:
+                self._committed.append(text)
+        self._segment = []
+        self._segment_len = 0
+        self._segment_voiced = False
+        self._since_partial = 0
+
+    async def _end_utterance(self) -> dict:
+        await self._commit_segment()
+        event = {"type": "final", "text": self._text(),
+                 "duration_sec": round(self._utterance_len / self.sample_rate, 3)}
+        self._committed = []
+        self._utterance_len = 0
+        self._silent_frames = 0
+        self.in_speech = False
+        return event
+
+    async def feed(self, samples: np.ndarray) -> List[dict]:
+        """Add float32 samples; returns the events ("partial"/"final") to send."""
+        events = []
+        samples = np.concatenate((self._remainder, samples)) if len(self._remainder) else samples
+        n_frames = len(samples) // self.frame_len
+        self._remainder = samples[n_frames * self.frame_len:]
+
+        for i in range(n_frames):
+            frame = samples[i * self.frame_len:(i + 1) * self.frame_len]
+            speech = self._is_speech(frame)
+            if not self.in_speech:
+                if not speech:
+                    self._preroll.append(frame)
+                    continue
+                self.in_speech = True
+                for pre in self._preroll:
+                    self._append(pre)
+                self._preroll.clear()
+            self._append(frame)
+            if speech:
+                self._segment_voiced = True
+                self._silent_frames = 0
+            else:
+                self._silent_frames += 1
+
+            if self._silent_frames >= self.endpoint_frames:
+                events.append(await self._end_utterance())
+            elif ((self._silent_frames >= self.pause_frames and self._segment_len >= self.min_commit)
+                  or self._segment_len >= self.max_segment):
+                await self._commit_segment()
+
+        if self._segment_voiced and self._since_partial >= self.partial_interval:
+            self._since_partial = 0
+            text = await self.transcribe(np.concatenate(self._segment), True)
+            if text is not None:
+                events.append({"type": "partial", "text": self._text(text)})
+        return events
+
+    async def finish(self) -> List[dict]:
+        """End of stream: flush whatever is left as a final transcript."""
+        if not self.in_speech:
+            return []
+        if len(self._remainder):
+            self._append(self._remainder)
+            self._remainder = np.zeros(0, dtype=np.float32)
+        return [await self._end_utterance()]
@@ -0,0 +1,6 @@
+# stt/tests/conftest.py
+import os
+import sys
+
+# the service modules import each other flat (as in the container's /app)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,249 @@
+"""
+ASR backends: engine selection, per-profile engine options and batched transcription
+(window split, fallback to transcribe(), silence).
+File: tests/test_asr_backends.py
+"""
+import sys
+import types
+
+import numpy as np
+import pytest
+
+import asr_backends
+from asr_backends import (FasterWhisperBackend, OpenAIWhisperBackend, _BatchedWindows, _WindowResult,
+                          _kept_tokens, create_backend)
+
+SR = 16000
+TS = 50000  # timestamp_begin of the fake tokenizers
+
+
+def clip(sec):
+    return np.zeros(int(SR * sec), dtype=np.float32)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown ASR_BACKEND 'whisper.cpp'"):
+        create_backend("whisper.cpp", "base", compute_type="int8")
+
+
+class RecordingModel:
+    """Stands in for both engines' model objects: records transcribe() options."""
+
+    def __init__(self, *args, **kwargs):
+        self.init = (args, kwargs)
+        self.calls = []
+
+    def transcribe(self, audio, **options):
+        self.calls.append(options)
+        if "fp16" in options:  # openai-whisper
+            return {"text": " hi", "language": options.get("language", "en")}
+        return iter([types.SimpleNamespace(text=" hi")]), types.SimpleNamespace(language=options.get("language", "en"))
+
+
+@pytest.fixture
+def openai_whisper(monkeypatch):
+    import torch
+
+    threads = []
+    monkeypatch.setitem(sys.modules, "whisper", types.SimpleNamespace(load_model=RecordingModel))
+    monkeypatch.setattr(torch, "set_num_threads", threads.append)
+    monkeypatch.setattr(asr_backends, "_torch_threads_set", False)
+    return threads
+
+
+def test_openai_whisper_profile_options(openai_whisper):
+    backend = create_backend("openai-whisper", "base", compute_type="float32")
+    assert backend.transcribe(clip(1)) == {"text": " hi", "language": "en"}
+    backend.transcribe(clip(1), profile="command", language="hi", max_tokens=64)
+    default, command = backend.model.calls
+    assert default == {"fp16": False}
+    assert command == {"fp16": False, "temperature": 0.0, "beam_size": None, "best_of": None,
+                       "without_timestamps": True, "condition_on_previous_text": False,
+                       "sample_len": 64, "language": "hi"}
+
+
+def test_openai_whisper_fp16_only_on_gpu(openai_whisper):
+    assert create_backend("openai-whisper", "base", compute_type="float16").fp16 is False
+    assert create_backend("openai-whisper", "base", compute_type="float16", device="cuda").fp16 is True
+
+
+def test_torch_threads_are_set_once_per_process(openai_whisper):
+    for _ in range(3):  # one backend per executor worker
+        create_backend("openai-whisper", "base", compute_type="float32", cpu_threads=4)
+    assert openai_whisper == [4]
+
+
+def test_faster_whisper_profile_options(monkeypatch):
+    monkeypatch.setitem(sys.modules, "faster_whisper", types.SimpleNamespace(WhisperModel=RecordingModel))
+    backend = create_backend("faster-whisper", "small", compute_type="int8", cpu_threads=2)
+    assert backend.model.init == (("small",), {"device": "cpu", "compute_type": "int8", "cpu_threads": 2})
+
+    assert backend.transcribe(clip(1), language="hi") == {"text": " hi", "language": "hi"}
+    backend.transcribe(clip(1), profile="command", language="en", max_tokens=32)
+    default, command = backend.model.calls
+    assert default == {"language": "hi"}
+    assert command == {"temperature": 0.0, "beam_size": 1, "best_of": 1, "without_timestamps": True,
+                       "condition_on_previous_text": False, "max_new_tokens": 32, "language": "en"}
+
+
+def window(text="hello", avg_logprob=-0.2, compression_ratio=1.2, no_speech_prob=0.01, complete=True):
+    return _WindowResult(text, avg_logprob, compression_ratio, no_speech_prob, complete)
+
+
+class FakeBackend(_BatchedWindows):
+    """Batched decodes come from `windows` (by clip length); transcribe() is recorded."""
+
+    def __init__(self, windows=None):
+        self.windows = windows or {}
+        self.decoded = []
+        self.detected = []
+        self.transcribed = []
+
+    def _content_frames(self, audio):
+        return len(audio) // 160
+
+    def _detect_languages(self, clips):
+        self.detected.append(len(clips))
+        return ["hi"] * len(clips)
+
+    def _decode_windows(self, clips, options):
+        self.decoded.append(options)
+        return [self.windows.get(len(audio), window()) for audio in clips]
+
+    def transcribe(self, audio, profile="default", language=None, max_tokens=None):
+        self.transcribed.append(len(audio) / SR)
+        return {"text": "unbatched", "language": language}
+
+
+def test_long_clips_are_transcribed_on_their_own():
+    backend = FakeBackend()
+    results = backend.transcribe_batch([(clip(2), "default", "en", None), (clip(31), "default", "en", None)])
+    assert results == [{"text": "hello", "language": "en"}, {"text": "unbatched", "language": "en"}]
+    assert backend.decoded == [[("default", "en", None)]]
+    assert backend.transcribed == [31]
+
+
+def test_language_is_detected_only_where_missing():
+    backend = FakeBackend()
+    results = backend.transcribe_batch([(clip(1), "default", None, None), (clip(2), "command", "en", 64)])
+    assert backend.detected == [1]
+    assert backend.decoded == [[("default", "hi", None), ("command", "en", 64)]]
+    assert [r["language"] for r in results] == ["hi", "en"]
+
+
+def test_silence_comes_back_empty_without_a_retry():
+    backend = FakeBackend({SR: window("Thank you.", avg_logprob=-1.5, no_speech_prob=0.9)})
+    assert backend.transcribe_batch([(clip(1), "default", "en", None)]) == [{"text": "", "language": "en"}]
+    assert backend.transcribed == []
+
+
+def test_default_profile_falls_back_when_quality_checks_fail():
+    backend = FakeBackend({SR: window(avg_logprob=-1.4), 2 * SR: window(compression_ratio=3.0)})
+    results = backend.transcribe_batch([(clip(1), "default", "en", None), (clip(2), "default", "en", None)])
+    assert [r["text"] for r in results] == ["unbatched", "unbatched"]
+    assert backend.transcribed == [1, 2]
+
+
+def test_command_profile_is_never_retried():
+    backend = FakeBackend({SR: window("pay", avg_logprob=-1.4)})
+    assert backend.transcribe_batch([(clip(1), "command", "en", 64)]) == [{"text": "pay", "language": "en"}]
+    assert backend.transcribed == []
+
+
+def test_window_that_needs_a_second_pass_falls_back():
+    backend = FakeBackend({SR: window(complete=False)})
+    assert backend.transcribe_batch([(clip(1), "default", "en", None)])[0]["text"] == "unbatched"
+
+
+def test_decode_errors_stay_per_clip():
+    class Failing(FakeBackend):
+        def _decode_windows(self, clips, options):
+            return [RuntimeError("decode failed"), window()]
+
+    results = Failing().transcribe_batch([(clip(1), "default", "en", None), (clip(2), "default", "en", None)])
+    assert isinstance(results[0], RuntimeError)
+    assert results[1]["text"] == "hello"
+
+
+@pytest.mark.parametrize("tokens, expected", [
+    ([1, 2, 3], [1, 2, 3]),  # no timestamps (command profile)
+    ([TS, 1, 2, TS + 50], [TS, 1, 2, TS + 50]),  # single segment ending on a timestamp
+    ([TS, 1, TS + 50, TS + 50, 2, TS + 90], [TS, 1, TS + 50, TS + 50, 2, TS + 90]),
+    ([TS, 1, TS + 50, TS + 50, 2], [TS, 1, TS + 50]),  # unfinished segment after the end of the audio
+    ([TS, 1, TS + 20, TS + 20, 2], None),  # unfinished segment inside the audio: second window
+])
+def test_kept_tokens_follow_transcribe_seeking(tokens, expected):
+    assert _kept_tokens(tokens, TS, content_frames=100) == expected
+
+
+def test_openai_window_uses_transcribe_options():
+    backend = object.__new__(OpenAIWhisperBackend)
+    backend.fp16 = False
+
+    command = OpenAIWhisperBackend._options("command", "en", 64)
+    window_options = backend._window_options("command", "en", 64)
+    assert {k: v for k, v in command.items() if k != "condition_on_previous_text"} == \
+        {k: v for k, v in window_options.items() if k != "fp16"}
+    # default profile keeps timestamps and the engine's default search, like transcribe()
+    assert backend._window_options("default", "hi", None) == {"language": "hi", "temperature": 0.0, "fp16": False}
+
+
+class FakeTokenizer:
+    timestamp_begin = TS
+    no_timestamps = 7
+
+    def __init__(self, hf_tokenizer, multilingual, task, language):
+        self.sot_sequence = (1, {"en": 20, "hi": 21}[language], 3)
+
+    def decode(self, tokens):
+        return " ".join(f"w{t}" for t in tokens if t < TS)
+
+
+@pytest.fixture
+def faster_stubs(monkeypatch):
+    def module(name, **attrs):
+        mod = types.ModuleType(name)
+        mod.__dict__.update(attrs)
+        monkeypatch.setitem(sys.modules, name, mod)
+
+    module("faster_whisper")
+    module("faster_whisper.audio", pad_or_trim=lambda a: np.pad(a, ((0, 0), (0, 3000 - a.shape[-1]))))
+    module("faster_whisper.tokenizer", Tokenizer=FakeTokenizer)
+    module("faster_whisper.transcribe", get_suppressed_tokens=lambda tokenizer, tokens: (5, 6))
+
+
+def test_faster_whisper_batches_clips_with_the_same_settings(faster_stubs):
+    calls = []
+
+    class CT2Model:
+        is_multilingual = True
+
+        def generate(self, encoded, prompts, **kwargs):
+            calls.append((len(encoded), prompts, kwargs))
+            return [types.SimpleNamespace(sequences_ids=[[11, 12]], scores=[-0.1], no_speech_prob=0.0)
+                    for _ in prompts]
+
+    def features(audio):
+        return np.zeros((80, len(audio) // 160 + 1), dtype=np.float32)
+
+    features.hop_length = 160
+    model = types.SimpleNamespace(feature_extractor=features, model=CT2Model(), hf_tokenizer=None,
+                                  max_length=448, encode=lambda windows: list(windows))
+    backend = object.__new__(FasterWhisperBackend)
+    backend.model = model
+
+    results = backend.transcribe_batch([
+        (clip(1), "command", "en", 64), (clip(2), "command", "hi", 64), (clip(3), "default", "en", None)])
+
+    assert results == [{"text": "w11 w12", "language": lang} for lang in ("en", "hi", "en")]
+    (n_cmd, cmd_prompts, cmd_kwargs), (n_default, default_prompts, default_kwargs) = calls
+    assert n_cmd == 2 and n_default == 1
+    assert all(p[-1] == FakeTokenizer.no_timestamps for p in cmd_prompts)
+    assert cmd_kwargs["beam_size"] == 1 and cmd_kwargs["max_length"] == 4 + 64
+    assert default_prompts[0][-1] != FakeTokenizer.no_timestamps
+    assert default_kwargs["beam_size"] == 5 and default_kwargs["max_length"] == 448
+    assert cmd_kwargs["suppress_tokens"] == [5, 6]
+
+
+def test_both_backends_batch():
+    assert all(cls.batched_encoder for cls in asr_backends.BACKENDS.values())
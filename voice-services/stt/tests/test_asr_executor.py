@@ -0,0 +1,138 @@
+"""
+ASR executor: bounded admission, cancelled jobs are skipped, dead workers fail fast.
+File: tests/test_asr_executor.py
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from asr_executor import ASRExecutor, ClientDisconnected, ExecutorSaturated, ExecutorUnavailable
+
+
+@pytest.fixture
+def executor():
+    ex = ASRExecutor(lambda: "model", workers=1, max_queue=1)
+    ex.start()
+    yield ex
+    ex.shutdown(wait=True)
+
+
+def _wait(gate, model):
+    gate.wait(5)
+    return model
+
+
+def _echo(value, model):
+    return value
+
+
+def test_rejects_when_worker_and_queue_are_full(executor):
+    gate = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(_wait, gate))
+        await asyncio.sleep(0.05)  # picked up by the worker
+        queued = asyncio.ensure_future(executor.run(_wait, gate))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(_wait, gate)
+        gate.set()
+        return await asyncio.gather(running, queued)
+
+    assert asyncio.run(scenario()) == ["model", "model"]
+    assert executor.rejected == 1
+    assert executor.completed == 2
+
+
+def test_cancelled_job_is_skipped(executor):
+    gate = threading.Event()
+    ran = []
+
+    def record(model):
+        ran.append(model)
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(_wait, gate))
+        await asyncio.sleep(0.05)
+        queued = asyncio.ensure_future(executor.run(record))
+        await asyncio.sleep(0.05)
+        queued.cancel()
+        await asyncio.sleep(0.05)  # the cancel reaches the worker's future on the next loop turn
+        gate.set()
+        await running
+        return await executor.run(_echo, "after")
+
+    assert asyncio.run(scenario()) == "after"
+    assert ran == []
+    assert executor.cancelled == 1
+
+
+def test_disconnected_client_cancels_queued_job(executor):
+    gate = threading.Event()
+
+    async def gone():
+        return True
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(_wait, gate))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ClientDisconnected):
+            await executor.run(_echo, "dropped", disconnected=gone, poll_interval=0.01)
+        await asyncio.sleep(0.05)
+        gate.set()
+        await running
+        await executor.run(_echo, "after")  # queued behind the dropped job
+
+    asyncio.run(scenario())
+    assert executor.cancelled == 1
+
+
+def test_batches_jobs_with_the_same_batch_fn():
+    gate = threading.Event()
+    calls = []
+
+    def batch(args_list, model):
+        calls.append(len(args_list))
+        return [args[0] * 10 for args in args_list]
+
+    ex = ASRExecutor(lambda: "model", workers=1, max_queue=4, max_batch=3, max_batch_wait_ms=200)
+    ex.start()
+
+    async def scenario():
+        blocker = asyncio.ensure_future(ex.run(_wait, gate))
+        await asyncio.sleep(0.05)
+        jobs = [asyncio.ensure_future(ex.run(_echo, i, batch_fn=batch)) for i in (1, 2, 3)]
+        await asyncio.sleep(0.05)
+        gate.set()
+        await blocker
+        return await asyncio.gather(*jobs)
+
+    try:
+        assert asyncio.run(scenario()) == [10, 20, 30]
+    finally:
+        ex.shutdown(wait=True)
+    assert calls == [3]
+    assert ex.batches == 1
+
+
+def test_fails_fast_when_no_worker_loaded_its_model():
+    def broken():
+        time.sleep(0.05)
+        raise RuntimeError("model file missing")
+
+    ex = ASRExecutor(broken, workers=2, max_queue=4)
+    ex.start()
+
+    async def scenario():
+        with pytest.raises(ExecutorUnavailable):
+            await asyncio.wait_for(ex.run(_echo, "queued before the failures"), 2)
+        with pytest.raises(ExecutorUnavailable):
+            await ex.run(_echo, "submitted after")
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        ex.shutdown(wait=True)
+    assert ex.load_failures == 2
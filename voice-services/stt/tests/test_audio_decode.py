@@ -0,0 +1,105 @@
+"""
+In-memory audio decoding: the NumPy WAV fast path, the ffmpeg fallbacks and raw PCM streams.
+File: tests/test_audio_decode.py
+"""
+import asyncio
+import io
+import wave
+
+import numpy as np
+import pytest
+
+import audio_decode
+from audio_decode import AudioDecodeError, PCM16Stream, SAMPLE_RATE, decode_audio, decode_wav, pcm16_to_float32
+
+
+def wav_bytes(frames: bytes, width: int, channels: int = 1, rate: int = SAMPLE_RATE) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(width)
+        wav.setframerate(rate)
+        wav.writeframes(frames)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def no_ffmpeg(monkeypatch):
+    async def fail(src, data=None):
+        raise AssertionError("ffmpeg should not be needed")
+
+    monkeypatch.setattr(audio_decode, "_run_ffmpeg", fail)
+
+
+def test_16_bit():
+    audio = decode_wav(wav_bytes(np.array([0, 16384, -32768], "<i2").tobytes(), 2))
+    assert audio.dtype == np.float32
+    np.testing.assert_allclose(audio, [0.0, 0.5, -1.0])
+
+
+def test_8_bit_is_unsigned():
+    np.testing.assert_allclose(decode_wav(wav_bytes(bytes([128, 192, 0]), 1)), [0.0, 0.5, -1.0])
+
+
+def test_32_bit():
+    audio = decode_wav(wav_bytes(np.array([0, 2 ** 30, -2 ** 31], "<i4").tobytes(), 4))
+    np.testing.assert_allclose(audio, [0.0, 0.5, -1.0])
+
+
+def test_stereo_is_downmixed():
+    frames = np.array([16384, 0, -16384, -16384], "<i2").tobytes()  # (L, R) pairs
+    np.testing.assert_allclose(decode_wav(wav_bytes(frames, 2, channels=2)), [0.25, -0.5])
+
+
+def test_other_sample_rates_and_formats_need_ffmpeg():
+    assert decode_wav(wav_bytes(b"\0\0" * 10, 2, rate=44100)) is None
+    assert decode_wav(b"\x1aE\xdf\xa3 webm bytes") is None
+    assert decode_wav(b"RIFF\0\0\0\0WAVEgarbage") is None
+
+
+def test_pcm16_to_float32():
+    np.testing.assert_allclose(pcm16_to_float32(np.array([32767, -16384], "<i2").tobytes()),
+                               [32767 / 32768, -0.5])
+
+
+def test_16k_wav_skips_ffmpeg(no_ffmpeg):
+    audio = asyncio.run(decode_audio(wav_bytes(b"\0\x40" * 160, 2), "clip.wav"))
+    assert len(audio) == 160
+
+
+def test_other_rates_go_through_ffmpeg(monkeypatch):
+    seen = []
+
+    async def ffmpeg(src, data=None):
+        seen.append(src)
+        return np.array([16384], "<i2").tobytes()
+
+    monkeypatch.setattr(audio_decode, "_run_ffmpeg", ffmpeg)
+    audio = asyncio.run(decode_audio(wav_bytes(b"\0\0" * 10, 2, rate=44100), "clip.wav"))
+    assert seen == ["pipe:0"]
+    np.testing.assert_allclose(audio, [0.5])
+
+
+def test_m4a_falls_back_to_a_temporary_file(monkeypatch):
+    seen = []
+
+    async def ffmpeg(src, data=None):
+        seen.append(src)
+        if src == "pipe:0":
+            raise AudioDecodeError("moov atom not found")
+        return b"\0\0"
+
+    monkeypatch.setattr(audio_decode, "_run_ffmpeg", ffmpeg)
+    assert len(asyncio.run(decode_audio(b"m4a bytes", "voice.M4A"))) == 1
+    assert seen[1].endswith(".m4a")
+
+    with pytest.raises(AudioDecodeError):
+        asyncio.run(decode_audio(b"webm bytes", "voice.webm"))
+
+
+def test_pcm16_stream_keeps_samples_split_across_messages():
+    data = np.array([100, -200, 300], "<i2").tobytes()
+    stream = PCM16Stream()
+    pieces = [stream.feed(data[:3]), stream.feed(data[3:4]), stream.feed(b""), stream.feed(data[4:])]
+    assert [len(p) for p in pieces] == [1, 1, 0, 1]
+    np.testing.assert_allclose(np.concatenate(pieces) * 32768, [100, -200, 300])
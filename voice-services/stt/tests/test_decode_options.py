@@ -0,0 +1,52 @@
+"""
+Decode profile resolution: auto threshold, command languages, unknown profiles/languages.
+File: tests/test_decode_options.py
+"""
+import pytest
+
+from config.settings import settings
+from whisper_model import decode_options
+
+
+@pytest.fixture(autouse=True)
+def command_settings(monkeypatch):
+    monkeypatch.setattr(settings, "ASR_PROFILE", "default")
+    monkeypatch.setattr(settings, "COMMAND_LANGUAGE", "en")
+    monkeypatch.setattr(settings, "COMMAND_MAX_TOKENS", 64)
+    monkeypatch.setattr(settings, "COMMAND_MAX_SEC", 8.0)
+
+
+def test_default_profile_keeps_language_detection():
+    assert decode_options(None, None, 3.0) == {"profile": "default", "language": None, "max_tokens": None}
+    assert decode_options("default", "hi", 3.0)["language"] == "hi"
+
+
+def test_configured_profile_applies_when_none_requested(monkeypatch):
+    monkeypatch.setattr(settings, "ASR_PROFILE", "command")
+    assert decode_options(None, None, 3.0)["profile"] == "command"
+
+
+def test_command_profile_pins_language_and_token_budget():
+    assert decode_options("command", None, 3.0) == {"profile": "command", "language": "en", "max_tokens": 64}
+    assert decode_options("command", "hi", 3.0)["language"] == "hi"
+
+
+@pytest.mark.parametrize("speech_sec, profile", [(2.0, "command"), (8.0, "command"), (8.01, "default")])
+def test_auto_picks_command_for_short_speech(speech_sec, profile):
+    assert decode_options("auto", None, speech_sec)["profile"] == profile
+
+
+def test_command_language_outside_the_allowed_set_is_rejected():
+    with pytest.raises(ValueError, match="command profile"):
+        decode_options("command", "fr", 3.0)
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError, match="profile must be one of"):
+        decode_options("fast", None, 3.0)
+
+
+@pytest.mark.parametrize("profile", ["default", "command", "auto"])
+def test_unknown_language_is_rejected_for_every_profile(profile):
+    with pytest.raises(ValueError, match="unsupported language"):
+        decode_options(profile, "xx", 20.0)
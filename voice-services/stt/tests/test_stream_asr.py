@@ -0,0 +1,93 @@
+"""
+Streaming session: partial hypotheses, segment commits on pauses and the final transcript.
+File: tests/test_stream_asr.py
+"""
+import asyncio
+
+import numpy as np
+
+from stream_asr import StreamingSession
+
+SR = 16000
+
+
+def silence(sec):
+    return np.zeros(int(SR * sec), dtype=np.float32)
+
+
+def speech(sec):
+    t = np.arange(int(SR * sec)) / SR
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+class FakeWhisper:
+    """Records every decode; commits return seg1, seg2, ... and partials return "partial"."""
+
+    def __init__(self):
+        self.calls = []  # (partial, seconds of audio)
+        self.commits = 0
+
+    async def __call__(self, samples, partial):
+        self.calls.append((partial, len(samples) / SR))
+        if partial:
+            return "partial"
+        self.commits += 1
+        return f"seg{self.commits}"
+
+
+def stream(session, clip, chunk_sec=0.1):
+    async def run():
+        events = []
+        step = int(SR * chunk_sec)
+        for i in range(0, len(clip), step):
+            events += await session.feed(clip[i:i + step])
+        return events + await session.finish()
+
+    return asyncio.run(run())
+
+
+def test_partial_commit_final_sequence():
+    whisper = FakeWhisper()
+    session = StreamingSession(whisper, SR)
+    clip = np.concatenate((silence(1.0), speech(2.5), silence(0.4), speech(1.0), silence(1.0)))
+    events = stream(session, clip)
+
+    # partials while the first segment grows, then ones prefixed by the committed text
+    partials = [e["text"] for e in events if e["type"] == "partial"]
+    assert partials[:2] == ["partial", "partial"]
+    assert partials[-1] == "seg1 partial"
+    assert [e["type"] for e in events].count("final") == 1
+    final = events[-1]
+    assert final["type"] == "final" and final["text"] == "seg1 seg2"
+    assert 3.9 < final["duration_sec"] < len(clip) / SR  # speech and pauses, not the leading silence
+
+    commits = [sec for partial, sec in whisper.calls if not partial]
+    assert len(commits) == 2
+    assert commits[0] >= 2.5  # the first segment, committed at the 0.4 s pause
+    assert commits[1] < 2.0  # the final decode covers only the audio after the commit
+
+
+def test_short_pause_does_not_commit():
+    whisper = FakeWhisper()
+    session = StreamingSession(whisper, SR)
+    # a pause inside a segment shorter than min_commit_sec keeps the segment open
+    clip = np.concatenate((speech(1.0), silence(0.4), speech(0.5), silence(1.0)))
+    events = stream(session, clip)
+    assert [e["text"] for e in events if e["type"] == "final"] == ["seg1"]
+    assert sum(1 for partial, _ in whisper.calls if not partial) == 1
+
+
+def test_finish_flushes_an_open_utterance():
+    whisper = FakeWhisper()
+    session = StreamingSession(whisper, SR)
+    events = stream(session, np.concatenate((silence(0.5), speech(0.5))))
+    assert events[-1]["type"] == "final"
+    assert events[-1]["text"] == "seg1"
+    assert events[-1]["duration_sec"] >= 0.5
+
+
+def test_silence_only_stream_sends_nothing():
+    whisper = FakeWhisper()
+    events = stream(StreamingSession(whisper, SR), silence(3.0))
+    assert events == []
+    assert whisper.calls == []
@@ -0,0 +1,61 @@
+"""
+Silence trimming: silence-only clips, clips that are speech throughout, padding and gaps.
+File: tests/test_vad.py
+"""
+import numpy as np
+import pytest
+
+from vad import trim_silence
+
+SR = 16000
+rng = np.random.default_rng(0)
+
+
+def silence(sec):
+    return (rng.standard_normal(int(SR * sec)) * 1e-4).astype(np.float32)
+
+
+def speech(sec):
+    t = np.arange(int(SR * sec)) / SR
+    return (0.3 * np.sin(2 * np.pi * 220 * t) + rng.standard_normal(len(t)) * 0.01).astype(np.float32)
+
+
+def test_silence_only_returns_empty():
+    kept, report = trim_silence(silence(2.0), SR)
+    assert len(kept) == 0
+    assert report["speech_sec"] == 0.0
+    assert report["leading_trimmed_sec"] == report["original_sec"] == 2.0
+
+
+def test_all_speech_is_kept():
+    clip = speech(3.0)
+    kept, report = trim_silence(clip, SR)
+    assert len(kept) == len(clip)
+    assert report["leading_trimmed_sec"] == report["trailing_trimmed_sec"] == 0.0
+
+
+def test_leading_and_trailing_silence_cut_with_padding():
+    clip = np.concatenate((silence(1.0), speech(1.0), silence(1.0)))
+    kept, report = trim_silence(clip, SR, padding_ms=200)
+    assert report["speech_sec"] == pytest.approx(1.4, abs=0.05)  # 200 ms kept on each side
+    assert report["leading_trimmed_sec"] == pytest.approx(0.8, abs=0.05)
+    assert report["trailing_trimmed_sec"] == pytest.approx(0.8, abs=0.05)
+    assert len(kept) == round(report["speech_sec"] * SR)
+
+
+def test_inner_pauses_kept_unless_drop_gaps():
+    clip = np.concatenate((speech(1.0), silence(2.0), speech(1.0)))
+    _, report = trim_silence(clip, SR, padding_ms=100)
+    assert report["gaps_trimmed_sec"] == 0.0
+    assert report["speech_sec"] == pytest.approx(4.0, abs=0.05)
+
+    kept, report = trim_silence(clip, SR, padding_ms=100, drop_gaps=True, max_gap_ms=600)
+    assert report["speech_sec"] == pytest.approx(1.1 + 0.6 + 1.1, abs=0.05)
+    assert report["gaps_trimmed_sec"] == pytest.approx(4.0 - report["speech_sec"], abs=0.01)
+
+
+def test_clip_shorter_than_a_frame_is_returned_unchanged():
+    clip = speech(0.01)
+    kept, report = trim_silence(clip, SR)
+    assert kept is clip
+    assert report["speech_sec"] == 0.01
@@ -0,0 +1,93 @@
+# stt/vad.py
+"""
+Energy-based voice activity detection, used to trim silence before Whisper.
+
+- Audio is cut into 30 ms frames. A frame is speech when its RMS level is above both
+  an absolute floor (threshold_db) and the clip's own noise floor plus margin_db
+  (capped at the loudest frame minus margin_db, so a clip that is speech from start
+  to end is not mistaken for noise). Quiet rooms and noisy ones work with the same
+  settings.
+- Speech regions are padded by padding_ms on each side so word onsets and tails are kept.
+- Leading and trailing silence is always cut. With drop_gaps, inner pauses longer than
+  max_gap_ms are shortened to max_gap_ms as well.
+
+Pure NumPy: a 30 s clip takes a few milliseconds.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+FRAME_MS = 30
+
+
+def _frame_levels_db(samples: np.ndarray, frame_len: int) -> np.ndarray:
+    n_frames = len(samples) // frame_len
+    frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+
+def _speech_regions(voiced: np.ndarray):
+    """[(start_frame, end_frame), ...] of consecutive voiced frames."""
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int = 16000, threshold_db: float = -45.0,
+                 margin_db: float = 10.0, padding_ms: int = 200, drop_gaps: bool = False,
+                 max_gap_ms: int = 600) -> Tuple[np.ndarray, dict]:
+    """
+    Return (speech samples, report). The report gives durations in seconds:
+    original, kept, leading/trailing silence removed and inner gap time removed.
+    An empty array means no speech was found.
+    """
+    frame_len = sample_rate * FRAME_MS // 1000
+    original = len(samples) / sample_rate
+    report = {"original_sec": round(original, 3), "speech_sec": round(original, 3),
+              "leading_trimmed_sec": 0.0, "trailing_trimmed_sec": 0.0, "gaps_trimmed_sec": 0.0}
+    if len(samples) < frame_len:
+        return samples, report
+
+    levels = _frame_levels_db(samples, frame_len)
+    noise_floor = float(np.percentile(levels, 10))
+    relative = min(noise_floor, float(levels.max()) - 2 * margin_db) + margin_db
+    voiced = levels > max(threshold_db, relative)
+    regions = _speech_regions(voiced)
+    if not regions:
+        report.update(speech_sec=0.0, leading_trimmed_sec=round(original, 3))
+        return samples[:0], report
+
+    pad = padding_ms * sample_rate // 1000
+    spans = [(max(0, int(s) * frame_len - pad), min(len(samples), int(e) * frame_len + pad))
+             for s, e in regions]
+    merged = [list(spans[0])]
+    max_gap = max_gap_ms * sample_rate // 1000 if drop_gaps else None
+    for start, end in spans[1:]:
+        if max_gap is None or start - merged[-1][1] <= max_gap:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    if len(merged) == 1:
+        start, end = merged[0]
+        kept = samples[start:end]
+        gaps = 0
+    else:
+        # keep max_gap of each long pause so words stay separated
+        pieces = [samples[merged[0][0]:merged[0][1]]]
+        gaps = 0
+        for (_, prev_end), (start, end) in zip(merged, merged[1:]):
+            gap = start - prev_end
+            pieces.append(samples[prev_end:prev_end + max_gap])
+            gaps += gap - max_gap
+            pieces.append(samples[start:end])
+        kept = np.concatenate(pieces)
+
+    report.update(
+        speech_sec=round(len(kept) / sample_rate, 3),
+        leading_trimmed_sec=round(merged[0][0] / sample_rate, 3),
+        trailing_trimmed_sec=round((len(samples) - merged[-1][1]) / sample_rate, 3),
+        gaps_trimmed_sec=round(gaps / sample_rate, 3),
+    )
+    return kept, report
@@ -1,15 +1,67 @@
 # stt/whisper_model.py
 
-import whisper
+from typing import Optional
+
+from asr_backends import BACKENDS, DECODE_PROFILES, WHISPER_LANGUAGES, create_backend
 from config.settings import settings
 
 _whisper_model = None
 
+COMMAND_LANGUAGES = tuple(lang.strip() for lang in settings.COMMAND_LANGUAGES.split(","))
+
+
+def create_whisper():
+    """A new ASR backend instance (each executor worker owns one)."""
+    print(f"Loading Whisper model: {settings.WHISPER_MODEL} "
+          f"({settings.ASR_BACKEND}, {settings.COMPUTE_TYPE}, {settings.ASR_DEVICE})")
+    return create_backend(
+        settings.ASR_BACKEND,
+        settings.WHISPER_MODEL,
+        compute_type=settings.COMPUTE_TYPE,
+        device=settings.ASR_DEVICE,
+        cpu_threads=settings.ASR_CPU_THREADS,
+    )
+
+
+def supports_batching() -> bool:
+    """Whether the configured backend can share one encoder pass between requests."""
+    backend_class = BACKENDS.get(settings.ASR_BACKEND)
+    return bool(getattr(backend_class, "batched_encoder", False))
+
 
 def load_whisper():
     """Loads Whisper once (singleton)"""
     global _whisper_model
     if _whisper_model is None:
-        print(f"Loading Whisper model: {settings.WHISPER_MODEL}")
-        _whisper_model = whisper.load_model(settings.WHISPER_MODEL)
+        _whisper_model = create_whisper()
     return _whisper_model
+
+
+def transcribe_samples(samples, profile="default", language=None, max_tokens=None, model=None) -> dict:
+    """Transcribe float32 16 kHz mono samples with one of asr_backends.DECODE_PROFILES."""
+    return (model or load_whisper()).transcribe(samples, profile=profile, language=language, max_tokens=max_tokens)
+
+
+def transcribe_batch(items, model=None) -> list:
+    """transcribe_samples for several clips at once: [(samples, profile, language, max_tokens), ...]"""
+    return (model or load_whisper()).transcribe_batch(items)
+
+
+def decode_options(profile: Optional[str], language: Optional[str], speech_sec: float) -> dict:
+    """
+    Resolve the requested profile (or ASR_PROFILE) into transcribe_samples arguments.
+    Raises ValueError (a 400 for the API) for an unknown profile or language.
+    """
+    profile = profile or settings.ASR_PROFILE
+    if profile == "auto":
+        profile = "command" if speech_sec <= settings.COMMAND_MAX_SEC else "default"
+    if profile not in DECODE_PROFILES:
+        raise ValueError(f"profile must be one of {', '.join(DECODE_PROFILES + ('auto',))}")
+    if language is not None and language not in WHISPER_LANGUAGES:
+        raise ValueError(f"unsupported language {language!r}")
+    if profile == "command":
+        language = language or settings.COMMAND_LANGUAGE
+        if language not in COMMAND_LANGUAGES:
+            raise ValueError(f"command profile supports languages {', '.join(COMMAND_LANGUAGES)}")
+        return {"profile": profile, "language": language, "max_tokens": settings.COMMAND_MAX_TOKENS}
+    return {"profile": profile, "language": language, "max_tokens": None}
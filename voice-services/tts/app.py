@@ -1,16 +1,19 @@
 # tts/app.py
 
 import os
-import uuid
+import asyncio
 import logging.config
 import base64
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
 from config.settings import settings
-from tts_engine import synthesize
-from tts_utils import ensure_not_replay
+from tts_engine import create_tts, synthesize, synthesize_pcm
+from tts_utils import ensure_not_replay, split_for_streaming, wav_stream_header
+from audio_cache import AudioCache
+from worker_pool import TTSWorkerPool, PoolSaturated, PoolUnavailable
 
 logging.config.fileConfig(settings.LOG_CONFIG_PATH)
 log = logging.getLogger("tts")
@@ -30,6 +33,58 @@ os.makedirs(settings.OUTPUT_DIR, exist_ok=True)
 # Serve audio files as static
 app.mount("/audio", StaticFiles(directory=settings.OUTPUT_DIR), name="audio")
 
+# Synthesis runs on TTS_WORKERS threads with preloaded models, never on the event loop
+tts_pool = TTSWorkerPool(
+    model_factory=create_tts,
+    workers=settings.TTS_WORKERS,
+    max_queue=settings.TTS_QUEUE_SIZE,
+    timeout=settings.TTS_TIMEOUT_S,
+    warmup_text=settings.TTS_WARMUP_TEXT,
+)
+
+
+def _remove_file(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+async def synthesize_to_file(text: str, file_id: str):
+    # a file written after the request timed out is deleted instead of left untracked
+    return await tts_pool.run(synthesize, text, file_id, cleanup=_remove_file)
+
+
+# Identical text is synthesized once; OUTPUT_DIR is bounded by TTS_CACHE_MAX_BYTES
+# (clips handed out in the last TTS_CACHE_GRACE_S seconds are kept until fetched)
+audio_cache = AudioCache(
+    directory=settings.OUTPUT_DIR,
+    model=settings.TTS_MODEL,
+    audio_format=settings.AUDIO_FORMAT,
+    max_bytes=settings.TTS_CACHE_MAX_BYTES,
+    grace_seconds=settings.TTS_CACHE_GRACE_S,
+    synthesize_fn=synthesize_to_file,
+)
+
+
+@app.on_event("startup")
+async def startup():
+    tts_pool.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    tts_pool.shutdown(wait=False)
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+def ready():
+    status = tts_pool.readiness(settings.TTS_READY_QUEUE_DEPTH)
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
 
 @app.post("/tts")
 async def text_to_speech(payload: dict):
@@ -43,16 +98,106 @@ async def text_to_speech(payload: dict):
     # except ValueError:
     #     raise HTTPException(status_code=409, detail="Replay blocked")
 
-    # Generate audio file
-    file_id = uuid.uuid4().hex
-    output_path = os.path.join(settings.OUTPUT_DIR, f"{file_id}.{settings.AUDIO_FORMAT}")
-
-    synthesize(text, file_id)  # generates output_path
+    # Generate audio file (or reuse the cached clip for the same text)
+    try:
+        file_id, cached = await audio_cache.get_or_synthesize(text)
+    except PoolSaturated:
+        raise HTTPException(status_code=503, detail="TTS is busy", headers={"Retry-After": "1"})
+    except PoolUnavailable:
+        raise HTTPException(status_code=503, detail="TTS model unavailable")
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Speech synthesis timed out")
+    except Exception as e:
+        log.error(f"TTS synthesis failed: {e}")
+        raise HTTPException(status_code=500, detail="Speech synthesis failed")
 
     # Return SHORT output (URL only)
     audio_url = f"/audio/{file_id}.{settings.AUDIO_FORMAT}"
 
     return {
         "audio_url": audio_url,
-        "format": settings.AUDIO_FORMAT
+        "format": settings.AUDIO_FORMAT,
+        "cached": cached
     }
+
+
+@app.get("/tts/cache")
+def tts_cache_stats():
+    return audio_cache.stats()
+
+
+@app.get("/tts/workers")
+def tts_worker_stats():
+    return tts_pool.stats()
+
+
+async def _synthesize_chunks(chunks, queue: asyncio.Queue):
+    """Synthesize chunks in order on the worker pool, handing each to the queue as soon as it is ready."""
+    try:
+        for chunk in chunks:
+            pcm = await tts_pool.run(synthesize_pcm, chunk)
+            await queue.put(pcm)
+    except Exception as e:
+        await queue.put(e)
+    else:
+        await queue.put(None)
+
+
+async def _stream_wav(first_pcm: bytes, rest):
+    # an open-ended WAV header lets the client start playing before the length is known;
+    # the sample rate is known once a worker has loaded its model
+    yield wav_stream_header(tts_pool.sample_rate)
+    yield first_pcm
+    if not rest:
+        return
+    queue = asyncio.Queue(maxsize=settings.TTS_STREAM_PREFETCH)
+    producer = asyncio.ensure_future(_synthesize_chunks(rest, queue))
+    try:
+        sent = 1
+        while (pcm := await queue.get()) is not None:
+            if isinstance(pcm, Exception):
+                # the 200 is already out: abort the response instead of ending the body
+                # cleanly, so the client sees a broken stream rather than a short clip
+                log.error(f"Streaming TTS failed after {sent} of {len(rest) + 1} chunks: {pcm!r}")
+                raise pcm
+            yield pcm
+            sent += 1
+    finally:
+        # client went away: stop synthesizing the rest of the reply
+        producer.cancel()
+
+
+@app.post("/tts/stream")
+async def text_to_speech_stream(payload: dict):
+    """
+    Chunked WAV (16-bit mono PCM) of text, synthesized sentence by sentence.
+    Playback can start after the first sentence instead of after the whole reply.
+    If a later sentence fails, the connection is aborted mid-body (X-TTS-Chunks gives the
+    expected count), so a truncated reply never looks like a complete one.
+    """
+    text = payload.get("text")
+    if not text:
+        raise HTTPException(status_code=400, detail="Text is required")
+
+    chunks = split_for_streaming(text, max_chars=settings.TTS_STREAM_CHUNK_CHARS)
+    if not chunks:
+        raise HTTPException(status_code=400, detail="Text is required")
+    # once streaming has started the status can no longer change, so the first chunk
+    # is synthesized before the response starts and its failure is a proper error
+    try:
+        first_pcm = await tts_pool.run(synthesize_pcm, chunks[0])
+    except PoolSaturated:
+        raise HTTPException(status_code=503, detail="TTS is busy", headers={"Retry-After": "1"})
+    except PoolUnavailable:
+        raise HTTPException(status_code=503, detail="TTS model unavailable")
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Speech synthesis timed out")
+    except Exception as e:
+        log.error(f"Streaming TTS synthesis failed: {e!r}")
+        raise HTTPException(status_code=500, detail="Speech synthesis failed")
+
+    return StreamingResponse(
+        _stream_wav(first_pcm, chunks[1:]),
+        media_type="audio/wav",
+        headers={"X-TTS-Chunks": str(len(chunks))},
+    )
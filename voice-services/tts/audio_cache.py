@@ -0,0 +1,151 @@
+# tts/audio_cache.py
+"""
+Content-addressed cache of synthesized audio in OUTPUT_DIR.
+
+- A clip is stored as <key>.<format>, key = audio_cache_key(text, model, format),
+  so identical prompts are synthesized once and served from disk afterwards.
+- Concurrent requests for the same key share one synthesis. It writes to a unique
+  <key>.part-<token> name that is renamed into place only on success, so a synthesis
+  that finishes after its request failed never overwrites or leaks a tracked clip.
+- Files are evicted least-recently-used once their total size exceeds max_bytes.
+  A clip handed out in the last grace_seconds is skipped, since the client may not have
+  fetched its /audio URL yet; the cache can run over max_bytes until those expire.
+  Files already in OUTPUT_DIR at start-up (including old uuid-named outputs) are
+  indexed by mtime, so they age out first instead of accumulating forever.
+
+All bookkeeping happens on the event loop; synthesize_fn hands the synthesis itself
+to the worker pool.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Tuple
+
+from tts_utils import audio_cache_key, normalize_tts_text
+
+log = logging.getLogger("tts")
+
+PARTIAL_MARK = ".part-"
+
+
+class AudioCache:
+    def __init__(self, directory: str, model: str, audio_format: str, max_bytes: int,
+                 synthesize_fn: Callable[[str, str], Awaitable], grace_seconds: float = 60.0):
+        """
+        await synthesize_fn(text, file_id) must write <directory>/<file_id>.<audio_format>.
+        If it raises while the file may still be written later, it must delete that file
+        itself once written (see TTSWorkerPool.run's cleanup).
+        """
+        self.directory = directory
+        self.model = model
+        self.audio_format = audio_format
+        self.max_bytes = max_bytes
+        self.synthesize_fn = synthesize_fn
+        self.grace_seconds = grace_seconds
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> file size, LRU first
+        self._handed_out: Dict[str, float] = {}  # key -> monotonic time it was last returned
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._index_existing()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.{self.audio_format}")
+
+    def _index_existing(self):
+        files = []
+        for name in os.listdir(self.directory):
+            key, ext = os.path.splitext(name)
+            path = os.path.join(self.directory, name)
+            if PARTIAL_MARK in key:
+                os.remove(path)  # left over from a synthesis interrupted by a restart
+                continue
+            if ext == f".{self.audio_format}" and os.path.isfile(path):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, key, stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self.total_bytes += size
+        self._evict()
+
+    def _evict(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+        recent = time.monotonic() - self.grace_seconds
+        for key, size in list(self._entries.items()):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if self._handed_out.get(key, float("-inf")) > recent:
+                continue  # its URL may not have been fetched yet
+            del self._entries[key]
+            self._handed_out.pop(key, None)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError as e:
+                log.warning(f"Could not delete evicted clip {key}: {e}")
+
+    async def get_or_synthesize(self, text: str) -> Tuple[str, bool]:
+        """Return (file_id, cache_hit) for text; file_id is the file name without extension."""
+        key = audio_cache_key(text, self.model, self.audio_format)
+        if key in self._entries and os.path.exists(self._path(key)):
+            self._entries.move_to_end(key)
+            self._handed_out[key] = time.monotonic()
+            self.hits += 1
+            return key, True
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            # not tied to this request: a disconnecting client must not abort the shared synthesis
+            task = asyncio.ensure_future(self._synthesize(key, text))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._synthesis_done(key, t))
+        else:
+            self.coalesced += 1
+        await asyncio.shield(task)
+        return key, False
+
+    async def _synthesize(self, key: str, text: str):
+        partial_id = f"{key}{PARTIAL_MARK}{uuid.uuid4().hex[:8]}"
+        partial_path = self._path(partial_id)
+        path = self._path(key)
+        try:
+            await self.synthesize_fn(normalize_tts_text(text), partial_id)
+            os.replace(partial_path, path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        size = os.path.getsize(path)
+        self.total_bytes += size - self._entries.pop(key, 0)
+        self._entries[key] = size
+        self._handed_out[key] = time.monotonic()  # about to be returned to the waiting requests
+        self._evict()
+
+    def _synthesis_done(self, key: str, task: asyncio.Future):
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            log.error(f"Synthesis failed for {key}: {task.exception()!r}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": ((self.hits + self.coalesced) / lookups) if lookups else 0.0,
+        }
@@ -15,6 +15,24 @@ class Settings(BaseSettings):
     OUTPUT_DIR: str = os.path.join(BASE_DIR, "data", "out")
     AUDIO_FORMAT: str = "wav"
 
+    # Content-addressed audio cache: total size of OUTPUT_DIR before LRU eviction
+    TTS_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    # Clips returned by /tts in the last N seconds are not evicted (the client has yet to fetch them)
+    TTS_CACHE_GRACE_S: float = 60.0
+
+    # /tts/stream: sentences longer than this are split at clause punctuation
+    TTS_STREAM_CHUNK_CHARS: int = 120
+    # Synthesized chunks buffered ahead of a slow client
+    TTS_STREAM_PREFETCH: int = 2
+
+    # Worker pool: model instances loaded at startup, one synthesis at a time each
+    TTS_WORKERS: int = 1
+    TTS_QUEUE_SIZE: int = 16
+    TTS_TIMEOUT_S: float = 30.0
+    TTS_WARMUP_TEXT: str = "Hello."
+    # /ready reports not ready while this many jobs are waiting
+    TTS_READY_QUEUE_DEPTH: int = 8
+
     # Security
     JWT_SECRET: str = "change-this"
     JWT_ALGO: str = "HS256"
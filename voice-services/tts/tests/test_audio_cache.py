@@ -0,0 +1,120 @@
+"""
+Audio cache: hits, coalesced syntheses, byte-bound LRU eviction and partial files.
+File: tests/test_audio_cache.py
+"""
+import asyncio
+import os
+
+import pytest
+
+from audio_cache import PARTIAL_MARK, AudioCache
+
+
+class FakeSynth:
+    """Writes `size` bytes per clip after `delay` seconds; optionally fails."""
+
+    def __init__(self, directory, size=100, delay=0.0, fail=False):
+        self.directory = directory
+        self.size = size
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+
+    async def __call__(self, text, file_id):
+        self.calls.append(text)
+        await asyncio.sleep(self.delay)
+        with open(os.path.join(self.directory, f"{file_id}.wav"), "wb") as f:
+            f.write(b"\0" * self.size)
+        if self.fail:
+            raise RuntimeError("synthesis failed")
+
+
+def make_cache(tmp_path, synth=None, max_bytes=1000, grace_seconds=0.0):
+    synth = synth or FakeSynth(str(tmp_path))
+    cache = AudioCache(str(tmp_path), model="m", audio_format="wav", max_bytes=max_bytes,
+                       synthesize_fn=synth, grace_seconds=grace_seconds)
+    return cache, synth
+
+
+def files(tmp_path):
+    return sorted(os.listdir(tmp_path))
+
+
+def test_miss_then_hit(tmp_path):
+    cache, synth = make_cache(tmp_path)
+
+    async def scenario():
+        first = await cache.get_or_synthesize("Hello there")
+        second = await cache.get_or_synthesize("  Hello   there ")  # same normalized text
+        return first, second
+
+    (key, cached), (key2, cached2) = asyncio.run(scenario())
+    assert (cached, cached2) == (False, True)
+    assert key == key2
+    assert files(tmp_path) == [f"{key}.wav"]
+    assert synth.calls == ["Hello there"]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_concurrent_identical_requests_share_one_synthesis(tmp_path):
+    cache, synth = make_cache(tmp_path, FakeSynth(str(tmp_path), delay=0.05))
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_synthesize("Your balance is 500") for _ in range(3)))
+
+    results = asyncio.run(scenario())
+    assert len({key for key, _ in results}) == 1
+    assert len(synth.calls) == 1
+    assert cache.coalesced == 2
+
+
+def test_least_recently_used_clips_are_evicted(tmp_path):
+    cache, _ = make_cache(tmp_path, max_bytes=250)
+
+    async def scenario():
+        a, _ = await cache.get_or_synthesize("a")
+        b, _ = await cache.get_or_synthesize("b")
+        await cache.get_or_synthesize("a")  # b is now least recently used
+        c, _ = await cache.get_or_synthesize("c")
+        return a, b, c
+
+    a, b, c = asyncio.run(scenario())
+    assert files(tmp_path) == sorted([f"{a}.wav", f"{c}.wav"])
+    assert cache.total_bytes == 200
+    assert cache.evictions == 1
+
+
+def test_recently_handed_out_clips_survive_eviction(tmp_path):
+    cache, _ = make_cache(tmp_path, max_bytes=150, grace_seconds=60)
+
+    async def scenario():
+        return [(await cache.get_or_synthesize(text))[0] for text in ("a", "b")]
+
+    a, b = asyncio.run(scenario())
+    # both URLs were just returned: neither is deleted, the cache runs over budget for now
+    assert files(tmp_path) == sorted([f"{a}.wav", f"{b}.wav"])
+    assert cache.total_bytes == 200
+
+    cache.grace_seconds = 0
+    cache._evict()
+    assert files(tmp_path) == [f"{b}.wav"]
+
+
+def test_failed_synthesis_leaves_no_partial_file(tmp_path):
+    cache, _ = make_cache(tmp_path, FakeSynth(str(tmp_path), fail=True))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_synthesize("oops"))
+    assert files(tmp_path) == []
+    assert cache.stats()["entries"] == 0
+
+
+def test_startup_indexes_clips_and_removes_partials(tmp_path):
+    (tmp_path / "old.wav").write_bytes(b"\0" * 300)
+    (tmp_path / "new.wav").write_bytes(b"\0" * 300)
+    os.utime(tmp_path / "old.wav", (1, 1))
+    (tmp_path / f"abc{PARTIAL_MARK}1234.wav").write_bytes(b"\0" * 10)
+
+    cache, _ = make_cache(tmp_path, max_bytes=400)
+    assert files(tmp_path) == ["new.wav"]  # oldest evicted first, partial deleted
+    assert cache.total_bytes == 300
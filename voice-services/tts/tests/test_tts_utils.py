@@ -0,0 +1,53 @@
+"""
+Streaming helpers: sentence/clause chunking and the open-ended WAV header.
+File: tests/test_tts_utils.py
+"""
+import io
+import struct
+import wave
+
+from tts_utils import split_for_streaming, wav_stream_header
+
+
+def test_splits_on_sentence_ends_and_newlines():
+    text = "Your balance is 500 rupees.  Anything else?\nSay yes or no!"
+    assert split_for_streaming(text) == ["Your balance is 500 rupees.", "Anything else?", "Say yes or no!"]
+
+
+def test_does_not_split_inside_numbers_or_words():
+    assert split_for_streaming("Transfer 1.5 lakh to Mr.Sharma.") == ["Transfer 1.5 lakh to Mr.Sharma."]
+
+
+def test_long_sentences_are_split_on_clauses():
+    text = "First I will check your account, then I will confirm the payee, and finally I will send the money."
+    chunks = split_for_streaming(text, max_chars=40)
+    assert chunks == ["First I will check your account,", "then I will confirm the payee,",
+                      "and finally I will send the money."]
+    assert " ".join(chunks) == text
+
+
+def test_a_clause_longer_than_max_chars_is_kept_whole():
+    text = "a" * 50 + ", b."
+    assert split_for_streaming(text, max_chars=20) == ["a" * 50 + ",", "b."]
+
+
+def test_whitespace_only_text_has_no_chunks():
+    assert split_for_streaming("  \n\n ") == []
+
+
+def test_wav_stream_header_fields():
+    header = wav_stream_header(22050)
+    assert len(header) == 44
+    assert header[:4] == b"RIFF" and header[8:16] == b"WAVEfmt "
+    fmt_size, audio_format, channels, rate, byte_rate, block_align, bits = struct.unpack("<IHHIIHH", header[16:36])
+    assert (fmt_size, audio_format, channels, rate, bits) == (16, 1, 1, 22050, 16)
+    assert byte_rate == 22050 * 2 and block_align == 2
+    assert header[36:40] == b"data"
+    assert struct.unpack("<I", header[4:8])[0] == struct.unpack("<I", header[40:44])[0] == 0xFFFFFFFF
+
+
+def test_header_plus_pcm_is_playable():
+    pcm = struct.pack("<4h", 0, 1000, -1000, 32767)
+    with wave.open(io.BytesIO(wav_stream_header(16000) + pcm)) as wav:
+        assert (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()) == (1, 2, 16000)
+        assert wav.readframes(4) == pcm
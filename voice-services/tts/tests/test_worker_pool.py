@@ -0,0 +1,151 @@
+"""
+TTS worker pool: timeouts drop or clean up jobs exactly once, dead workers fail fast.
+File: tests/test_worker_pool.py
+"""
+import asyncio
+import threading
+import time
+import types
+
+import pytest
+
+import worker_pool
+from worker_pool import PoolSaturated, PoolUnavailable, TTSWorkerPool
+
+
+def fake_tts():
+    return types.SimpleNamespace(tts=lambda text: [0.0], synthesizer=types.SimpleNamespace(output_sample_rate=22050))
+
+
+def make_pool(factory=fake_tts, **kwargs):
+    pool = TTSWorkerPool(factory, warmup_text="", **kwargs)
+    pool.start()
+    return pool
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_job_timing_out_in_the_queue_never_runs():
+    pool = make_pool(max_queue=2, timeout=0.1)
+    gate = threading.Event()
+    ran, cleaned = [], []
+
+    async def scenario():
+        blocker = asyncio.ensure_future(pool.run(lambda tts: gate.wait(5)))
+        await asyncio.sleep(0.02)
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(lambda tts: ran.append(1), cleanup=cleaned.append)
+        with pytest.raises(asyncio.TimeoutError):
+            await blocker
+        gate.set()
+
+    try:
+        asyncio.run(scenario())
+        assert wait_until(lambda: pool.busy == 0 and pool.queue_depth == 0)
+    finally:
+        pool.shutdown()
+    assert ran == [] and cleaned == []
+    assert pool.timeouts == 2
+
+
+def test_result_finishing_after_the_timeout_is_cleaned_up_by_the_worker():
+    pool = make_pool(timeout=0.05)
+    cleaned = []
+
+    def slow(tts):
+        time.sleep(0.2)
+        return "late.wav"
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(slow, cleanup=cleaned.append)
+
+    try:
+        asyncio.run(scenario())
+        assert wait_until(lambda: cleaned)
+        time.sleep(0.05)
+    finally:
+        pool.shutdown()
+    assert cleaned == ["late.wav"]
+
+
+def test_result_landing_as_the_timeout_fires_is_cleaned_up_once(monkeypatch):
+    pool = make_pool()
+    cleaned = []
+
+    async def timeout_after_result(awaitable, timeout):
+        await awaitable  # the worker set the result, then the timer fired anyway
+        raise asyncio.TimeoutError()
+
+    monkeypatch.setattr(worker_pool.asyncio, "wait_for", timeout_after_result)
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(lambda tts: "raced.wav", cleanup=cleaned.append)
+
+    try:
+        asyncio.run(scenario())
+        time.sleep(0.05)
+    finally:
+        pool.shutdown()
+    assert cleaned == ["raced.wav"]
+
+
+def test_successful_result_is_not_cleaned_up():
+    pool = make_pool()
+    cleaned = []
+
+    try:
+        assert asyncio.run(pool.run(lambda tts: "kept.wav", cleanup=cleaned.append)) == "kept.wav"
+    finally:
+        pool.shutdown()
+    assert cleaned == []
+    assert pool.sample_rate == 22050
+
+
+def test_rejects_when_the_queue_is_full():
+    pool = make_pool(max_queue=1)
+    gate = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(pool.run(lambda tts: gate.wait(5)))
+        await asyncio.sleep(0.05)
+        queued = asyncio.ensure_future(pool.run(lambda tts: None))
+        await asyncio.sleep(0.02)
+        with pytest.raises(PoolSaturated):
+            await pool.run(lambda tts: None)
+        gate.set()
+        await asyncio.gather(running, queued)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert pool.rejected == 1
+
+
+def test_fails_fast_when_no_worker_loaded_its_model():
+    def broken():
+        time.sleep(0.05)
+        raise RuntimeError("model download failed")
+
+    pool = make_pool(broken, workers=2, timeout=30)
+
+    async def scenario():
+        started = time.perf_counter()
+        with pytest.raises(PoolUnavailable):
+            await pool.run(lambda tts: None)  # queued before the loads failed
+        with pytest.raises(PoolUnavailable):
+            await pool.run(lambda tts: None)
+        return time.perf_counter() - started
+
+    try:
+        assert asyncio.run(scenario()) < 1.0
+    finally:
+        pool.shutdown()
+    assert pool.readiness(1)["ready"] is False
@@ -2,23 +2,41 @@
 
 from TTS.api import TTS
 import os
+import numpy as np
 from config.settings import settings
 
 _tts = None
 
 
+def create_tts():
+    """A new model instance (the worker pool keeps one per worker thread)."""
+    print(f"Loading TTS model: {settings.TTS_MODEL}")
+    tts = TTS(model_name=settings.TTS_MODEL)
+    os.makedirs(settings.OUTPUT_DIR, exist_ok=True)
+    return tts
+
+
 def load_tts():
     global _tts
     if _tts is None:
-        print(f"Loading TTS model: {settings.TTS_MODEL}")
-        _tts = TTS(model_name=settings.TTS_MODEL)
-        os.makedirs(settings.OUTPUT_DIR, exist_ok=True)
+        _tts = create_tts()
     return _tts
 
 
-def synthesize(text: str, filename: str) -> str:
+def synthesize(text: str, filename: str, tts=None) -> str:
     """Generate TTS audio and return file path."""
-    tts = load_tts()
+    tts = tts or load_tts()
     path = f"{settings.OUTPUT_DIR}/{filename}.{settings.AUDIO_FORMAT}"
     tts.tts_to_file(text=text, file_path=path)
     return path
+
+
+def output_sample_rate(tts=None) -> int:
+    return (tts or load_tts()).synthesizer.output_sample_rate
+
+
+def synthesize_pcm(text: str, tts=None) -> bytes:
+    """Synthesize text in memory; returns mono 16-bit little-endian PCM at output_sample_rate()."""
+    tts = tts or load_tts()
+    samples = np.asarray(tts.tts(text=text), dtype=np.float32)
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
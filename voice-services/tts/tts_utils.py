@@ -1,6 +1,9 @@
 # tts/tts_utils.py
 
 import hashlib
+import re
+import struct
+import unicodedata
 from cachetools import TTLCache
 from config.settings import settings
 
@@ -12,5 +15,55 @@ def hash_text(text: str) -> str:
     return hashlib.sha256(text.encode()).hexdigest()
 
 
+def normalize_tts_text(text: str) -> str:
+    """NFC + collapsed whitespace: variants that would synthesize the same audio share a key."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def audio_cache_key(text: str, model: str, audio_format: str) -> str:
+    """Content address of a synthesized clip."""
+    return hash_text(f"{model}\n{audio_format}\n{normalize_tts_text(text)}")
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+_CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+
+
+def split_for_streaming(text: str, max_chars: int = 120):
+    """
+    Split text into sentences, and sentences longer than max_chars into clauses,
+    so the first audio chunk is ready after synthesizing only a short piece.
+    """
+    chunks = []
+    for sentence in _SENTENCE_END.split(text):
+        sentence = normalize_tts_text(sentence)
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            chunks.append(sentence)
+            continue
+        current = ""
+        for clause in _CLAUSE_END.split(sentence):
+            if current and len(current) + 1 + len(clause) > max_chars:
+                chunks.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}" if current else clause
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def wav_stream_header(sample_rate: int, channels: int = 1, bits_per_sample: int = 16) -> bytes:
+    """RIFF/WAVE header for a stream of unknown length (sizes set to the maximum)."""
+    byte_rate = sample_rate * channels * bits_per_sample // 8
+    block_align = channels * bits_per_sample // 8
+    return (
+        b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, block_align, bits_per_sample)
+        + b"data" + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+
 def ensure_not_replay(text: str):
     return  # disable replay check for development
@@ -0,0 +1,219 @@
+# tts/worker_pool.py
+"""
+Fixed pool of synthesis threads, each owning its own TTS model instance.
+
+- Models are loaded (and warmed up with one short synthesis) when the pool starts,
+  so no request pays the model-load time.
+- Jobs wait in a bounded queue; submitting to a full queue raises PoolSaturated
+  instead of piling up work the pool cannot finish in time.
+- If every worker failed to load its model, run() raises PoolUnavailable (and queued
+  jobs fail with it) instead of waiting out the timeout for a worker that never comes.
+- run() waits at most `timeout` seconds. A job that has not started by then is
+  dropped; one already running finishes in the background and its result goes to the
+  optional cleanup callback (e.g. to delete a file nobody will register).
+- The event loop only enqueues jobs and awaits futures, so it keeps serving
+  /audio files while every worker is busy.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+log = logging.getLogger("tts")
+
+
+class PoolSaturated(Exception):
+    """The job queue is full."""
+
+
+class PoolUnavailable(Exception):
+    """No worker is left to run jobs (every model load failed)."""
+
+
+class _Job:
+    __slots__ = ("fn", "args", "cleanup", "future", "abandoned")
+
+    def __init__(self, fn, args, cleanup):
+        self.fn = fn
+        self.args = args
+        self.cleanup = cleanup
+        self.future = Future()
+        self.abandoned = False  # the caller timed out; set and read under the pool lock
+
+
+class TTSWorkerPool:
+    def __init__(self, model_factory: Callable, workers: int = 1, max_queue: int = 16,
+                 timeout: float = 30.0, warmup_text: str = "Hello."):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.model_factory = model_factory
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.warmup_text = warmup_text
+        self._jobs: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.loaded = 0
+        self.failed = 0
+        self.busy = 0
+        self.sample_rate: Optional[int] = None
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def start(self):
+        """Start the worker threads; each loads its model in the background."""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"tts-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def shutdown(self, wait: bool = True):
+        """Cancel queued jobs and stop the workers once their current job is done."""
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job.future.cancel()
+        for _ in range(len(self._threads) - self.failed):
+            self._jobs.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def _load(self):
+        started = time.perf_counter()
+        tts = self.model_factory()
+        if self.warmup_text:
+            tts.tts(text=self.warmup_text)
+        with self._lock:
+            self.loaded += 1
+            if self.sample_rate is None:
+                self.sample_rate = tts.synthesizer.output_sample_rate
+        log.info(f"{threading.current_thread().name} ready in {time.perf_counter() - started:.1f}s")
+        return tts
+
+    def _worker(self):
+        try:
+            tts = self._load()
+        except Exception as e:
+            log.error(f"{threading.current_thread().name} failed to load the TTS model: {e}")
+            self._worker_failed()
+            return
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            if not job.future.set_running_or_notify_cancel():
+                continue  # timed out while still queued
+            with self._lock:
+                self.busy += 1
+            try:
+                result = job.fn(*job.args, tts=tts)
+            except Exception as e:
+                job.future.set_exception(e)
+            else:
+                with self._lock:
+                    job.future.set_result(result)
+                    late = job.abandoned
+                if late:
+                    self._cleanup(job, result)
+            finally:
+                with self._lock:
+                    self.busy -= 1
+
+    @property
+    def available(self) -> bool:
+        """False once every worker has failed to load (True while they are still loading)."""
+        return self.failed < self.workers
+
+    def _worker_failed(self):
+        with self._lock:
+            self.failed += 1
+            if self.available:
+                return
+            # last worker gone: fail whatever is waiting, nobody would ever pick it up
+            while True:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None and job.future.set_running_or_notify_cancel():
+                    job.future.set_exception(PoolUnavailable("no TTS worker could load its model"))
+
+    @staticmethod
+    def _cleanup(job, result):
+        if job.cleanup is None:
+            return
+        try:
+            job.cleanup(result)
+        except Exception as e:
+            log.warning(f"Cleanup of a timed-out TTS job failed: {e}")
+
+    async def run(self, fn: Callable, *args, cleanup: Optional[Callable] = None):
+        """
+        Run fn(*args, tts=<worker's model>) on a worker and return its result.
+        cleanup(result) is called if fn completes only after this call timed out.
+        """
+        job = _Job(fn, args, cleanup)
+        # under the lock, so a job cannot slip in after the last worker drained the queue
+        with self._lock:
+            if not self.available:
+                raise PoolUnavailable("no TTS worker could load its model")
+            try:
+                self._jobs.put_nowait(job)
+            except queue.Full:
+                self.rejected += 1
+                raise PoolSaturated(f"TTS queue is full ({self.max_queue} jobs waiting)")
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(job.future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            # exactly one side cleans up: the worker if it finishes after this point,
+            # otherwise us (the result landed just as the timeout fired)
+            with self._lock:
+                job.abandoned = True
+                finished = job.future.done() and not job.future.cancelled() and job.future.exception() is None
+            if finished:
+                self._cleanup(job, job.future.result())
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+        self.completed += 1
+        return result
+
+    @property
+    def queue_depth(self) -> int:
+        return self._jobs.qsize()
+
+    def readiness(self, max_depth: int) -> dict:
+        """Ready once every worker has a model and the backlog is below max_depth."""
+        depth = self.queue_depth
+        return {
+            "ready": self.loaded == self.workers and depth < max_depth,
+            "workers": self.workers,
+            "loaded": self.loaded,
+            "failed": self.failed,
+            "busy": self.busy,
+            "queue_depth": depth,
+            "max_queue": self.max_queue,
+        }
+
+    def stats(self) -> dict:
+        return {
+            **self.readiness(self.max_queue),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }